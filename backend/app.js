@@ -20,10 +20,17 @@ const databaseTestRoutes = require('./routes/database-test.routes');
 const fixDatabaseRoutes = require('./routes/fix-database.routes');
 const brandingSettingsRoutes = require('./routes/branding-settings.routes');
 const insightsRoutes = require('./routes/insights.routes');
+const { sequelize } = require('./config/database');
+const metrics = require('./middleware/metrics.middleware');
+const aiClient = require('./services/ai-client.service');
 
 // Initialize express app
 const app = express();
 
+// Request latency and per-request SQL metrics, served at /api/metrics
+metrics.instrumentSequelize(sequelize);
+app.use(metrics.metricsMiddleware);
+
 // Middleware
 app.use(cors());
 app.use(express.json());
@@ -56,7 +63,7 @@ const testRoutes = require('./routes/test.routes');
 app.use('/api/flux-test', testRoutes);  // Using a different path to avoid conflicts
 
 // Direct endpoint for document upload
-app.post('/api/documents/upload', upload.array('files'), documentsController.uploadDocuments);
+app.post('/api/documents/upload', metrics.withRequestContext(upload.array('files')), documentsController.uploadDocuments);
 
 app.use('/api/settings/branding', brandingSettingsRoutes);
 
@@ -78,6 +85,14 @@ app.get('/api/health', (req, res) => {
   res.status(200).json({ status: 'ok', message: 'API is running' });
 });
 
+// Route latency histograms, SQL queries per request and AI call stats (local requests only)
+app.get('/api/metrics', metrics.localOnly, (req, res) => {
+  res.status(200).json({
+    ...metrics.getMetrics(),
+    ai: aiClient.getStats()
+  });
+});
+
 // Specific middleware for handling multer errors
 app.use((err, req, res, next) => {
   if (err && err.name === 'MulterError') {
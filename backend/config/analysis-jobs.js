@@ -0,0 +1,18 @@
+// config/analysis-jobs.js
+
+require('dotenv').config();
+
+const config = {
+  // Number of worker processes, i.e. analyses running in parallel
+  workers: parseInt(process.env.ANALYSIS_WORKERS || '2', 10),
+  // Files of one job uploaded to Flux AI in parallel
+  uploadConcurrency: parseInt(process.env.ANALYSIS_UPLOAD_CONCURRENCY || '3', 10),
+  // Attempts before a job interrupted by crashes or restarts is marked as failed
+  maxAttempts: parseInt(process.env.ANALYSIS_MAX_ATTEMPTS || '3', 10),
+  // How often the pool looks for queued jobs when idle
+  pollInterval: parseInt(process.env.ANALYSIS_POLL_INTERVAL || '5000', 10),
+
+  enabled: process.env.ANALYSIS_WORKERS_DISABLED !== 'true'
+};
+
+module.exports = config;
@@ -2,11 +2,16 @@ const { Sequelize } = require('sequelize');
 const path = require('path');
 require('dotenv').config();
 
-// Create SQLite database in your project directory
+// Create SQLite database in your project directory (DB_STORAGE overrides it, e.g. for load tests)
 const sequelize = new Sequelize({
   dialect: 'sqlite',
-  storage: path.join(__dirname, '../database.sqlite'),
+  storage: process.env.DB_STORAGE || path.join(__dirname, '../database.sqlite'),
   logging: process.env.NODE_ENV === 'development' ? console.log : false,
+  // Retry statements that lost a race for the database lock
+  retry: {
+    match: [/SQLITE_BUSY/],
+    max: 5
+  }
 });
 
 // Test the connection
@@ -21,7 +26,20 @@ const testConnection = async () => {
   }
 };
 
+// Use write-ahead logging so readers are not blocked while a feedback
+// submission holds the write lock. The journal mode is stored in the file.
+const enableWriteAheadLog = async () => {
+  try {
+    await sequelize.query('PRAGMA journal_mode = WAL;');
+    return true;
+  } catch (error) {
+    console.error('Unable to enable WAL journal mode:', error);
+    return false;
+  }
+};
+
 module.exports = {
   sequelize,
-  testConnection
-};
\ No newline at end of file
+  testConnection,
+  enableWriteAheadLog
+};
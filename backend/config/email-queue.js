@@ -0,0 +1,22 @@
+// config/email-queue.js
+
+require('dotenv').config();
+
+const config = {
+  // Number of emails sent in parallel (also the SMTP connection pool size)
+  concurrency: parseInt(process.env.EMAIL_QUEUE_CONCURRENCY || '5', 10),
+  // Maximum emails per second across the whole pool
+  rateLimit: parseInt(process.env.EMAIL_QUEUE_RATE_LIMIT || '10', 10),
+  // How often the worker looks for due jobs when idle
+  pollInterval: parseInt(process.env.EMAIL_QUEUE_POLL_INTERVAL || '2000', 10),
+  // Attempts before a job is marked as failed
+  maxAttempts: parseInt(process.env.EMAIL_QUEUE_MAX_ATTEMPTS || '5', 10),
+  // First retry delay; doubles with every further attempt
+  retryBaseDelay: parseInt(process.env.EMAIL_QUEUE_RETRY_DELAY || '30000', 10),
+  // Delay between an invitation and the matching instruction email
+  instructionDelay: parseInt(process.env.EMAIL_QUEUE_INSTRUCTION_DELAY || '1000', 10),
+
+  enabled: process.env.EMAIL_QUEUE_DISABLED !== 'true'
+};
+
+module.exports = config;
@@ -8,6 +8,20 @@ const config = {
   model: process.env.FLUX_AI_MODEL ? process.env.FLUX_AI_MODEL.trim() : 'DeepSeek R1 Distill Qwen 32B',
   modelId: process.env.FLUX_AI_MODEL_ID || 'DeepSeek-R1-Distill-Qwen-32B',
   maxUploadSize: parseInt(process.env.MAX_UPLOAD_SIZE || '10485760', 10), // 10MB default
+  // How long storage information is reused for quota checks before uploads
+  storageInfoTtl: parseInt(process.env.FLUX_AI_STORAGE_INFO_TTL || '60000', 10),
+
+  // Shared client settings (services/ai-client.service.js)
+  timeout: parseInt(process.env.FLUX_AI_TIMEOUT || '180000', 10),
+  maxConcurrency: parseInt(process.env.FLUX_AI_MAX_CONCURRENCY || '4', 10),
+  cache: {
+    enabled: process.env.FLUX_AI_CACHE_DISABLED !== 'true',
+    // Keep responses in the ai_response_cache table as well as in memory
+    persistent: process.env.FLUX_AI_CACHE_PERSISTENT !== 'false',
+    ttl: parseInt(process.env.FLUX_AI_CACHE_TTL || String(7 * 24 * 60 * 60 * 1000), 10),
+    maxEntries: parseInt(process.env.FLUX_AI_CACHE_MAX_ENTRIES || '2000', 10),
+    memoryEntries: parseInt(process.env.FLUX_AI_CACHE_MEMORY_ENTRIES || '200', 10)
+  },
 
   endpoints: {
     balance: '/v1/balance',
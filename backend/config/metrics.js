@@ -0,0 +1,20 @@
+// config/metrics.js
+
+require('dotenv').config();
+
+const config = {
+  // Upper bounds (ms) of the request latency histogram buckets; slower requests go in "+Inf"
+  latencyBuckets: (process.env.METRICS_LATENCY_BUCKETS || '5,10,25,50,100,250,500,1000,2500,5000')
+    .split(',')
+    .map(bound => parseFloat(bound))
+    .filter(bound => !Number.isNaN(bound))
+    .sort((a, b) => a - b),
+  // Log requests that run more SQL queries than this (0 disables the warning)
+  queryWarnThreshold: parseInt(process.env.METRICS_QUERY_WARN_THRESHOLD || '50', 10),
+  // The metrics endpoint only answers local requests unless this is set
+  allowRemote: process.env.METRICS_ALLOW_REMOTE === 'true',
+
+  enabled: process.env.METRICS_DISABLED !== 'true'
+};
+
+module.exports = config;
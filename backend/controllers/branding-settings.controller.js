@@ -1,6 +1,7 @@
 // backend/controllers/branding-settings.controller.js
 
 const { BrandingSettings } = require('../models');
+const emailTemplates = require('../services/email-template.service');
 
 // Default values defined centrally
 const defaultSettings = {
@@ -101,6 +102,9 @@ exports.updateBrandingSettings = async (req, res) => {
       });
     }
 
+    // Emails rendered from now on pick up the new branding
+    emailTemplates.invalidateBranding(req.user.id);
+
     // Return the updated or newly created settings
     // Ensure response includes defaults for any fields potentially missing after DB operation
      const response = {
@@ -6,12 +6,15 @@ const {
   Template, 
   Employee, 
   Question,
-  EmailSettings,
   sequelize,
-  CommunicationTemplate
+  CampaignResultSnapshot,
+  EmailJob
 } = require('../models');
 const { v4: uuidv4 } = require('uuid');
-const emailService = require('../services/email.service');
+const emailQueue = require('../services/email-queue.service');
+const emailTemplates = require('../services/email-template.service');
+const emailQueueConfig = require('../config/email-queue');
+const resultSnapshotService = require('../services/result-snapshot.service');
 
 // Get all campaigns
 exports.getAllCampaigns = async (req, res) => {
@@ -343,6 +346,9 @@ exports.updateCampaign = async (req, res) => {
           aiSuggested: participant.aiSuggested || false
         });
       }
+      
+      // Removed or re-typed participants change the results, rebuild on next read
+      await resultSnapshotService.invalidateCampaignSnapshot(campaign.id);
     }
     
     // Return the updated campaign with its participants
@@ -462,118 +468,72 @@ exports.launchCampaign = async (req, res) => {
       });
     }
     
-    console.log('Campaign validation passed, updating status to active');
+    console.log('Campaign validation passed, queueing invitation emails');
     
-    // Update campaign status
-    await campaign.update({
-      status: 'active',
-      lastReminderSent: new Date() // Record when invitations are sent
-    });
+    // Render invitation and instruction emails up front; the email queue
+    // worker sends them in the background so the launch returns immediately.
+    // Compiled templates are cached, so this reads each template at most once.
+    const emailJobs = [];
+    const invitedParticipantIds = [];
     
-    // Send invitation emails to all participants
-    try {
-      console.log('Getting email settings');
-      const emailSettings = await EmailSettings.findOne();
-      
-      if (!emailSettings) {
-        console.log('No email settings found!');
-      } else {
-        console.log('Email settings found, devMode:', emailSettings.devMode);
+    for (const participant of participants) {
+      if (!participant.employee || !participant.employee.email) {
+        console.log(`Participant ${participant.id} has no email, skipping`);
+        continue;
       }
       
-      console.log('Starting to process participants');
-      for (const participant of participants) {
-        console.log(`\nProcessing participant: ${participant.id}`);
-        console.log(`Email: ${participant.employee?.email || 'Unknown'}`);
-        console.log(`Type: ${participant.relationshipType}`);
-        
-        if (!participant.employee || !participant.employee.email) {
-          console.log('Participant has no email, skipping');
-          continue;
-        }
-        
-        // Set participant status to invited
-        await participant.update({ 
-          status: 'invited',
-          lastInvitedAt: new Date()
-        });
-        
-        console.log('Updated participant status to invited');
-        
-        // Create feedback URL with token
-        const feedbackUrl = `${process.env.FRONTEND_URL || 'http://localhost:5173'}/feedback/${participant.invitationToken}`;
-        
-        // Common email variables
-        const emailVars = {
-          assessorName: participant.employee.firstName,
-          targetName: campaign.targetEmployee.firstName + ' ' + campaign.targetEmployee.lastName,
-          campaignName: campaign.name,
-          deadline: new Date(campaign.endDate).toLocaleDateString(),
-          feedbackUrl,
-          companyName: 'Your Company'
-        };
-        
-        try {
-          // Step 1: Get and send invitation email
-          console.log('Getting invitation template for:', participant.relationshipType);
-          const invitationTemplate = await getEmailTemplate(participant.relationshipType, 'invitation');
-          
-          if (!invitationTemplate) {
-            console.log('No invitation template found!');
-            continue;
-          }
-          
-          console.log('Sending invitation email');
-          // Send invitation email
-          await emailService.sendEmail({
-            to: participant.employee.email,
-            subject: replaceEmailPlaceholders(invitationTemplate.subject, emailVars),
-            html: replaceEmailPlaceholders(invitationTemplate.content, emailVars),
-            devMode: false, // Force sending even in dev mode
-            campaignId: campaign.id,
-            participantId: participant.id,
-            communicationType: 'invitation'
-          });
-          
-          console.log('Invitation email sent successfully');
-          
-          // Step 2: Wait a short time before sending instructions
-          await new Promise(resolve => setTimeout(resolve, 1000)); // 1 second delay
-          
-          // Step 3: Get and send instruction email
-          console.log('Getting instruction template');
-          const instructionTemplate = await getEmailTemplate(participant.relationshipType, 'instruction');
-          
-          if (!instructionTemplate) {
-            console.log('No instruction template found!');
-            continue;
-          }
-          
-          console.log('Sending instruction email');
-          // Send instruction email
-          await emailService.sendEmail({
-            to: participant.employee.email,
-            subject: replaceEmailPlaceholders(instructionTemplate.subject, emailVars),
-            html: replaceEmailPlaceholders(instructionTemplate.content, emailVars),
-            devMode: false, // Force sending even in dev mode
-            campaignId: campaign.id,
-            participantId: participant.id,
-            communicationType: 'instruction'
-          });
-          
-          console.log('Instruction email sent successfully');
-        } catch (individualEmailError) {
-          console.error(`Error sending emails to ${participant.employee.email}:`, individualEmailError);
-          // Continue with other participants even if this one fails
-        }
-      }
+      invitedParticipantIds.push(participant.id);
+      const emailVars = buildEmailVars(campaign, participant);
+      const templateOptions = {
+        relationshipType: participant.relationshipType,
+        userId: campaign.createdBy
+      };
+      
+      const invitation = await emailTemplates.render({ ...templateOptions, templateType: 'invitation' }, emailVars);
+      emailJobs.push({
+        recipient: participant.employee.email,
+        subject: invitation.subject,
+        html: invitation.html,
+        campaignId: campaign.id,
+        participantId: participant.id,
+        communicationType: 'invitation'
+      });
       
-      console.log('All participants processed');
-    } catch (emailError) {
-      console.error('Error sending invitation emails:', emailError);
-      // Continue with launch even if emails fail
+      // Instructions follow the invitation after a short delay
+      const instruction = await emailTemplates.render({ ...templateOptions, templateType: 'instruction' }, emailVars);
+      emailJobs.push({
+        recipient: participant.employee.email,
+        subject: instruction.subject,
+        html: instruction.html,
+        campaignId: campaign.id,
+        participantId: participant.id,
+        communicationType: 'instruction',
+        delay: emailQueueConfig.instructionDelay
+      });
     }
     
+    // Activate the campaign, mark participants invited and queue the emails together
+    let emailJob;
+    await sequelize.transaction(async (transaction) => {
+      const now = new Date();
+      
+      await campaign.update({
+        status: 'active',
+        lastReminderSent: now // Record when invitations are sent
+      }, { transaction });
+      
+      if (invitedParticipantIds.length > 0) {
+        await CampaignParticipant.update(
+          { status: 'invited', lastInvitedAt: now },
+          { where: { id: invitedParticipantIds }, transaction }
+        );
+      }
+      
+      emailJob = await emailQueue.enqueue(emailJobs, { transaction });
+    });
+    
+    console.log(`Queued ${emailJob.total} emails for ${invitedParticipantIds.length} participants`);
+    
     // Return the updated campaign
     const updatedCampaign = await Campaign.findOne({
       where: { id: campaign.id },
@@ -602,7 +562,12 @@ exports.launchCampaign = async (req, res) => {
     
     res.status(200).json({
       message: 'Campaign launched successfully',
-      campaign: updatedCampaign
+      campaign: updatedCampaign,
+      emailJob: {
+        id: emailJob.batchId,
+        total: emailJob.total,
+        statusUrl: `/api/campaigns/email-jobs/${emailJob.batchId}`
+      }
     });
   } catch (error) {
     console.error('Error launching campaign:', error);
@@ -677,6 +642,10 @@ exports.deleteCampaign = async (req, res) => {
       where: { campaignId: campaign.id }
     });
     
+    await CampaignResultSnapshot.destroy({
+      where: { campaignId: campaign.id }
+    });
+    
     // Delete the campaign
     await campaign.destroy();
     
@@ -915,169 +884,53 @@ exports.generateEmailTemplates = async (req, res) => {
   }
 };
 
-// Helper function to get appropriate email template
-async function getEmailTemplate(relationshipType, templateType) {
+// Placeholder values shared by invitation, instruction and reminder emails;
+// companyName comes from the campaign owner's branding settings
+function buildEmailVars(campaign, participant) {
+  return {
+    assessorName: participant.employee.firstName,
+    targetName: campaign.targetEmployee.firstName + ' ' + campaign.targetEmployee.lastName,
+    campaignName: campaign.name,
+    deadline: new Date(campaign.endDate).toLocaleDateString(),
+    feedbackUrl: `${process.env.FRONTEND_URL || 'http://localhost:5173'}/feedback/${participant.invitationToken}`
+  };
+}
+
+// Get the progress of a batch of queued emails
+exports.getEmailJobStatus = async (req, res) => {
   try {
-    console.log(`Looking for template: ${templateType} for ${relationshipType}`);
-    
-    // First try to find a template specifically for this relationship type
-    let template = await CommunicationTemplate.findOne({
-      where: {
-        templateType: templateType,
-        recipientType: relationshipType,
-        isDefault: true
-      }
-    });
+    const progress = await emailQueue.getBatchProgress(req.params.batchId);
     
-    // If no specific template exists, fall back to the "all" recipient type
-    if (!template) {
-      console.log(`No specific template found, looking for 'all' type`);
-      template = await CommunicationTemplate.findOne({
-        where: {
-          templateType: templateType,
-          recipientType: 'all',
-          isDefault: true
-        }
-      });
+    if (!progress) {
+      return res.status(404).json({ message: 'Email job not found' });
     }
     
-    // If still no template, check for any template without isDefault requirement
-    if (!template) {
-      console.log(`No default template found, looking for any ${templateType} template`);
-      template = await CommunicationTemplate.findOne({
-        where: {
-          templateType: templateType
-        }
-      });
-    }
+    // Only the campaign owner may see the progress of its emails
+    const job = await EmailJob.findOne({
+      where: { batchId: req.params.batchId },
+      attributes: ['campaignId']
+    });
     
-    // If no template found in database, use a hardcoded fallback
-    if (!template) {
-      console.log(`Using fallback template for ${templateType}-${relationshipType}`);
+    if (job.campaignId) {
+      const campaign = await Campaign.findOne({
+        where: { id: job.campaignId, createdBy: req.user.id },
+        attributes: ['id']
+      });
       
-      // Fallback templates
-      if (templateType === 'invitation' && relationshipType === 'self') {
-        return {
-          subject: 'Complete your Self-Assessment for {campaignName}',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>As part of the <strong>{campaignName}</strong> feedback campaign, you're invited to complete a self-assessment.</p>
-            <p>Self-assessment is a crucial part of the 360-degree feedback process, giving you an opportunity to reflect on your own performance.</p>
-            <p>Please complete your self-assessment by {deadline}.</p>
-            <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Start Self-Assessment</a></p>
-            <p>Thank you for your participation!</p>
-          `
-        };
-      } else if (templateType === 'instruction' && relationshipType === 'self') {
-        return {
-          subject: 'Instructions for Your Self-Assessment',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>Here are some guidelines for completing your self-assessment as part of the <strong>{campaignName}</strong> feedback campaign:</p>
-            <ul>
-              <li>Be honest and reflective</li>
-              <li>Provide specific examples to support your assessment</li>
-              <li>Consider both your strengths and areas for development</li>
-              <li>Take your time to provide thoughtful responses</li>
-            </ul>
-            <p>Your self-assessment provides valuable context and will be considered alongside feedback from others.</p>
-            <p>If you haven't completed your assessment yet, please do so by {deadline}:</p>
-            <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Complete Self-Assessment</a></p>
-          `
-        };
-      } else if (templateType === 'invitation') {
-        return {
-          subject: 'Invitation to provide feedback for {targetName}',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>You've been invited to provide feedback for <strong>{targetName}</strong> as part of the <strong>{campaignName}</strong> feedback campaign.</p>
-            <p>Your insights are valuable for {targetName}'s professional development.</p>
-            <p>Please complete your feedback by {deadline}.</p>
-            <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Provide Feedback</a></p>
-            <p>Thank you for your participation!</p>
-          `
-        };
-      } else if (templateType === 'instruction') {
-        return {
-          subject: 'Guidelines for Providing Effective Feedback',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>Here are some guidelines for providing effective feedback for <strong>{targetName}</strong>:</p>
-            <ul>
-              <li>Be specific and provide examples</li>
-              <li>Focus on behaviors, not personality</li>
-              <li>Balance positive feedback with areas for development</li>
-              <li>Be constructive and actionable</li>
-            </ul>
-            <p>If you haven't completed your feedback yet, please do so by {deadline}:</p>
-            <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Provide Feedback</a></p>
-          `
-        };
-      } else if (templateType === 'reminder') {
-        return {
-          subject: 'Reminder: Complete your feedback for {targetName}',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>This is a friendly reminder to complete your feedback for <strong>{targetName}</strong> as part of the <strong>{campaignName}</strong> campaign.</p>
-            <p>Please complete your feedback by {deadline}.</p>
-            <p><a href="{feedbackUrl}">Complete Feedback</a></p>
-          `
-        };
-      } else {
-        return {
-          subject: '360 Feedback Request: {campaignName}',
-          content: `
-            <p>Hello {assessorName},</p>
-            <p>Please complete your feedback for the <strong>{campaignName}</strong> campaign by {deadline}.</p>
-            <p><a href="{feedbackUrl}">Provide Feedback</a></p>
-          `
-        };
+      if (!campaign) {
+        return res.status(404).json({ message: 'Email job not found' });
       }
     }
     
-    // If we have a template from the database, ensure it has both subject and content
-    if (template && template.subject && template.content) {
-      console.log('Found valid template from database:', template.id);
-      return {
-        subject: template.subject,
-        content: template.content
-      };
-    }
-    
-    // If template is missing required fields, use a basic fallback
-    console.log('Template is missing required fields, using emergency fallback');
-    return {
-      subject: `Feedback Request for ${templateType}`,
-      content: `<p>Please provide your feedback by clicking <a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">here</a>.</p>`
-    };
+    res.status(200).json(progress);
   } catch (error) {
-    console.error('Error fetching email template:', error);
-    // Return a very basic fallback
-    return {
-      subject: '360 Feedback Request',
-      content: `<p>Please provide your feedback by clicking <a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">here</a>.</p>`
-    };
-  }
-}
-
-// Helper function to replace placeholders in email templates (improved version)
-function replaceEmailPlaceholders(template, data) {
-  if (!template) {
-    console.error('Error: template is undefined in replaceEmailPlaceholders');
-    return 'Error: Missing template content';
-  }
-  
-  let content = template;
-  const safeData = data || {};
-  
-  for (const [key, value] of Object.entries(safeData)) {
-    if (typeof content === 'string') {
-      content = content.replace(new RegExp(`{${key}}`, 'g'), value || '');
-    }
+    console.error('Error getting email job status:', error);
+    res.status(500).json({ 
+      message: 'Failed to get email job status', 
+      error: process.env.NODE_ENV === 'development' ? error.message : undefined
+    });
   }
-  
-  return content;
-}
+};
 
 // Send reminders to specific participants
 exports.sendReminders = async (req, res) => {
@@ -1156,110 +1009,85 @@ exports.sendReminders = async (req, res) => {
       return res.status(400).json({ message: 'All participants must belong to the same campaign' });
     }
     
-    // Send reminder emails
+    // Render reminder emails and queue them for the email queue worker
     const campaign = firstParticipant.campaign;
     const sentReminders = [];
-    
-    console.log('Getting email settings...');
-    const emailSettings = await EmailSettings.findOne();
-    
-    console.log('Found email settings, devMode:', emailSettings ? emailSettings.devMode : 'unknown');
-    
-    // Temporarily force devMode to false for this operation
-    if (emailSettings) {
-      console.log('Setting devMode to false FOR THIS OPERATION ONLY');
-      emailSettings.devMode = false;
-    }
+    const emailJobs = [];
     
     console.log('Starting to process participants for reminders');
     for (const participant of participants) {
-      console.log(`\nProcessing participant: ${participant.id}`);
-      
       // Skip completed or declined participants
       if (participant.status === 'completed' || participant.status === 'declined') {
-        console.log('Participant already completed or declined, skipping');
+        console.log(`Participant ${participant.id} already completed or declined, skipping`);
         continue;
       }
       
       if (!participant.employee || !participant.employee.email) {
-        console.log('Participant has no email address, skipping');
+        console.log(`Participant ${participant.id} has no email address, skipping`);
         continue;
       }
       
-      console.log(`Sending reminder to ${participant.employee.email}`);
-      
-      // Update participant status to invited and increment reminder count
-      await participant.update({
-        status: participant.status === 'pending' ? 'invited' : participant.status,
-        lastInvitedAt: new Date(),
-        reminderCount: (participant.reminderCount || 0) + 1
-      });
-      
       sentReminders.push({
         participantId: participant.id,
         email: participant.employee.email,
         timestamp: new Date()
       });
       
-      try {
-        // Create feedback URL with token
-        const feedbackUrl = `${process.env.FRONTEND_URL || 'http://localhost:5173'}/feedback/${participant.invitationToken}`;
-        
-        // Common email variables
-        const emailVars = {
-          assessorName: participant.employee.firstName,
-          targetName: campaign.targetEmployee.firstName + ' ' + campaign.targetEmployee.lastName,
-          campaignName: campaign.name,
-          deadline: new Date(campaign.endDate).toLocaleDateString(),
-          feedbackUrl,
-          companyName: 'Your Company'
-        };
-        
-        // Get reminder template
-        let reminderTemplate = await getEmailTemplate(participant.relationshipType, 'reminder');
-        
-        if (!reminderTemplate) {
-          console.log('No reminder template found, using generic template');
-          reminderTemplate = {
-            subject: `Reminder: Complete feedback for ${campaign.targetEmployee.firstName}`,
-            content: `
-              <p>Hello ${participant.employee.firstName},</p>
-              <p>This is a friendly reminder to complete your feedback for ${campaign.targetEmployee.firstName} ${campaign.targetEmployee.lastName}.</p>
-              <p>Please complete your feedback by ${new Date(campaign.endDate).toLocaleDateString()}.</p>
-              <p><a href="${feedbackUrl}">Click here to provide feedback</a></p>
-            `
-          };
-        }
-        
-        console.log('Sending reminder email...');
-        
-        await emailService.sendEmail({
-          to: participant.employee.email,
-          subject: replaceEmailPlaceholders(reminderTemplate.subject, emailVars),
-          html: replaceEmailPlaceholders(reminderTemplate.content, emailVars),
-          devMode: false, // Force production mode for this email
-          campaignId: campaign.id,
-          participantId: participant.id,
-          communicationType: 'reminder'
-        });
-        
-        console.log('Reminder email sent successfully');
-      } catch (emailError) {
-        console.error('Error sending reminder email:', emailError);
-        // Continue with other reminders even if this one fails
-      }
+      const reminder = await emailTemplates.render({
+        relationshipType: participant.relationshipType,
+        templateType: 'reminder',
+        userId: campaign.createdBy
+      }, buildEmailVars(campaign, participant));
+      
+      emailJobs.push({
+        recipient: participant.employee.email,
+        subject: reminder.subject,
+        html: reminder.html,
+        campaignId: campaign.id,
+        participantId: participant.id,
+        communicationType: 'reminder'
+      });
     }
     
-    // Update campaign's lastReminderSent timestamp
-    await campaign.update({
-      lastReminderSent: new Date()
+    // Update reminder counters and the campaign, and queue the emails together
+    let emailJob;
+    await sequelize.transaction(async (transaction) => {
+      const now = new Date();
+      const remindedIds = sentReminders.map(reminder => reminder.participantId);
+      
+      if (remindedIds.length > 0) {
+        await CampaignParticipant.update(
+          {
+            lastInvitedAt: now,
+            reminderCount: sequelize.literal('COALESCE(reminderCount, 0) + 1')
+          },
+          { where: { id: remindedIds }, transaction }
+        );
+        
+        await CampaignParticipant.update(
+          { status: 'invited' },
+          { where: { id: remindedIds, status: 'pending' }, transaction }
+        );
+      }
+      
+      // Update campaign's lastReminderSent timestamp
+      await campaign.update({
+        lastReminderSent: now
+      }, { transaction });
+      
+      emailJob = await emailQueue.enqueue(emailJobs, { transaction });
     });
     
-    console.log('All reminders processed');
+    console.log(`Queued ${emailJob.total} reminder emails`);
     
     res.status(200).json({
       message: `Reminders sent to ${sentReminders.length} participants`,
-      sentReminders
+      sentReminders,
+      emailJob: {
+        id: emailJob.batchId,
+        total: emailJob.total,
+        statusUrl: `/api/campaigns/email-jobs/${emailJob.batchId}`
+      }
     });
   } catch (error) {
     console.error('Error sending reminders:', error);
@@ -3,9 +3,10 @@
 // START: Full replacement code with PLACEHOLDER STRATEGY for AI Button
 const { CommunicationTemplate, BrandingSettings } = require('../models');
 const fluxAiConfig = require('../config/flux-ai');
-const axios = require('axios');
+const aiClient = require('../services/ai-client.service');
 const { sequelize } = require('../config/database');
 const { Op } = require('sequelize');
+const emailTemplates = require('../services/email-template.service');
 
 // --- Default Branding Colors ---
 const DEFAULT_PRIMARY_COLOR = '#3B82F6';
@@ -78,6 +79,7 @@ exports.createTemplate = async (req, res) => {
     if (!name || !templateType || !recipientType || !subject || !content) { return res.status(400).json({ message: 'Name, template type, recipient type, subject, and content are required' }); }
     if (isDefault) { await CommunicationTemplate.update({ isDefault: false }, { where: { templateType, recipientType, createdBy: req.user.id, isDefault: true } }); }
     const template = await CommunicationTemplate.create({ name, description, templateType, recipientType, subject, content, isDefault: isDefault || false, isAiGenerated: false, createdBy: req.user.id });
+    emailTemplates.invalidateTemplates();
     res.status(201).json(template);
   } catch (error) { console.error('Error creating template:', error); res.status(500).json({ message: 'Failed to create template', error: error.message }); }
 };
@@ -89,6 +91,7 @@ exports.updateTemplate = async (req, res) => {
     if (!template) { return res.status(404).json({ message: 'Template not found' }); }
     if (isDefault === true && template.isDefault === false) { await CommunicationTemplate.update({ isDefault: false }, { where: { templateType: templateType || template.templateType, recipientType: recipientType || template.recipientType, createdBy: req.user.id, isDefault: true, id: { [Op.ne]: template.id } } }); }
     await template.update({ name: name !== undefined ? name : template.name, description: description !== undefined ? description : template.description, templateType: templateType !== undefined ? templateType : template.templateType, recipientType: recipientType !== undefined ? recipientType : template.recipientType, subject: subject !== undefined ? subject : template.subject, content: content !== undefined ? content : template.content, isDefault: isDefault !== undefined ? isDefault : template.isDefault });
+    emailTemplates.invalidateTemplates();
     res.status(200).json(template);
   } catch (error) { console.error('Error updating template:', error); res.status(500).json({ message: 'Failed to update template', error: error.message }); }
 };
@@ -98,6 +101,7 @@ exports.deleteTemplate = async (req, res) => {
     const template = await CommunicationTemplate.findOne({ where: { id: req.params.id, createdBy: req.user.id } });
     if (!template) { return res.status(404).json({ message: 'Template not found' }); }
     await template.destroy();
+    emailTemplates.invalidateTemplates();
     res.status(200).json({ message: 'Template deleted successfully' });
   } catch (error) { console.error('Error deleting template:', error); res.status(500).json({ message: 'Failed to delete template', error: error.message }); }
 };
@@ -134,13 +138,12 @@ exports.generateAiTemplates = async (req, res) => {
 
       try {
         const requestData = { /* ... same request data structure ... */ messages: [{ role: "user", content: aiPrompt }], preamble: fluxAiConfig.getSystemPrompt('template_generation') };
-        const response = await axios.post(/* ... same AI call details ... */ fluxAiConfig.getEndpointUrl('chat'), requestData, { headers: { 'Authorization': `Bearer ${fluxAiConfig.apiKey}`, 'Content-Type': 'application/json' } });
-        console.log('[TEMPLATE DEBUG] Flux AI response status:', response.status);
+        const data = await aiClient.chat(requestData, { purpose: 'template_generation' });
 
         // --- Parse AI response (same as before) ---
         let aiResponse = null;
-        const choice = response.data.choices[0];
-        if (!response.data || !response.data.choices || response.data.choices.length === 0) { throw new Error('Invalid response structure from Flux AI'); }
+        if (!data || !data.choices || data.choices.length === 0) { throw new Error('Invalid response structure from Flux AI'); }
+        const choice = data.choices[0];
         if (typeof choice.message === 'object' && choice.message.content) { aiResponse = choice.message.content; }
         else if (typeof choice.message === 'string') { aiResponse = choice.message; }
         else if (choice.content) { aiResponse = choice.content; }
@@ -208,6 +211,7 @@ exports.generateAiTemplates = async (req, res) => {
       const existingTemplate = await CommunicationTemplate.findOne({ where: { id: templateId, createdBy: req.user.id } });
       if (!existingTemplate) { return res.status(404).json({ message: 'Template not found' }); }
       await existingTemplate.update({ subject: templateSubject, content: finalContent, isAiGenerated: generatedByAI }); // SAVE finalContent
+      emailTemplates.invalidateTemplates();
       res.status(200).json(existingTemplate);
     } else {
       const template = await CommunicationTemplate.create({
@@ -216,6 +220,7 @@ exports.generateAiTemplates = async (req, res) => {
         templateType, recipientType, subject: templateSubject, content: finalContent, // SAVE finalContent
         isDefault: false, isAiGenerated: generatedByAI, createdBy: req.user.id
       });
+      emailTemplates.invalidateTemplates();
       res.status(201).json(template);
     }
   } catch (error) {
@@ -260,6 +265,7 @@ async function createInitialDefaultTemplates(userId) {
     const selfInstructionTemplate = generateDemoTemplate('instruction', 'self', userBranding);
     defaultTemplates.push({ name: `Default Self-Assessment Instructions`, description: `Default instructions for self-assessment`, templateType: 'instruction', recipientType: 'self', subject: selfInstructionTemplate.subject, content: selfInstructionTemplate.content, isDefault: true, isAiGenerated: false, createdBy: userId, createdAt: new Date(), updatedAt: new Date() });
     await CommunicationTemplate.bulkCreate(defaultTemplates);
+    emailTemplates.invalidateTemplates();
     console.log(`[TEMPLATE DEBUG] Created ${defaultTemplates.length} default templates for user ${userId}`);
   } catch (error) { console.error(`[TEMPLATE DEBUG] Error creating default templates for user ${userId}:`, error); }
 }
@@ -2,13 +2,14 @@
 
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
 const FormData = require('form-data');
 const { v4: uuidv4 } = require('uuid');
-const { Document, Template, Question, SourceDocument } = require('../models');
+const { Transaction } = require('sequelize');
+const { sequelize, Document, Template, Question, SourceDocument } = require('../models');
 const fluxAiConfig = require('../config/flux-ai');
 const { parseQuestionsFromAiResponse, sanitizeQuestionText, ensurePerspectiveQuestionCounts } = require('../services/question-parser.service');
-const { makeAiChatRequest, uploadFileToFluxAi } = require('../services/flux-ai.service');
+const { makeAiChatRequest, uploadFileToFluxAi, deleteFluxAiFile, testFluxAiConnectivity } = require('../services/flux-ai.service');
+const analysisJobs = require('../services/analysis-job.service');
 
 
 /**
@@ -799,7 +800,12 @@ function generateMockQuestionsForDocumentType(documentType) {
 }
 
 // Updated startDocumentAnalysis function
-async function startDocumentAnalysis(documents, documentType, userId, templateInfo = {}) {
+// options.onStage(stage, details) reports progress (upload, analysis, supplement, save);
+// options.uploadConcurrency bounds the number of files uploaded at once;
+// options.onTemplateCreated(template, transaction) runs in the transaction that saves the template
+async function startDocumentAnalysis(documents, documentType, userId, templateInfo = {}, options = {}) {
+  const { onStage = () => {}, uploadConcurrency = 3 } = options;
+
   try {
     console.log('[startDocumentAnalysis] Starting analysis for documents:', documents.length);
     console.log('[startDocumentAnalysis] Template Info received:', JSON.stringify(templateInfo)); // Log received info
@@ -808,17 +814,20 @@ async function startDocumentAnalysis(documents, documentType, userId, templateIn
     if (!documents || documents.length === 0) {
       console.error('[startDocumentAnalysis] No documents provided for analysis');
       // Optionally return a fallback or throw an error
-      return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+      return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     }
 
     // Check Flux AI configuration first
     if (!fluxAiConfig.isConfigured()) {
         console.warn('[startDocumentAnalysis] Flux AI is not configured. Generating fallback questions.');
-        return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+        return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     }
 
     // --- Upload files to Flux AI if they don't have a fluxAiFileId ---
-    const fileUploadPromises = documents.map(async (document) => {
+    let uploadsDone = 0;
+    onStage('upload', { completed: 0, total: documents.length });
+
+    const uploadDocument = async (document) => {
         // If file already has an ID, skip upload
         if (document.fluxAiFileId) {
             console.log(`[startDocumentAnalysis] Document ${document.id} already has FluxAI ID: ${document.fluxAiFileId}`);
@@ -859,14 +868,26 @@ async function startDocumentAnalysis(documents, documentType, userId, templateIn
             });
             return null;
         }
-    });
+    };
+
+    // Upload in parallel, a few files at a time
+    const uploadResults = new Array(documents.length).fill(null);
+    let nextDocument = 0;
+    const uploadWorker = async () => {
+      while (nextDocument < documents.length) {
+        const index = nextDocument++;
+        uploadResults[index] = await uploadDocument(documents[index]);
+        onStage('upload', { completed: ++uploadsDone, total: documents.length });
+      }
+    };
+    await Promise.all(Array.from({ length: Math.min(uploadConcurrency, documents.length) }, uploadWorker));
 
-    const fileIds = (await Promise.all(fileUploadPromises)).filter(id => id !== null); // Filter out nulls from failed uploads
+    const fileIds = uploadResults.filter(id => id !== null); // Filter out nulls from failed uploads
     console.log('[startDocumentAnalysis] Valid FluxAI File IDs for analysis:', fileIds);
 
     if (fileIds.length > 0) {
       // Call the main analysis function with valid file IDs and templateInfo
-      return await analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documents, templateInfo);
+      return await analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documents, templateInfo, options);
     } else {
       console.error('[startDocumentAnalysis] No valid files could be prepared for AI analysis.');
       // Update status for all documents attempted
@@ -877,7 +898,7 @@ async function startDocumentAnalysis(documents, documentType, userId, templateIn
       );
        // Return a fallback template if no files are ready
        console.warn('[startDocumentAnalysis] Creating fallback template as no files are ready for AI.');
-       return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+       return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     }
   } catch (error) {
     console.error('[startDocumentAnalysis] Error:', error);
@@ -889,7 +910,7 @@ async function startDocumentAnalysis(documents, documentType, userId, templateIn
      );
      // Attempt fallback creation on error
      console.warn('[startDocumentAnalysis] Creating fallback template due to error.');
-     return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+     return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
   }
 }
 
@@ -1820,165 +1841,10 @@ function balanceQuestionsByPerspective(questions, perspectiveSettings = {}) {
   return balancedQuestions;
 }
 
-// Function to implement two-step approach for question generation
-async function tryTwoStepQuestionGeneration(fileIds, documentType, templateInfo = {}) {
-  try {
-    console.log('Attempting two-step question generation approach...');
-    // Step 1: Extract key themes from the document
-    const extractThemesPrompt = `
-    Analyze the attached document and extract 5-8 key leadership themes or competencies.
-    Return ONLY a numbered list of themes with brief descriptions.
-    Do not provide any additional explanations or analysis.
-    `;
-
-    const themesResponse = await axios.post(
-      `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-      {
-        messages: [
-          {
-            role: "system",
-            content: "You are an expert in document analysis. Extract only the key themes from the document without additional commentary."
-          },
-          {
-            role: "user",
-            content: extractThemesPrompt
-          }
-        ],
-        stream: false,
-        attachments: {
-          tags: [documentType],
-          files: fileIds
-        }
-      },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': fluxAiConfig.apiKey
-        }
-      }
-    );
-
-    // Extract themes from response
-    let themesText = "";
-    if (themesResponse.data && 
-        themesResponse.data.choices && 
-        themesResponse.data.choices.length > 0) {
-      
-      const message = themesResponse.data.choices[0].message;
-      
-      if (typeof message === 'object' && message.content) {
-        themesText = message.content;
-      } else if (typeof message === 'string') {
-        themesText = message;
-      } else if (typeof themesResponse.data.choices[0].message === 'string') {
-        themesText = themesResponse.data.choices[0].message;
-      }
-    }
-
-    if (!themesText) {
-      console.log('Failed to extract themes from document');
-      return null;
-    }
-
-    console.log('Extracted themes:', themesText);
-
-    // Step 2: Generate questions based on the extracted themes
-    const generateQuestionsPrompt = `
-    Based on the following themes extracted from a leadership document:
-    
-    ${themesText}
-    
-    Generate specific 360-degree feedback questions for the following perspectives:
-    - Manager Assessment (4 questions)
-    - Peer Assessment (4 questions)
-    - Direct Report Assessment (4 questions)
-    - Self Assessment (4 questions)
-    
-    Format each question exactly as follows:
-    
-    MANAGER ASSESSMENT:
-    Question: [Question text]
-    Type: [rating or open_ended]
-    Category: [Category name]
-    
-    PEER ASSESSMENT:
-    Question: [Question text]
-    Type: [rating or open_ended]
-    Category: [Category name]
-    
-    And so on for each perspective.
-    
-    Include both rating-scale questions and open-ended questions for each perspective.
-    The questions should directly relate to the themes.
-    DO NOT include any explanations or additional text.
-    `;
-
-    // Set additional context if available
-    const { name, department, purpose } = templateInfo || {};
-    let contextAddition = "";
-    
-    if (purpose || department || name) {
-      contextAddition = `\n\nAdditional context:`;
-      if (name) contextAddition += `\n- Template Name: ${name}`;
-      if (department) contextAddition += `\n- Department/Function: ${department}`;
-      if (purpose) contextAddition += `\n- Purpose: ${purpose}`;
-    }
-
-    const questionsResponse = await axios.post(
-      `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-      {
-        messages: [
-          {
-            role: "system",
-            content: "You are an expert in creating 360-degree feedback questions. Generate ONLY the questions in exactly the format requested. Do not provide any other explanations or text."
-          },
-          {
-            role: "user",
-            content: generateQuestionsPrompt + contextAddition
-          }
-        ],
-        stream: false
-      },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': fluxAiConfig.apiKey
-        }
-      }
-    );
-
-    // Extract questions from response
-    let questionsText = "";
-    if (questionsResponse.data && 
-        questionsResponse.data.choices && 
-        questionsResponse.data.choices.length > 0) {
-      
-      const message = questionsResponse.data.choices[0].message;
-      
-      if (typeof message === 'object' && message.content) {
-        questionsText = message.content;
-      } else if (typeof message === 'string') {
-        questionsText = message;
-      } else if (typeof questionsResponse.data.choices[0].message === 'string') {
-        questionsText = questionsResponse.data.choices[0].message;
-      }
-    }
-
-    if (!questionsText) {
-      console.log('Failed to generate questions based on themes');
-      return null;
-    }
-
-    console.log('Generated questions with two-step approach');
-    return questionsText;
-  } catch (error) {
-    console.error('Error in two-step question generation:', error);
-    return null;
-  }
-}
-
 // Analyze documents with Flux AI 
-async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documents, templateInfo = {}) {
+async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documents, templateInfo = {}, options = {}) {
+  const { onStage = () => {}, onTemplateCreated } = options;
+
   try {
     console.log('[analyzeDocumentsWithFluxAI] Starting analysis...');
     console.log('[analyzeDocumentsWithFluxAI] File IDs:', fileIds);
@@ -1998,7 +1864,7 @@ async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documen
     // Validate file IDs
     if (!fileIds || fileIds.length === 0) {
       console.error('[analyzeDocumentsWithFluxAI] No valid file IDs provided.');
-      return createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+      return createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     }
 
     // --- Create PRIMARY Prompt ---
@@ -2017,6 +1883,7 @@ async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documen
         attachments: { files: fileIds, tags: [documentType, "feedback"] }, mode: 'rag'
     };
     console.log('[analyzeDocumentsWithFluxAI] Making PRIMARY AI request...');
+    onStage('analysis', { files: fileIds.length });
     // Uses makeAiChatRequest from the service
     const response = await makeAiChatRequest(requestPayload);
     console.log('[analyzeDocumentsWithFluxAI] PRIMARY AI response received.');
@@ -2032,7 +1899,7 @@ async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documen
     // Handle no response or AI refusal
     if (!aiResponseText || aiResponseText.toLowerCase().includes("don't see any attached document")) {
       console.warn('[analyzeDocumentsWithFluxAI] No valid AI response content or AI could not see document. Using fallback.');
-      return createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+      return createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     }
     console.log('[analyzeDocumentsWithFluxAI] AI response sample:', aiResponseText.substring(0, 300) + "...");
 
@@ -2084,6 +1951,13 @@ async function analyzeDocumentsWithFluxAI(fileIds, documentType, userId, documen
     console.log(`[analyzeDocumentsWithFluxAI] Insufficient perspectives: ${insufficientPerspectives.map(p => p.perspective).join(', ') || 'None'}`);
 
     // --- Handle Missing Perspectives with Secondary Call ---
+    if (missingPerspectives.length > 0 || insufficientPerspectives.length > 0) {
+      onStage('supplement', {
+        missing: missingPerspectives.length,
+        insufficient: insufficientPerspectives.length
+      });
+    }
+
     if (missingPerspectives.length > 0) {
       console.log(`[analyzeDocumentsWithFluxAI] Making secondary call for missing perspectives: ${missingPerspectives.join(', ')}`);
       
@@ -2326,97 +2200,108 @@ ONLY generate questions for these perspectives: ${insufficientPerspectives.map(p
     }
 
     // --- Create Template in Database ---
+    onStage('save');
     console.log('[analyzeDocumentsWithFluxAI] Creating template record...');
     
-    const template = await Template.create({
-      name: templateInfo.name || `${documentType.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase())} Template`,
-      description: templateInfo.description || 'Generated from document analysis',
-      purpose: templateInfo.purpose || '',
-      department: departmentName,
-      documentType,
-      generatedBy: 'flux_ai',
-      status: 'pending_review',
-      perspectiveSettings,
-      createdBy: userId,
-      lastAnalysisDate: new Date()
-    });
+    // The template, its questions and links are saved together, so a retried
+    // job never finds a half-saved template
+    const template = await sequelize.transaction({ type: Transaction.TYPES.IMMEDIATE }, async (transaction) => {
+      const template = await Template.create({
+        name: templateInfo.name || `${documentType.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase())} Template`,
+        description: templateInfo.description || 'Generated from document analysis',
+        purpose: templateInfo.purpose || '',
+        department: departmentName,
+        documentType,
+        generatedBy: 'flux_ai',
+        status: 'pending_review',
+        perspectiveSettings,
+        createdBy: userId,
+        lastAnalysisDate: new Date()
+      }, { transaction });
     
-    console.log(`[analyzeDocumentsWithFluxAI] Template created with ID: ${template.id}`);
+      console.log(`[analyzeDocumentsWithFluxAI] Template created with ID: ${template.id}`);
 
-    // --- Flatten and Insert Questions ---
-    console.log('[analyzeDocumentsWithFluxAI] Inserting questions...');
+      // --- Flatten and Insert Questions ---
+      console.log('[analyzeDocumentsWithFluxAI] Inserting questions...');
     
-    let questionOrder = 1;
-    const allQuestionsToInsert = [];
+      let questionOrder = 1;
+      const allQuestionsToInsert = [];
     
-    // Ensure consistent perspective order in the final output
-    const perspectiveOrder = ['manager', 'peer', 'direct_report', 'self', 'external'];
+      // Ensure consistent perspective order in the final output
+      const perspectiveOrder = ['manager', 'peer', 'direct_report', 'self', 'external'];
     
-    // Build the final list of questions with ordered indexes
-    for (const perspective of perspectiveOrder) {
-      if (finalQuestionsMap[perspective]) {
-        // Add all questions for this perspective
-        finalQuestionsMap[perspective].forEach((question, index) => {
-          allQuestionsToInsert.push({
-            ...question,
-            order: questionOrder++,
-            perspective: perspective,
-            templateId: template.id
+      // Build the final list of questions with ordered indexes
+      for (const perspective of perspectiveOrder) {
+        if (finalQuestionsMap[perspective]) {
+          // Add all questions for this perspective
+          finalQuestionsMap[perspective].forEach((question, index) => {
+            allQuestionsToInsert.push({
+              ...question,
+              order: questionOrder++,
+              perspective: perspective,
+              templateId: template.id
+            });
           });
-        });
+        }
       }
-    }
 
-    console.log(`[analyzeDocumentsWithFluxAI] Applying question type mix before insertion...`);
-    // Overwrite allQuestionsToInsert with the result of the mixer function
-    const finalMixedQuestions = applyQuestionMix(
-        allQuestionsToInsert, // Pass the list we just created
-        perspectiveSettings, // Pass the settings used earlier
-        templateInfo.questionMixPercentage // Pass the percentage
-    );
+      console.log(`[analyzeDocumentsWithFluxAI] Applying question type mix before insertion...`);
+      // Overwrite allQuestionsToInsert with the result of the mixer function
+      const finalMixedQuestions = applyQuestionMix(
+          allQuestionsToInsert, // Pass the list we just created
+          perspectiveSettings, // Pass the settings used earlier
+          templateInfo.questionMixPercentage // Pass the percentage
+      );
     
-    console.log(`[analyzeDocumentsWithFluxAI] Inserting ${allQuestionsToInsert.length} total questions`);
+      console.log(`[analyzeDocumentsWithFluxAI] Inserting ${allQuestionsToInsert.length} total questions`);
     
-    // Insert all questions
-    for (const question of allQuestionsToInsert) {
-      await Question.create({
-        text: question.text,
-        type: question.type || 'rating',
-        category: question.category || 'General',
-        perspective: question.perspective,
-        required: question.required !== undefined ? question.required : true,
-        order: question.order,
-        templateId: template.id
-      });
-    }
+      // Insert all questions
+      for (const question of allQuestionsToInsert) {
+        await Question.create({
+          text: question.text,
+          type: question.type || 'rating',
+          category: question.category || 'General',
+          perspective: question.perspective,
+          required: question.required !== undefined ? question.required : true,
+          order: question.order,
+          templateId: template.id
+        }, { transaction });
+      }
 
-    // --- Link Source Documents ---
-    console.log('[analyzeDocumentsWithFluxAI] Linking source documents...');
+      // --- Link Source Documents ---
+      console.log('[analyzeDocumentsWithFluxAI] Linking source documents...');
     
-    for (const document of documents) {
-      if (document?.id) {
-        await SourceDocument.create({
-          fluxAiFileId: document.fluxAiFileId || null,
-          documentId: document.id,
-          templateId: template.id
-        });
+      for (const document of documents) {
+        if (document?.id) {
+          await SourceDocument.create({
+            fluxAiFileId: document.fluxAiFileId || null,
+            documentId: document.id,
+            templateId: template.id
+          }, { transaction });
+        }
       }
-    }
 
-    // --- Update Document Status ---
-    console.log('[analyzeDocumentsWithFluxAI] Updating document status...');
+      // --- Update Document Status ---
+      console.log('[analyzeDocumentsWithFluxAI] Updating document status...');
     
-    for (const document of documents) {
-      if (document?.id) {
-        await Document.update(
-          { 
-            status: 'analysis_complete', 
-            associatedTemplateId: template.id 
-          },
-          { where: { id: document.id } }
-        );
+      for (const document of documents) {
+        if (document?.id) {
+          await Document.update(
+            { 
+              status: 'analysis_complete', 
+              associatedTemplateId: template.id 
+            },
+            { where: { id: document.id }, transaction }
+          );
+        }
       }
-    }
+
+      if (onTemplateCreated) {
+        await onTemplateCreated(template, transaction);
+      }
+
+      return template;
+    });
 
     console.log(`[analyzeDocumentsWithFluxAI] Template generation complete: ${template.id}`);
     return template;
@@ -2427,7 +2312,7 @@ ONLY generate questions for these perspectives: ${insufficientPerspectives.map(p
     // Try to create a fallback template
     try {
       console.warn('[analyzeDocumentsWithFluxAI] Creating fallback template after error');
-      return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo);
+      return await createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo, options);
     } catch (fallbackError) {
       console.error('[analyzeDocumentsWithFluxAI] Error creating fallback template:', fallbackError);
       
@@ -2446,101 +2331,6 @@ ONLY generate questions for these perspectives: ${insufficientPerspectives.map(p
   }
 }
 
-// A retry function to handle cases where the AI doesn't follow the format
-async function retryWithSimplifiedPrompt(fileIds, documentType, templateInfo) {
-  try {
-    console.log('Retrying with simplified prompt...');
-    
-    // Create a simpler, more direct prompt
-    const simplifiedPrompt = `GENERATE EXACTLY THE FOLLOWING AND NOTHING ELSE:
-
-MANAGER ASSESSMENT:
-Question: [question about leadership]
-Type: rating
-Category: [relevant category]
-
-Question: [another question]
-Type: [rating or open_ended]
-Category: [relevant category]
-
-PEER ASSESSMENT:
-Question: [question for peers]
-Type: rating
-Category: [relevant category]
-
-Question: [another question]
-Type: [rating or open_ended]
-Category: [relevant category]
-
-DIRECT REPORT ASSESSMENT:
-Question: [question for direct reports]
-Type: rating
-Category: [relevant category]
-
-Question: [another question]
-Type: [rating or open_ended]
-Category: [relevant category]
-
-SELF ASSESSMENT:
-Question: [question for self-assessment]
-Type: rating
-Category: [relevant category]
-
-Question: [another question]
-Type: [rating or open_ended]
-Category: [relevant category]`;
-
-    // Set up request
-    const messages = [
-      {
-        role: "system",
-        content: "You are a question generator. Follow these instructions EXACTLY."
-      },
-      {
-        role: "user",
-        content: simplifiedPrompt
-      }
-    ];
-    
-    const requestPayload = {
-      messages: messages,
-      stream: false,
-      attachments: {
-        tags: [documentType],
-        files: fileIds
-      }
-    };
-    
-    const response = await axios.post(
-      `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`, 
-      requestPayload, 
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': fluxAiConfig.apiKey
-        }
-      }
-    );
-    
-    // Extract the AI response text
-    let aiResponseText = "";
-    if (response.data && response.data.choices && response.data.choices.length > 0) {
-      const message = response.data.choices[0].message;
-      
-      if (typeof message === 'object' && message.content) {
-        aiResponseText = message.content;
-      } else if (typeof message === 'string') {
-        aiResponseText = message;
-      }
-    }
-    
-    return aiResponseText;
-  } catch (error) {
-    console.error('Error in retry attempt:', error);
-    return null;
-  }
-}
-
 // Get all documents
 exports.getAllDocuments = async (req, res) => {
   try {
@@ -2559,6 +2349,22 @@ exports.getAllDocuments = async (req, res) => {
   }
 };
 
+// Get the status of a document analysis job
+exports.getAnalysisJob = async (req, res) => {
+  try {
+    const job = await analysisJobs.getJob(req.params.jobId, req.user.id);
+
+    if (!job) {
+      return res.status(404).json({ message: 'Analysis job not found' });
+    }
+
+    res.status(200).json(job);
+  } catch (error) {
+    console.error('Error fetching analysis job:', error);
+    res.status(500).json({ message: 'Failed to fetch analysis job', error: error.message });
+  }
+};
+
 // Get document by ID
 exports.getDocumentById = async (req, res) => {
   try {
@@ -2613,18 +2419,13 @@ exports.deleteDocument = async (req, res) => {
     
     // If document was uploaded to FluxAI and we have an API key, delete it there too
     if (document.fluxAiFileId && fluxAiConfig.isConfigured() && !document.fluxAiFileId.startsWith('dev-mode-')) {
-      try {
-        const axios = require('axios');
-        // Use the correct endpoint from the documentation: /v1/files/{file_id}
-        await axios.delete(`${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.files}/${document.fluxAiFileId}`, {
-          headers: {
-            'X-API-KEY': fluxAiConfig.apiKey  // Use X-API-KEY as per documentation
-          }
-        });
+      // Goes through the shared AI client and frees the cached storage information
+      const result = await deleteFluxAiFile(document.fluxAiFileId);
+      if (result.success) {
         console.log('Successfully deleted file from FluxAI:', document.fluxAiFileId);
-      } catch (aiError) {
-        console.error('Error deleting file from FluxAI:', aiError);
+      } else {
         // Continue with deletion even if FluxAI deletion fails
+        console.error('Error deleting file from FluxAI:', result.error);
       }
     }
     
@@ -3343,163 +3144,6 @@ function addGenericFallbackQuestions(questions, perspective, startOrder, count)
   // Similar implementation
 }
 
-// This implements a two-step approach if the first attempt fails
-async function tryTwoStepQuestionGeneration(fileIds, documentType, templateInfo = {}) {
-  try {
-    console.log('Attempting two-step question generation approach...');
-    // Step 1: Extract key themes from the document
-    const extractThemesPrompt = `
-    Analyze the attached document and extract 5-8 key leadership themes or competencies.
-    Return ONLY a numbered list of themes with brief descriptions.
-    Do not provide any additional explanations or analysis.
-    `;
-
-    const themesResponse = await axios.post(
-      `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-      {
-        messages: [
-          {
-            role: "system",
-            content: "You are an expert in document analysis. Extract only the key themes from the document without additional commentary."
-          },
-          {
-            role: "user",
-            content: extractThemesPrompt
-          }
-        ],
-        stream: false,
-        attachments: {
-          tags: [documentType],
-          files: fileIds
-        }
-      },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': fluxAiConfig.apiKey
-        }
-      }
-    );
-
-    // Extract themes from response
-    let themesText = "";
-    if (themesResponse.data && 
-        themesResponse.data.choices && 
-        themesResponse.data.choices.length > 0) {
-      
-      const message = themesResponse.data.choices[0].message;
-      
-      if (typeof message === 'object' && message.content) {
-        themesText = message.content;
-      } else if (typeof message === 'string') {
-        themesText = message;
-      } else if (typeof themesResponse.data.choices[0].message === 'string') {
-        themesText = themesResponse.data.choices[0].message;
-      }
-    }
-
-    if (!themesText) {
-      console.log('Failed to extract themes from document');
-      return null;
-    }
-
-    console.log('Extracted themes:', themesText);
-
-    // Step 2: Generate questions based on the extracted themes
-    const generateQuestionsPrompt = `
-    Based on the following themes extracted from a leadership document:
-    
-    ${themesText}
-    
-    Generate specific 360-degree feedback questions for the following perspectives:
-    - Manager Assessment (4 questions)
-    - Peer Assessment (4 questions)
-    - Direct Report Assessment (4 questions)
-    - Self Assessment (4 questions)
-    
-    Format each question exactly as follows:
-    
-    MANAGER ASSESSMENT:
-    Question: [Question text]
-    Type: [rating or open_ended]
-    Category: [Category name]
-    
-    PEER ASSESSMENT:
-    Question: [Question text]
-    Type: [rating or open_ended]
-    Category: [Category name]
-    
-    And so on for each perspective.
-    
-    Include both rating-scale questions and open-ended questions for each perspective.
-    The questions should directly relate to the themes.
-    DO NOT include any explanations or additional text.
-    `;
-
-    // Set additional context if available
-    const { name, department, purpose } = templateInfo || {};
-    let contextAddition = "";
-    
-    if (purpose || department || name) {
-      contextAddition = `\n\nAdditional context:`;
-      if (name) contextAddition += `\n- Template Name: ${name}`;
-      if (department) contextAddition += `\n- Department/Function: ${department}`;
-      if (purpose) contextAddition += `\n- Purpose: ${purpose}`;
-    }
-
-    const questionsResponse = await axios.post(
-      `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-      {
-        messages: [
-          {
-            role: "system",
-            content: "You are an expert in creating 360-degree feedback questions. Generate ONLY the questions in exactly the format requested. Do not provide any other explanations or text."
-          },
-          {
-            role: "user",
-            content: generateQuestionsPrompt + contextAddition
-          }
-        ],
-        stream: false
-      },
-      {
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': fluxAiConfig.apiKey
-        }
-      }
-    );
-
-    // Extract questions from response
-    let questionsText = "";
-    if (questionsResponse.data && 
-        questionsResponse.data.choices && 
-        questionsResponse.data.choices.length > 0) {
-      
-      const message = questionsResponse.data.choices[0].message;
-      
-      if (typeof message === 'object' && message.content) {
-        questionsText = message.content;
-      } else if (typeof message === 'string') {
-        questionsText = message;
-      } else if (typeof questionsResponse.data.choices[0].message === 'string') {
-        questionsText = questionsResponse.data.choices[0].message;
-      }
-    }
-
-    if (!questionsText) {
-      console.log('Failed to generate questions based on themes');
-      return null;
-    }
-
-    console.log('Generated questions with two-step approach');
-    return questionsText;
-  } catch (error) {
-    console.error('Error in two-step question generation:', error);
-    return null;
-  }
-}
-
 // Add these helper functions for the fallback questions by document type
 // Place these functions after the generateFallbackQuestions function
 
@@ -4282,70 +3926,81 @@ function addGenericFallbackQuestions(questions, perspective, startOrder) {
 }
 
 // Function to create template with fallback questions
-async function createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo = {}) {
+async function createTemplateWithFallbackQuestions(documentType, userId, documents, templateInfo = {}, options = {}) {
+  const { onTemplateCreated } = options;
+
   try {
     console.log('Creating template with fallback questions');
     
-    // Create the template with all provided information
-    const template = await Template.create({
-      name: templateInfo.name || `${documentType.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase())} Template`,
-      description: templateInfo.description || 'Generated with standard questions',
-      purpose: templateInfo.purpose || '',
-      department: templateInfo.department || '',
-      documentType,
-      perspectiveSettings: templateInfo.perspectiveSettings || {
-        manager: { questionCount: 10, enabled: true },
-        peer: { questionCount: 10, enabled: true },
-        direct_report: { questionCount: 10, enabled: true },
-        self: { questionCount: 10, enabled: true },
-        external: { questionCount: 5, enabled: false }
-      },
-      generatedBy: 'flux_ai_fallback',
-      createdBy: userId,
-      status: 'pending_review'
-    });
+    // The template, its questions and links are saved together
+    const template = await sequelize.transaction({ type: Transaction.TYPES.IMMEDIATE }, async (transaction) => {
+      // Create the template with all provided information
+      const template = await Template.create({
+        name: templateInfo.name || `${documentType.replace(/_/g, ' ').replace(/\b\w/g, c => c.toUpperCase())} Template`,
+        description: templateInfo.description || 'Generated with standard questions',
+        purpose: templateInfo.purpose || '',
+        department: templateInfo.department || '',
+        documentType,
+        perspectiveSettings: templateInfo.perspectiveSettings || {
+          manager: { questionCount: 10, enabled: true },
+          peer: { questionCount: 10, enabled: true },
+          direct_report: { questionCount: 10, enabled: true },
+          self: { questionCount: 10, enabled: true },
+          external: { questionCount: 5, enabled: false }
+        },
+        generatedBy: 'flux_ai_fallback',
+        createdBy: userId,
+        status: 'pending_review'
+      }, { transaction });
     
-    // Check if we're dealing with marketing strategy questions
-    let fallbackQuestions;
-    if (documentType === 'leadership_model' && 
-        (templateInfo.department || '').toLowerCase().includes('market') &&
-        (templateInfo.description || '').toLowerCase().includes('strategy')) {
-      console.log('Using specialized marketing strategy questions');
-      fallbackQuestions = getMarketingStrategyQuestions(templateInfo);
-    } else {
-      // Generate fallback questions with all template information
-      fallbackQuestions = generateFallbackQuestions(documentType, templateInfo.perspectiveSettings, templateInfo);
-    }
+      // Check if we're dealing with marketing strategy questions
+      let fallbackQuestions;
+      if (documentType === 'leadership_model' && 
+          (templateInfo.department || '').toLowerCase().includes('market') &&
+          (templateInfo.description || '').toLowerCase().includes('strategy')) {
+        console.log('Using specialized marketing strategy questions');
+        fallbackQuestions = getMarketingStrategyQuestions(templateInfo);
+      } else {
+        // Generate fallback questions with all template information
+        fallbackQuestions = generateFallbackQuestions(documentType, templateInfo.perspectiveSettings, templateInfo);
+      }
     
-    // Create questions for the template
-    await Promise.all(
-      fallbackQuestions.map(async (q) => {
-        return Question.create({
-          ...q,
-          templateId: template.id
-        });
-      })
-    );
+      // Create questions for the template
+      await Promise.all(
+        fallbackQuestions.map(async (q) => {
+          return Question.create({
+            ...q,
+            templateId: template.id
+          }, { transaction });
+        })
+      );
     
-    // Create source document references
-    await Promise.all(
-      documents.map(async (doc) => {
-        return SourceDocument.create({
-          fluxAiFileId: doc.fluxAiFileId,
-          documentId: doc.id,
-          templateId: template.id
-        });
-      })
-    );
+      // Create source document references
+      await Promise.all(
+        documents.map(async (doc) => {
+          return SourceDocument.create({
+            fluxAiFileId: doc.fluxAiFileId,
+            documentId: doc.id,
+            templateId: template.id
+          }, { transaction });
+        })
+      );
     
-    // Update documents with analysis complete status
-    await Document.update(
-      { 
-        status: 'analysis_complete',
-        associatedTemplateId: template.id
-      },
-      { where: { id: documents.map(doc => doc.id) } }
-    );
+      // Update documents with analysis complete status
+      await Document.update(
+        { 
+          status: 'analysis_complete',
+          associatedTemplateId: template.id
+        },
+        { where: { id: documents.map(doc => doc.id) }, transaction }
+      );
+
+      if (onTemplateCreated) {
+        await onTemplateCreated(template, transaction);
+      }
+
+      return template;
+    });
     
     console.log('Fallback template created with ID:', template.id);
     return template;
@@ -4367,131 +4022,17 @@ async function createTemplateWithFallbackQuestions(documentType, userId, documen
 // Test Flux AI API connectivity
 exports.testFluxAiApi = async (req, res) => {
   try {
-    const axios = require('axios');
-    const fluxAiConfig = require('../config/flux-ai');
-    
     console.log('Testing Flux AI API connectivity...');
     
-    // First, try to get available models
-    let modelsResponse;
-    try {
-      modelsResponse = await axios.get(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`,
-        {
-          headers: {
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Models API response:', modelsResponse.data);
-    } catch (modelsError) {
-      console.error('Models API error:', modelsError.message);
-      
-      // Try with different auth
-      try {
-        modelsResponse = await axios.get(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`,
-          {
-            headers: {
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Models API response with Bearer auth:', modelsResponse.data);
-      } catch (bearerError) {
-        console.error('Models API error with Bearer auth:', bearerError.message);
-      }
-    }
-    
-    // Second, try to get balance
-    let balanceResponse;
-    try {
-      balanceResponse = await axios.get(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`,
-        {
-          headers: {
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Balance API response:', balanceResponse.data);
-    } catch (balanceError) {
-      console.error('Balance API error:', balanceError.message);
-      
-      // Try with different auth
-      try {
-        balanceResponse = await axios.get(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`,
-          {
-            headers: {
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Balance API response with Bearer auth:', balanceResponse.data);
-      } catch (bearerError) {
-        console.error('Balance API error with Bearer auth:', bearerError.message);
-      }
-    }
-    
-    // Third, make a simple chat request without files
-    let chatResponse;
-    try {
-      chatResponse = await axios.post(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-        {
-          messages: [
-            {
-              role: "user",
-              content: "Hello, can you tell me how to attach files to API requests?"
-            }
-          ],
-          stream: false
-        },
-        {
-          headers: {
-            'Content-Type': 'application/json',
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Chat API response:', chatResponse.data);
-    } catch (chatError) {
-      console.error('Chat API error:', chatError.message);
-      
-      // Try with different auth
-      try {
-        chatResponse = await axios.post(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-          {
-            messages: [
-              {
-                role: "user",
-                content: "Hello, can you tell me how to attach files to API requests?"
-              }
-            ],
-            stream: false
-          },
-          {
-            headers: {
-              'Content-Type': 'application/json',
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Chat API response with Bearer auth:', chatResponse.data);
-      } catch (bearerError) {
-        console.error('Chat API error with Bearer auth:', bearerError.message);
-      }
-    }
+    const { models, balance, chat } = await testFluxAiConnectivity();
     
     // Return results
     res.status(200).json({
       message: 'API test completed',
       endpoints: {
-        models: modelsResponse?.data || null,
-        balance: balanceResponse?.data || null,
-        chat: chatResponse?.data || null
+        models,
+        balance,
+        chat
       }
     });
   } catch (error) {
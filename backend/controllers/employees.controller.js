@@ -1,223 +1,109 @@
 // backend/controllers/employees.controller.js
 
-const path = require('path');
 const fs = require('fs');
-const csv = require('csv');
-const xlsx = require('xlsx');
 const { v4: uuidv4 } = require('uuid');
 const { Employee, sequelize } = require('../models');
-const { processEmployeeFile } = require('../services/import.service');
+const { processEmployeeFile, getImportProgress } = require('../services/import.service');
 
 // Import employees from file
 exports.importEmployees = async (req, res) => {
-  try {
-    if (!req.file) {
-      return res.status(400).json({ message: 'No file uploaded' });
-    }
+  if (!req.file) {
+    return res.status(400).json({ message: 'No file uploaded' });
+  }
 
-    const filePath = req.file.path;
-    const fileExt = path.extname(req.file.originalname).toLowerCase();
-    
-    // Generate a unique batch ID for this import
-    const importBatch = uuidv4();
-    
-    let data = [];
-    let successCount = 0;
-    let updateCount = 0;
-    let errorRecords = [];
-    let duplicateRecords = [];
-    
-    // Process CSV files
-    if (fileExt === '.csv') {
-      // Use our custom CSV parser instead of the csv package
-      data = await parseCSV(filePath);
-    } 
-    // Process Excel files (xlsx, xls)
-    else if (fileExt === '.xlsx' || fileExt === '.xls') {
-      const workbook = xlsx.readFile(filePath);
-      const sheetName = workbook.SheetNames[0];
-      const worksheet = workbook.Sheets[sheetName];
-      
-      // Convert Excel to JSON with header row
-      data = xlsx.utils.sheet_to_json(worksheet, { raw: false, defval: '' });
-    } else {
-      return res.status(400).json({ message: 'Unsupported file format' });
+  const filePath = req.file.path;
+  
+  // The batch ID stored on employees is always generated here. Clients may pass
+  // their own import ID to poll progress while the request runs; it is only
+  // visible to the user who started the import.
+  const importBatch = uuidv4();
+  const importId = /^[A-Za-z0-9-]{8,64}$/.test(req.body.importId || '') ? req.body.importId : importBatch;
+  
+  const running = getImportProgress(importId, req.user.id);
+  if (running && running.status === 'processing') {
+    await fs.promises.unlink(filePath).catch(err => console.error('Error deleting temporary file:', err));
+    return res.status(409).json({ message: 'An import with this ID is already running' });
+  }
+  
+  try {
+    // Explicit column mapping from the import wizard; without it the header row is used
+    let mapping = null;
+    if (req.body.columnMapping) {
+      try {
+        mapping = JSON.parse(req.body.columnMapping);
+      } catch (parseError) {
+        return res.status(400).json({ message: 'Invalid column mapping' });
+      }
     }
     
-    // If no data found
-    if (!data || data.length === 0) {
-      return res.status(400).json({ message: 'No data found in file' });
-    }
+    const startRow = parseInt(req.body.startRow, 10) || 2;
+    const updateExisting = req.body.updateExisting !== 'false' && req.body.updateExisting !== false;
     
-    console.log('Raw data sample:', data.slice(0, 2));
+    console.log(`[IMPORT] Starting employee import ${importBatch} from ${req.file.originalname}`);
     
-    // Standardize field names (map Excel/CSV headers to DB fields)
-    const standardizedData = data.map((record, index) => {
-      // Get all keys from the record
-      const keys = Object.keys(record);
-      
-      // Create a new standardized record
-      const standardized = {};
-      
-      // Map known fields with various possible names to standard field names
-      // This is a critical section that handles different header naming conventions
-      for (const key of keys) {
-        const lowerKey = key.toLowerCase().trim();
-        
-        if (lowerKey === 'id' || lowerKey === 'employee id' || lowerKey === 'employeeid' || lowerKey === 'employee_id') {
-          standardized.employeeId = record[key].toString().trim();
-        }
-        else if (lowerKey === 'firstname' || lowerKey === 'first name' || lowerKey === 'first_name' || lowerKey === 'fname') {
-          standardized.firstName = record[key].toString().trim();
-        }
-        else if (lowerKey === 'lastname' || lowerKey === 'last name' || lowerKey === 'last_name' || lowerKey === 'lname' || lowerKey === 'second name') {
-          standardized.lastName = record[key].toString().trim();
-        }
-        else if (lowerKey === 'email' || lowerKey === 'email address' || lowerKey === 'emailaddress') {
-          standardized.email = record[key].toString().trim();
-        }
-        else if (lowerKey === 'job title' || lowerKey === 'jobtitle' || lowerKey === 'title' || lowerKey === 'position') {
-          standardized.jobTitle = record[key].toString().trim();
-        }
-        else if (lowerKey === 'department' || lowerKey === 'function' || lowerKey === 'mainfunction') {
-          standardized.mainFunction = record[key].toString().trim();
-        }
-        else if (lowerKey === 'subfunction' || lowerKey === 'sub function' || lowerKey === 'sub-function') {
-          standardized.subFunction = record[key].toString().trim();
-        }
-        else if (lowerKey === 'manager id' || lowerKey === 'managerid' || lowerKey === 'manager_id') {
-          standardized.managerId = record[key].toString().trim();
-        }
-        else if (lowerKey === 'level' || lowerKey === 'level identification' || lowerKey === 'levelidentification') {
-          standardized.levelIdentification = record[key].toString().trim();
-        }
-        else if (lowerKey === 'role') {
-          standardized.role = record[key].toString().trim();
-          // Also use Role as jobTitle if no specific job title is provided
-          if (!standardized.jobTitle) {
-            standardized.jobTitle = record[key].toString().trim();
-          }
-        }
+    const result = await processEmployeeFile({
+      filePath,
+      mapping,
+      startRow,
+      updateExisting,
+      batchId: importBatch,
+      importId,
+      userId: req.user.id,
+      onProgress: (progress) => {
+        console.log(`[IMPORT] ${importBatch}: ${progress.total} rows processed (${progress.percent}%)`);
       }
-      
-      // Store original record for debugging
-      standardized._original = record;
-      standardized._rowNumber = index + 2; // +2 because index starts at 0 and we have a header row
-      
-      console.log(`Row ${index + 2} mapped:`, standardized);
-      
-      return standardized;
     });
     
-    // Now process each record
-    for (const record of standardizedData) {
-      try {
-        console.log('Processing record:', record);
-        
-        // Skip if missing required fields
-        if (!record.employeeId || !record.firstName || !record.lastName) {
-          console.log('Missing required fields:', { employeeId: record.employeeId, firstName: record.firstName, lastName: record.lastName });
-          errorRecords.push({
-            row: record._rowNumber,
-            error: 'Missing required fields (Employee ID, First Name, or Last Name)',
-            data: record
-          });
-          continue;
-        }
-        
-        // Check email format if provided
-        if (record.email && !validateEmail(record.email)) {
-          console.log('Invalid email format:', record.email);
-          errorRecords.push({
-            row: record._rowNumber,
-            error: 'Invalid email format',
-            data: record
-          });
-          continue;
-        }
-        
-        // Check for duplicate employee ID in current import
-        const isDuplicateInBatch = duplicateRecords.some(
-          dr => dr.employeeId === record.employeeId
-        );
-        
-        if (isDuplicateInBatch) {
-          console.log('Duplicate in batch:', record.employeeId);
-          duplicateRecords.push({
-            row: record._rowNumber,
-            employeeId: record.employeeId,
-            message: 'Duplicate employee ID in import file'
-          });
-          continue;
-        }
-        
-        // Check if employee exists in database
-        const existingEmployee = await Employee.findOne({
-          where: { employeeId: record.employeeId }
-        });
-        
-        if (existingEmployee) {
-          console.log('Updating existing employee:', record.employeeId);
-          // Update existing employee
-          await existingEmployee.update({
-            ...record,
-            importBatch,
-            lastUpdatedAt: new Date()
-          });
-          updateCount++;
-        } else {
-          console.log('Creating new employee:', record.employeeId);
-          // Create new employee
-          await Employee.create({
-            ...record,
-            status: 'active',
-            importBatch,
-            importedAt: new Date()
-          });
-          successCount++;
-        }
-      } catch (error) {
-        console.error(`Error processing record at row ${record._rowNumber}:`, error);
-        errorRecords.push({
-          row: record._rowNumber,
-          error: error.message,
-          data: record
-        });
-      }
-    }
-    
-    // Clean up the uploaded file - using the proper Promise API
-    try {
-      await fs.unlink(filePath);
-    } catch (err) {
-      console.error('Error deleting temporary file:', err);
+    if (result.total === 0) {
+      return res.status(400).json({ message: 'No data found in file' });
     }
     
     return res.status(200).json({
       message: 'Import completed',
-      totalRecords: data.length,
-      newEmployees: successCount,
-      updatedEmployees: updateCount,
-      errors: errorRecords.map(e => ({
+      importBatch,
+      importId,
+      result,
+      totalRecords: result.total,
+      newEmployees: result.inserted,
+      updatedEmployees: result.updated,
+      errors: result.errors.map(e => ({
         row: e.row,
-        error: e.error
+        error: e.message
       })),
-      duplicates: duplicateRecords
+      duplicates: result.duplicates
     });
   } catch (error) {
     console.error('Error importing employees:', error);
-    return res.status(500).json({
-      message: 'Failed to import employees',
+    
+    // Problems with the file or the mapping are the client's to fix
+    const isInputError = /Unsupported file format|not mapped to a column|No data found|Failed to parse/.test(error.message);
+    
+    return res.status(isInputError ? 400 : 500).json({
+      message: isInputError ? error.message : 'Failed to import employees',
       error: error.message
     });
+  } finally {
+    // Clean up the uploaded file
+    try {
+      await fs.promises.unlink(filePath);
+    } catch (err) {
+      console.error('Error deleting temporary file:', err);
+    }
   }
 };
 
-// Helper function to validate email format
-function validateEmail(email) {
-  const re = /^(([^<>()\[\]\\.,;:\s@"]+(\.[^<>()\[\]\\.,;:\s@"]+)*)|(".+"))@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}])|(([a-zA-Z\-0-9]+\.)+[a-zA-Z]{2,}))$/;
-  return re.test(String(email).toLowerCase());
-}
+// Get the progress of a running or recently finished import
+exports.getImportProgress = async (req, res) => {
+  const progress = getImportProgress(req.params.importId, req.user.id);
+  
+  // Other users' imports are reported as not found
+  if (!progress || progress.userId !== req.user.id) {
+    return res.status(404).json({ message: 'Import not found' });
+  }
+  
+  const { userId, ...publicProgress } = progress;
+  res.status(200).json(publicProgress);
+};
 
 // Create a new employee
 exports.createEmployee = async (req, res) => {
@@ -1,9 +1,14 @@
 // backend/controllers/feedback.controller.js
 
 const aiFeedbackService = require('../services/ai-feedback-service');
+const resultSnapshotService = require('../services/result-snapshot.service');
 const { Response, CampaignParticipant, Campaign, Template, Question, Employee, sequelize } = require('../models');
+const { Transaction } = require('sequelize');
 const { v4: uuidv4 } = require('uuid');
 
+// Rows per INSERT statement; 7 bound parameters per row stays well below SQLite's variable limit
+const INSERT_BATCH_SIZE = 100;
+
 /**
  * Controller for handling feedback-related operations
  */
@@ -168,153 +173,135 @@ class FeedbackController {
       
       console.log(`[FEEDBACK] Found participant ${participant.id} with relationship type ${participant.relationshipType}`);
       
-      // Check if the responses table exists
-      try {
-        const tableCheck = await sequelize.query(
-          "SELECT name FROM sqlite_master WHERE type='table' AND name='responses';",
-          { type: sequelize.QueryTypes.SELECT }
-        );
-        console.log(`[FEEDBACK] Responses table check: ${JSON.stringify(tableCheck)}`);
-      } catch (err) {
-        console.error('[FEEDBACK] Table check error:', err);
-      }
-      
-      // Manually count existing responses
-      let existingCount = 0;
-      try {
-        const countResult = await sequelize.query(
-          "SELECT COUNT(*) as count FROM responses WHERE participantId = ?",
-          { 
-            replacements: [participant.id],
-            type: sequelize.QueryTypes.SELECT 
-          }
-        );
-        existingCount = countResult[0].count;
-        console.log(`[FEEDBACK] Found ${existingCount} existing responses for this participant`);
-      } catch (err) {
-        console.error('[FEEDBACK] Error counting responses:', err);
-      }
-      
-      // Delete existing responses
-      if (existingCount > 0) {
-        try {
-          await sequelize.query(
-            "DELETE FROM responses WHERE participantId = ?",
+      const answers = responses.filter(response => response.questionId);
+      
+      // The whole submission is one IMMEDIATE transaction: it takes the write
+      // lock up front instead of upgrading a read lock half way through, and a
+      // failure leaves the participant's previous answers untouched.
+      const { savedCount, completionRate } = await sequelize.transaction(
+        { type: Transaction.TYPES.IMMEDIATE },
+        async (transaction) => {
+          // Load existing responses so they can be subtracted from the results snapshot
+          const existingResponses = await sequelize.query(
+            "SELECT questionId, ratingValue, textResponse FROM responses WHERE participantId = ?",
             { 
               replacements: [participant.id],
-              type: sequelize.QueryTypes.DELETE 
+              type: sequelize.QueryTypes.SELECT,
+              transaction
             }
           );
-          console.log(`[FEEDBACK] Deleted ${existingCount} existing responses`);
-        } catch (delErr) {
-          console.error('[FEEDBACK] Error deleting responses:', delErr);
-        }
-      }
-      
-      // Save new responses - using basic INSERT to avoid model issues
-      const savedResponses = [];
-      
-      for (let i = 0; i < responses.length; i++) {
-        const response = responses[i];
-        if (!response.questionId) continue;
-        
-        const responseId = uuidv4();
-        
-        try {
-          console.log(`[FEEDBACK] Saving response ${i+1}/${responses.length} for question ${response.questionId}`);
           
-          // Use direct SQL to insert the response
-          await sequelize.query(
-            `INSERT INTO responses 
-             (id, participantId, questionId, ratingValue, textResponse, campaignId, targetEmployeeId, createdAt, updatedAt) 
-             VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))`,
-            {
-              replacements: [
-                responseId,
+          if (existingResponses.length > 0) {
+            await sequelize.query(
+              "DELETE FROM responses WHERE participantId = ?",
+              { 
+                replacements: [participant.id],
+                type: sequelize.QueryTypes.DELETE,
+                transaction
+              }
+            );
+            console.log(`[FEEDBACK] Replacing ${existingResponses.length} existing responses`);
+          }
+          
+          // Save new responses with multi-row INSERTs - using basic SQL to avoid model issues
+          const savedValues = answers.map(response => ({
+            questionId: response.questionId,
+            ratingValue: response.rating || null,
+            textResponse: response.text || null
+          }));
+          
+          for (let i = 0; i < savedValues.length; i += INSERT_BATCH_SIZE) {
+            const batch = savedValues.slice(i, i + INSERT_BATCH_SIZE);
+            const replacements = [];
+            
+            batch.forEach(value => {
+              replacements.push(
+                uuidv4(),
                 participant.id,
-                response.questionId,
-                response.rating || null,
-                response.text || null,
+                value.questionId,
+                value.ratingValue,
+                value.textResponse,
                 campaignId, // Important: Include campaignId
                 targetEmployeeId
-              ],
-              type: sequelize.QueryTypes.INSERT
+              );
+            });
+            
+            await sequelize.query(
+              `INSERT INTO responses 
+               (id, participantId, questionId, ratingValue, textResponse, campaignId, targetEmployeeId, createdAt, updatedAt) 
+               VALUES ${batch.map(() => "(?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))").join(', ')}`,
+              {
+                replacements,
+                type: sequelize.QueryTypes.INSERT,
+                transaction
+              }
+            );
+          }
+          
+          console.log(`[FEEDBACK] Saved ${savedValues.length} responses`);
+          
+          // Update participant status
+          if (savedValues.length > 0) {
+            await participant.update({
+              status: 'completed',
+              completedAt: new Date()
+            }, { transaction });
+          }
+          
+          // Replace this participant's previous answers in the results snapshot
+          await resultSnapshotService.applyParticipantResponses({
+            campaignId: participant.campaignId,
+            relationshipType: participant.relationshipType,
+            previous: existingResponses,
+            next: savedValues
+          }, { transaction });
+          
+          // Update campaign completion rate from per-status counts
+          const statusCounts = await sequelize.query(
+            "SELECT status, COUNT(*) as count FROM campaign_participants WHERE campaignId = ? GROUP BY status",
+            {
+              replacements: [campaignId],
+              type: sequelize.QueryTypes.SELECT,
+              transaction
             }
           );
           
-          savedResponses.push(responseId);
-          console.log(`[FEEDBACK] Successfully saved response with ID ${responseId}`);
-        } catch (insertErr) {
-          console.error(`[FEEDBACK] Error saving response ${i+1}:`, insertErr);
-        }
-      }
-      
-      console.log(`[FEEDBACK] Saved ${savedResponses.length} responses`);
-      
-      // Update participant status
-      if (savedResponses.length > 0) {
-        try {
-          await participant.update({
-            status: 'completed',
-            completedAt: new Date()
+          let totalParticipants = 0;
+          let completedCount = 0;
+          statusCounts.forEach(row => {
+            totalParticipants += row.count;
+            if (row.status === 'completed') {
+              completedCount += row.count;
+            }
           });
-          console.log(`[FEEDBACK] Updated participant status to completed`);
-        } catch (updateErr) {
-          console.error('[FEEDBACK] Error updating participant status:', updateErr);
-        }
-      }
-      
-      // Verify saved responses
-      try {
-        const verifyResult = await sequelize.query(
-          "SELECT COUNT(*) as count FROM responses WHERE participantId = ?",
-          { 
-            replacements: [participant.id],
-            type: sequelize.QueryTypes.SELECT 
+          
+          const newCompletionRate = totalParticipants > 0 
+            ? Math.round((completedCount / totalParticipants) * 100) 
+            : 0;
+          
+          // Create update data object with completion rate
+          const updateData = { completionRate: newCompletionRate };
+          
+          // If completion rate is 100%, mark campaign as completed
+          if (newCompletionRate === 100) {
+            updateData.status = 'completed';
+            console.log(`[FEEDBACK] Campaign ${campaignId} is now complete, updating status to 'completed'`);
           }
-        );
-        console.log(`[FEEDBACK] Verification: ${verifyResult[0].count} responses now in database for this participant`);
-      } catch (verifyErr) {
-        console.error('[FEEDBACK] Error verifying responses:', verifyErr);
-      }
-      
-      // Update campaign completion rate
-      try {
-        const allParticipants = await CampaignParticipant.findAll({
-          where: { campaignId }
-        });
-        
-        const completedCount = allParticipants.filter(p => 
-          p.status === 'completed' || p.id === participant.id
-        ).length;
-        
-        const totalParticipants = allParticipants.length;
-        const newCompletionRate = totalParticipants > 0 
-          ? Math.round((completedCount / totalParticipants) * 100) 
-          : 0;
-        
-        // Create update data object with completion rate
-        const updateData = { completionRate: newCompletionRate };
-        
-        // If completion rate is 100%, mark campaign as completed
-        if (newCompletionRate === 100) {
-          updateData.status = 'completed';
-          console.log(`[FEEDBACK] Campaign ${campaignId} is now complete, updating status to 'completed'`);
+          
+          await Campaign.update(
+            updateData,
+            { where: { id: campaignId }, transaction }
+          );
+          
+          return { savedCount: savedValues.length, completionRate: newCompletionRate };
         }
-        
-        await Campaign.update(
-          updateData,
-          { where: { id: campaignId } }
-        );
-        
-        console.log(`[FEEDBACK] Updated campaign completion rate to ${newCompletionRate}%`);
-      } catch (rateErr) {
-        console.error('[FEEDBACK] Error updating completion rate:', rateErr);
-      }
+      );
+      
+      console.log(`[FEEDBACK] Updated campaign completion rate to ${completionRate}%`);
       
       return res.status(200).json({
         message: 'Feedback submitted successfully',
-        responseCount: savedResponses.length
+        responseCount: savedCount
       });
     } catch (error) {
       console.error('[FEEDBACK] Error submitting feedback:', error);
@@ -542,73 +529,102 @@ class FeedbackController {
       
       console.log(`[DRAFT] Found participant ${participant.id} for campaign ${campaignId}, target employee ${targetEmployeeId}`);
       
-      // Update or create responses using raw SQL
-      let savedCount = 0;
-      let errorCount = 0;
-      
-      for (const response of responses) {
-        if (!response.questionId) {
-          console.log(`[DRAFT] Skipping response object without questionId.`);
-          continue;
-        }
-        
-        try {
-          // Check if response exists using participantId and questionId
-          const existing = await sequelize.query(
-            'SELECT id FROM responses WHERE participantId = ? AND questionId = ?',
+      // Update or create responses using raw SQL. Reading the current answers,
+      // writing the new ones and updating the results snapshot happen in one
+      // IMMEDIATE transaction, so a submission or snapshot rebuild for the same
+      // participant can't land in between and leave the snapshot out of step.
+      const { savedCount, errorCount } = await sequelize.transaction(
+        { type: Transaction.TYPES.IMMEDIATE },
+        async (transaction) => {
+          let savedCount = 0;
+          let errorCount = 0;
+          const previousValues = [];
+          const savedValues = [];
+
+          // Load the participant's current answers once, keyed by question
+          const existingRows = await sequelize.query(
+            'SELECT id, questionId, ratingValue, textResponse FROM responses WHERE participantId = ?',
             {
-              replacements: [participant.id, response.questionId],
-              type: sequelize.QueryTypes.SELECT
+              replacements: [participant.id],
+              type: sequelize.QueryTypes.SELECT,
+              transaction
             }
           );
-          
-          if (existing.length > 0) {
-            // Update existing response
-            const responseIdToUpdate = existing[0].id;
-            console.log(`[DRAFT] Updating existing response ${responseIdToUpdate} for question ${response.questionId}`);
-            await sequelize.query(
-              `UPDATE responses 
-               SET ratingValue = ?, textResponse = ?, updatedAt = datetime('now') 
-               WHERE id = ?`,
-              {
-                replacements: [
-                  response.rating !== undefined ? response.rating : null, // Handle undefined rating
-                  response.text || '',
-                  responseIdToUpdate
-                ],
-                type: sequelize.QueryTypes.UPDATE
-              }
-            );
-          } else {
-            // Create new response
-            const newResponseId = uuidv4();
-            console.log(`[DRAFT] Creating new response for question ${response.questionId} with targetEmployeeId ${targetEmployeeId}`);
-            await sequelize.query(
-              `INSERT INTO responses 
-               (id, participantId, questionId, ratingValue, textResponse, campaignId, targetEmployeeId, createdAt, updatedAt) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))`, // Added targetEmployeeId
-              {
-                replacements: [
-                  newResponseId,
-                  participant.id,
-                  response.questionId,
-                  response.rating !== undefined ? response.rating : null, // Handle undefined rating
-                  response.text || '',
-                  campaignId,
-                  targetEmployeeId // Pass the targetEmployeeId here
-                ],
-                type: sequelize.QueryTypes.INSERT
+          const existingByQuestion = new Map(existingRows.map(row => [row.questionId, row]));
+
+          for (const response of responses) {
+            if (!response.questionId) {
+              console.log(`[DRAFT] Skipping response object without questionId.`);
+              continue;
+            }
+
+            const ratingValue = response.rating !== undefined ? response.rating : null; // Handle undefined rating
+            const textResponse = response.text || '';
+
+            try {
+              const existing = existingByQuestion.get(response.questionId);
+
+              if (existing) {
+                // Update existing response
+                console.log(`[DRAFT] Updating existing response ${existing.id} for question ${response.questionId}`);
+                await sequelize.query(
+                  `UPDATE responses 
+                   SET ratingValue = ?, textResponse = ?, updatedAt = datetime('now') 
+                   WHERE id = ?`,
+                  {
+                    replacements: [ratingValue, textResponse, existing.id],
+                    type: sequelize.QueryTypes.UPDATE,
+                    transaction
+                  }
+                );
+                previousValues.push({ ...existing });
+              } else {
+                // Create new response
+                const newResponseId = uuidv4();
+                console.log(`[DRAFT] Creating new response for question ${response.questionId} with targetEmployeeId ${targetEmployeeId}`);
+                await sequelize.query(
+                  `INSERT INTO responses 
+                   (id, participantId, questionId, ratingValue, textResponse, campaignId, targetEmployeeId, createdAt, updatedAt) 
+                   VALUES (?, ?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))`,
+                  {
+                    replacements: [
+                      newResponseId,
+                      participant.id,
+                      response.questionId,
+                      ratingValue,
+                      textResponse,
+                      campaignId,
+                      targetEmployeeId
+                    ],
+                    type: sequelize.QueryTypes.INSERT,
+                    transaction
+                  }
+                );
+                existingByQuestion.set(response.questionId, { id: newResponseId, questionId: response.questionId });
               }
-            );
+
+              // A question repeated in the same draft replaces the answer written just before
+              Object.assign(existingByQuestion.get(response.questionId), { ratingValue, textResponse });
+              savedValues.push({ questionId: response.questionId, ratingValue, textResponse });
+              savedCount++;
+            } catch (err) {
+              errorCount++;
+              console.error(`[DRAFT] Error saving/updating response for question ${response.questionId}:`, err.message);
+              // Continue processing other responses even if one fails
+            }
           }
-          
-          savedCount++;
-        } catch (err) {
-          errorCount++;
-          console.error(`[DRAFT] Error saving/updating response for question ${response.questionId}:`, err.message);
-          // Continue processing other responses even if one fails
+
+          // Drafts are part of the live results, so keep the snapshot in step
+          await resultSnapshotService.applyParticipantResponses({
+            campaignId,
+            relationshipType: participant.relationshipType,
+            previous: previousValues,
+            next: savedValues
+          }, { transaction });
+
+          return { savedCount, errorCount };
         }
-      }
+      );
 
       console.log(`[DRAFT] Processed ${responses.length} responses. Saved/Updated: ${savedCount}, Errors: ${errorCount}`);
       
@@ -4,18 +4,55 @@ const {
     Insight, 
     Campaign, 
     Employee, 
-    Response, 
     Question, 
     CampaignParticipant,
     sequelize
   } = require('../models');
   const insightsAiService = require('../services/insights-ai-service');
+  const resultSnapshotService = require('../services/result-snapshot.service');
+  const { RELATIONSHIP_TYPES } = require('../utils/results-aggregator');
   const { Op } = require('sequelize');
   const PDFDocument = require('pdfkit');
   const fs = require('fs');
   const path = require('path');
   const { generateMockInsight } = require('../utils/mock-insight-generator');
-  
+
+  /**
+   * Rating summary from a snapshot histogram, e.g. {"4": 3, "5": 1}.
+   * Zero and non-numeric values are not ratings and are left out.
+   * @param {Object} distribution - Count per rating value
+   * @returns {Object} { distribution, sum, count, average }
+   */
+  const ratingStatsFromDistribution = (distribution) => {
+    const stats = { distribution: {}, sum: 0, count: 0, average: 0 };
+
+    Object.entries(distribution || {}).forEach(([value, count]) => {
+      const rating = Number(value);
+      if (!rating || !(count > 0)) return;
+
+      stats.distribution[value] = count;
+      stats.sum += rating * count;
+      stats.count += count;
+    });
+
+    stats.average = stats.count > 0 ? stats.sum / stats.count : 0;
+    return stats;
+  };
+
+  // Combine two rating summaries (e.g. the relationship types of a category)
+  const mergeRatingStats = (target, stats) => {
+    const merged = target || { distribution: {}, sum: 0, count: 0, average: 0 };
+
+    Object.entries(stats.distribution).forEach(([value, count]) => {
+      merged.distribution[value] = (merged.distribution[value] || 0) + count;
+    });
+    merged.sum += stats.sum;
+    merged.count += stats.count;
+    merged.average = merged.count > 0 ? merged.sum / merged.count : 0;
+
+    return merged;
+  };
+
   /**
    * Controller for handling insights operations
    */
@@ -541,8 +578,10 @@ const {
           // Get feedback data for the campaign
           const feedbackData = await this.getFeedbackDataForCampaign(insight.campaignId);
           
-          // Use the AI service to regenerate the insight content
-          const regeneratedContent = await insightsAiService.regenerateInsight(insight, feedbackData);
+          // Use the AI service to regenerate the insight content ({ force: true } skips the AI cache)
+          const regeneratedContent = await insightsAiService.regenerateInsight(insight, feedbackData, {
+            force: req.body?.force === true
+          });
           
           // Format the content into proper structure
           let formattedContent = {};
@@ -737,44 +776,20 @@ const {
     }
     
     /**
-     * Get feedback data for a campaign
+     * Get feedback data for a campaign. Ratings are summarised per question
+     * as { distribution, sum, count, average } rather than individual values.
      * @param {String} campaignId - Campaign ID
      * @returns {Object} Aggregated feedback data
      */
     async getFeedbackDataForCampaign(campaignId) {
-      // Get all responses for the campaign
-      const responses = await Response.findAll({
-        where: { campaignId },
-        include: [
-          { 
-            model: Question,
-            attributes: ['id', 'text', 'type', 'category', 'perspective', 'order']
-          },
-          {
-            model: CampaignParticipant,
-            as: 'participant',
-            attributes: ['id', 'relationshipType', 'status'],
-          }
-        ]
-      });
+      // Read the precomputed results snapshot instead of every raw response
+      const snapshotRows = await resultSnapshotService.getCampaignSnapshot(campaignId);
       
-      // Group responses by relationship type
-      const responsesByType = {
-        self: [],
-        manager: [],
-        peer: [],
-        direct_report: [],
-        external: []
-      };
-      
-      responses.forEach(response => {
-        if (response.participant && response.participant.relationshipType) {
-          const type = response.participant.relationshipType;
-          if (responsesByType[type]) {
-            responsesByType[type].push(response);
-          }
-        }
+      const questions = await Question.findAll({
+        where: { id: [...new Set(snapshotRows.map(row => row.questionId))] },
+        attributes: ['id', 'text', 'type', 'category']
       });
+      const questionMap = new Map(questions.map(q => [q.id, q]));
       
       // Aggregate by category and question
       const aggregatedData = {
@@ -801,131 +816,84 @@ const {
         aggregatedData.completedParticipantsByType[type]++;
       });
       
-      // Process responses by type
-      Object.entries(responsesByType).forEach(([type, typeResponses]) => {
-        // Skip if no responses
-        if (typeResponses.length === 0) return;
+      // Only relationship types that have responses get an entry
+      const responseCountByType = {};
+      snapshotRows.forEach(row => {
+        responseCountByType[row.relationshipType] = (responseCountByType[row.relationshipType] || 0) + row.responseCount;
+      });
+      
+      RELATIONSHIP_TYPES.forEach(type => {
+        if (!responseCountByType[type]) return;
         
         aggregatedData.byRelationshipType[type] = {
           ratings: {},
           textResponses: {},
           count: aggregatedData.completedParticipantsByType[type] || 0
         };
+      });
+      
+      // Process snapshot rows (one per relationship type and question)
+      snapshotRows.forEach(row => {
+        const question = questionMap.get(row.questionId);
+        if (!question || !row.responseCount) return;
+        
+        const type = row.relationshipType;
+        const questionId = question.id;
+        const category = question.category;
+        
+        // Initialize category if not exists
+        if (!aggregatedData.byCategory[category]) {
+          aggregatedData.byCategory[category] = {
+            ratings: {},
+            textResponses: {},
+            questionCount: 0
+          };
+        }
+        
+        // Initialize question if not exists
+        if (!aggregatedData.byQuestion[questionId]) {
+          aggregatedData.byQuestion[questionId] = {
+            text: question.text,
+            type: question.type,
+            category: category,
+            ratings: {},
+            textResponses: {}
+          };
+        }
         
-        // Process responses
-        typeResponses.forEach(response => {
-          if (!response.Question) return;
+        // Process by question type
+        if (question.type === 'rating') {
+          // Use the rating histogram as it is (no values: 0 means not rated)
+          const stats = ratingStatsFromDistribution(row.ratingDistribution);
+          if (stats.count === 0) return;
           
-          const question = response.Question;
-          const questionId = question.id;
-          const category = question.category;
+          // Add to relationship type
+          aggregatedData.byRelationshipType[type].ratings[questionId] = stats;
           
-          // Initialize category if not exists
-          if (!aggregatedData.byCategory[category]) {
-            aggregatedData.byCategory[category] = {
-              ratings: {},
-              textResponses: {},
-              questionCount: 0
-            };
-          }
+          // Add to category (all relationship types together)
+          const categoryRatings = aggregatedData.byCategory[category].ratings;
+          categoryRatings[questionId] = mergeRatingStats(categoryRatings[questionId], stats);
           
-          // Initialize question if not exists
-          if (!aggregatedData.byQuestion[questionId]) {
-            aggregatedData.byQuestion[questionId] = {
-              text: question.text,
-              type: question.type,
-              category: category,
-              ratings: {},
-              textResponses: {}
-            };
-          }
+          // Add to question
+          aggregatedData.byQuestion[questionId].ratings[type] = { ...stats, distribution: { ...stats.distribution } };
+        } 
+        else if (question.type === 'open_ended' || question.type === 'text') {
+          const texts = (row.textResponses || []).filter(text => text);
           
-          // Process by question type
-          if (question.type === 'rating' && response.ratingValue) {
-            // Add to relationship type
-            if (!aggregatedData.byRelationshipType[type].ratings[questionId]) {
-              aggregatedData.byRelationshipType[type].ratings[questionId] = {
-                values: [],
-                average: 0,
-                count: 0
-              };
-            }
-            aggregatedData.byRelationshipType[type].ratings[questionId].values.push(response.ratingValue);
-            
-            // Add to category
-            if (!aggregatedData.byCategory[category].ratings[questionId]) {
-              aggregatedData.byCategory[category].ratings[questionId] = {
-                values: [],
-                average: 0,
-                count: 0
-              };
-            }
-            aggregatedData.byCategory[category].ratings[questionId].values.push(response.ratingValue);
-            
-            // Add to question
-            if (!aggregatedData.byQuestion[questionId].ratings[type]) {
-              aggregatedData.byQuestion[questionId].ratings[type] = {
-                values: [],
-                average: 0,
-                count: 0
-              };
-            }
-            aggregatedData.byQuestion[questionId].ratings[type].values.push(response.ratingValue);
-          } 
-          else if ((question.type === 'open_ended' || question.type === 'text') && response.textResponse) {
-            // Add to relationship type
-            if (!aggregatedData.byRelationshipType[type].textResponses[questionId]) {
-              aggregatedData.byRelationshipType[type].textResponses[questionId] = [];
-            }
-            aggregatedData.byRelationshipType[type].textResponses[questionId].push(response.textResponse);
-            
-            // Add to category
-            if (!aggregatedData.byCategory[category].textResponses[questionId]) {
-              aggregatedData.byCategory[category].textResponses[questionId] = [];
-            }
-            aggregatedData.byCategory[category].textResponses[questionId].push(response.textResponse);
-            
-            // Add to question
-            if (!aggregatedData.byQuestion[questionId].textResponses[type]) {
-              aggregatedData.byQuestion[questionId].textResponses[type] = [];
-            }
-            aggregatedData.byQuestion[questionId].textResponses[type].push(response.textResponse);
-          }
-        });
-      });
-      
-      // Calculate averages for ratings
-      Object.keys(aggregatedData.byRelationshipType).forEach(type => {
-        Object.keys(aggregatedData.byRelationshipType[type].ratings).forEach(questionId => {
-          const values = aggregatedData.byRelationshipType[type].ratings[questionId].values;
-          if (values.length > 0) {
-            const sum = values.reduce((a, b) => a + b, 0);
-            aggregatedData.byRelationshipType[type].ratings[questionId].average = sum / values.length;
-            aggregatedData.byRelationshipType[type].ratings[questionId].count = values.length;
-          }
-        });
-      });
-      
-      Object.keys(aggregatedData.byCategory).forEach(category => {
-        Object.keys(aggregatedData.byCategory[category].ratings).forEach(questionId => {
-          const values = aggregatedData.byCategory[category].ratings[questionId].values;
-          if (values.length > 0) {
-            const sum = values.reduce((a, b) => a + b, 0);
-            aggregatedData.byCategory[category].ratings[questionId].average = sum / values.length;
-            aggregatedData.byCategory[category].ratings[questionId].count = values.length;
-          }
-        });
-      });
-      
-      Object.keys(aggregatedData.byQuestion).forEach(questionId => {
-        Object.keys(aggregatedData.byQuestion[questionId].ratings).forEach(type => {
-          const values = aggregatedData.byQuestion[questionId].ratings[type].values;
-          if (values.length > 0) {
-            const sum = values.reduce((a, b) => a + b, 0);
-            aggregatedData.byQuestion[questionId].ratings[type].average = sum / values.length;
-            aggregatedData.byQuestion[questionId].ratings[type].count = values.length;
+          if (texts.length === 0) return;
+          
+          // Add to relationship type
+          aggregatedData.byRelationshipType[type].textResponses[questionId] = texts;
+          
+          // Add to category
+          if (!aggregatedData.byCategory[category].textResponses[questionId]) {
+            aggregatedData.byCategory[category].textResponses[questionId] = [];
           }
-        });
+          aggregatedData.byCategory[category].textResponses[questionId].push(...texts);
+          
+          // Add to question
+          aggregatedData.byQuestion[questionId].textResponses[type] = [...texts];
+        }
       });
       
       return aggregatedData;
@@ -1,6 +1,6 @@
 const fs = require('fs');
 const path = require('path');
-const axios = require('axios');
+const aiClient = require('../services/ai-client.service');
 require('dotenv').config();
 
 // Get current settings
@@ -133,10 +133,10 @@ exports.getFluxModels = async (req, res) => {
     
     try {
       // Always try to make a real API call
-      const response = await axios.get(`${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-        }
+      const response = await aiClient.request({
+        method: 'GET',
+        url: `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`,
+        purpose: 'models'
       });
       
       res.status(200).json(response.data);
@@ -192,10 +192,10 @@ exports.getFluxBalance = async (req, res) => {
     
     try {
       // Always try to make a real API call
-      const response = await axios.get(`${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-        }
+      const response = await aiClient.request({
+        method: 'GET',
+        url: `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`,
+        purpose: 'balance'
       });
       
       res.status(200).json(response.data);
@@ -8,6 +8,7 @@ const { createAnalysisPrompt } = require('../services/prompt-helper.service');
 const { makeAiChatRequest } = require('../services/flux-ai.service');
 const fluxAiConfig = require('../config/flux-ai');
 const documentController = require('./documents.controller');
+const analysisJobs = require('../services/analysis-job.service');
 
 
 // Get all templates
@@ -670,11 +671,6 @@ exports.generateConfiguredTemplate = async (req, res) => {
       userId: req.user.id
     });
     
-    // Update documents to mark them as being analyzed
-    for (const document of documents) {
-      await document.update({ status: 'analysis_in_progress' });
-    }
-    
     // Import the document controller
     const documentController = require('./documents.controller');
     
@@ -705,22 +701,18 @@ exports.generateConfiguredTemplate = async (req, res) => {
     // Log environment
     console.log('Environment:', process.env.NODE_ENV);
     
-    // Start document analysis with template information
-    const template = await documentController.startDocumentAnalysis(documents, documentType, req.user.id, templateInfo);
+    // The analysis runs in the background worker pool; the client polls the job status
+    const job = await analysisJobs.enqueue({
+      documents,
+      documentType,
+      userId: req.user.id,
+      templateInfo
+    });
     
-    if (template && template.id) {
-      // Fetch the updated template with all associations
-      const updatedTemplate = await Template.findByPk(template.id, {
-        include: ['questions', 'sourceDocuments', 'ratingScales']
-      });
-      
-      res.status(200).json({
-        message: 'Template generated successfully',
-        template: updatedTemplate
-      });
-    } else {
-      res.status(500).json({ message: 'Failed to generate template' });
-    }
+    res.status(202).json({
+      message: 'Template generation started',
+      job: analysisJobs.describeJob(job)
+    });
   } catch (error) {
     console.error('Error generating template:', error);
     res.status(500).json({ message: 'Failed to generate template', error: error.message });
@@ -2,6 +2,89 @@ const jwt = require('jsonwebtoken');
 const { User } = require('../models');
 require('dotenv').config();
 
+// Users looked up by the middleware are kept briefly so that every request
+// doesn't query the users table. Entries are dropped whenever a user is
+// written (see the User hooks below), so the TTL only bounds memory use.
+const USER_CACHE_TTL_MS = parseInt(process.env.AUTH_USER_CACHE_TTL || '60000', 10);
+const userCache = new Map();
+const pendingLoads = new Map();
+let cacheGeneration = 0;
+
+/**
+ * Look up a user through the cache
+ * @param {string} key - Cache key (user ID or email)
+ * @param {Function} load - Loads the user when not cached; returns a plain object or null
+ * @returns {Promise<Object|null>} - A copy of the cached user
+ */
+async function getCachedUser(key, load) {
+  const cached = userCache.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    return { ...cached.user };
+  }
+
+  // Concurrent requests for the same user share one lookup
+  if (!pendingLoads.has(key)) {
+    const generation = cacheGeneration;
+    const pending = load()
+      .then(user => {
+        // Don't keep a user that was written while it was loaded
+        if (user && generation === cacheGeneration) {
+          userCache.set(key, { user, expiresAt: Date.now() + USER_CACHE_TTL_MS });
+        } else {
+          userCache.delete(key);
+        }
+        return user;
+      })
+      .finally(() => {
+        if (pendingLoads.get(key) === pending) pendingLoads.delete(key);
+      });
+    pendingLoads.set(key, pending);
+  }
+
+  const user = await pendingLoads.get(key);
+  return user ? { ...user } : null;
+}
+
+/**
+ * Drop a user from the cache after it was updated or deleted
+ * @param {string} [idOrEmail] - User ID or email; omit to drop every user
+ */
+function invalidateUser(idOrEmail) {
+  cacheGeneration++;
+
+  if (!idOrEmail) {
+    userCache.clear();
+    pendingLoads.clear();
+    return;
+  }
+
+  for (const [key, entry] of userCache) {
+    if (entry.user.id === idOrEmail || entry.user.email === idOrEmail) {
+      userCache.delete(key);
+    }
+  }
+  for (const key of [`id:${idOrEmail}`, `email:${idOrEmail}`]) {
+    userCache.delete(key);
+    pendingLoads.delete(key);
+  }
+}
+
+exports.invalidateUser = invalidateUser;
+
+// Every write to a user (role change, deletion, ...) goes through these hooks
+const invalidateWrittenUser = (user) => {
+  invalidateUser(user.id);
+  invalidateUser(user.email);
+  if (user.changed && user.changed('email')) {
+    invalidateUser(user.previous('email'));
+  }
+};
+User.addHook('afterSave', invalidateWrittenUser);
+User.addHook('afterDestroy', invalidateWrittenUser);
+// Bulk writes don't say which users changed
+User.addHook('afterBulkUpdate', () => invalidateUser());
+User.addHook('afterBulkDestroy', () => invalidateUser());
+
 // Authentication middleware for production use
 exports.authMiddlewareProduction = async (req, res, next) => {
   try {
@@ -17,8 +100,11 @@ exports.authMiddlewareProduction = async (req, res, next) => {
     const decoded = jwt.verify(token, process.env.JWT_SECRET);
     
     // Find user by ID
-    const user = await User.findByPk(decoded.id, {
-      attributes: { exclude: ['password'] }
+    const user = await getCachedUser(`id:${decoded.id}`, async () => {
+      const found = await User.findByPk(decoded.id, {
+        attributes: { exclude: ['password'] }
+      });
+      return found ? found.get({ plain: true }) : null;
     });
     
     if (!user) {
@@ -39,28 +125,32 @@ exports.authMiddleware = (req, res, next) => {
   // For development, we'll create or use a dummy user
   const setupDummyUser = async () => {
     try {
-      // Try to find admin user
-      let user = await User.findOne({ where: { email: 'admin@pulse360.com' } });
-      
-      // If no admin user exists, create one
-      if (!user) {
-        user = await User.create({
-          name: 'Admin User',
-          email: 'admin@pulse360.com',
-          password: 'adminpassword',
-          role: 'admin'
-        });
-        console.log('Created dummy admin user for development');
-      }
-      
+      const user = await getCachedUser('email:admin@pulse360.com', async () => {
+        // Try to find admin user
+        let admin = await User.findOne({ where: { email: 'admin@pulse360.com' } });
+
+        // If no admin user exists, create one
+        if (!admin) {
+          admin = await User.create({
+            name: 'Admin User',
+            email: 'admin@pulse360.com',
+            password: 'adminpassword',
+            role: 'admin'
+          });
+          console.log('Created dummy admin user for development');
+        }
+
+        return {
+          id: admin.id,
+          name: admin.name,
+          email: admin.email,
+          role: admin.role
+        };
+      });
+
       // Set user in request
-      req.user = {
-        id: user.id,
-        name: user.name,
-        email: user.email,
-        role: user.role
-      };
-      
+      req.user = user;
+
       next();
     } catch (error) {
       console.error('Error setting up dummy user:', error);
@@ -0,0 +1,210 @@
+// backend/middleware/metrics.middleware.js
+//
+// Request instrumentation: a latency histogram per route, and the number and
+// duration of the SQL queries each request runs. Queries are attributed to
+// requests through AsyncLocalStorage, so services need no changes.
+
+const { AsyncLocalStorage, AsyncResource } = require('async_hooks');
+const config = require('../config/metrics');
+
+const requestContext = new AsyncLocalStorage();
+const routes = new Map();
+const instrumented = new WeakSet();
+let startedAt = new Date();
+
+const LOCAL_ADDRESSES = new Set(['127.0.0.1', '::1', '::ffff:127.0.0.1']);
+
+const elapsedMs = (start) => Number(process.hrtime.bigint() - start) / 1e6;
+const round = (value) => Math.round(value * 100) / 100;
+
+/**
+ * Route pattern of a finished request, e.g. "GET /api/campaigns/:id", so
+ * that IDs in URLs don't create a separate entry per resource
+ * @param {Object} req - Express request
+ * @returns {string}
+ */
+function routeKey(req) {
+  if (!req.route) {
+    return `${req.method} (unmatched)`;
+  }
+  const routePath = req.route.path === '/' && req.baseUrl ? '' : req.route.path;
+  return `${req.method} ${req.baseUrl || ''}${routePath}`;
+}
+
+function createRouteStats() {
+  return {
+    requests: 0,
+    errors: 0,
+    totalMs: 0,
+    maxMs: 0,
+    // One count per bucket of config.latencyBuckets, plus "+Inf"
+    buckets: new Array(config.latencyBuckets.length + 1).fill(0),
+    queries: 0,
+    maxQueries: 0,
+    queryMs: 0
+  };
+}
+
+function record(req, res, store) {
+  const durationMs = elapsedMs(store.start);
+  const key = routeKey(req);
+
+  let stats = routes.get(key);
+  if (!stats) {
+    stats = createRouteStats();
+    routes.set(key, stats);
+  }
+
+  stats.requests++;
+  if (res.statusCode >= 500) stats.errors++;
+  stats.totalMs += durationMs;
+  stats.maxMs = Math.max(stats.maxMs, durationMs);
+
+  let bucket = config.latencyBuckets.findIndex(bound => durationMs <= bound);
+  if (bucket === -1) bucket = config.latencyBuckets.length;
+  stats.buckets[bucket]++;
+
+  stats.queries += store.queries;
+  stats.maxQueries = Math.max(stats.maxQueries, store.queries);
+  stats.queryMs += store.queryMs;
+
+  if (config.queryWarnThreshold > 0 && store.queries > config.queryWarnThreshold) {
+    console.warn(`[METRICS] ${key} ran ${store.queries} SQL queries (${Math.round(store.queryMs)}ms) in ${Math.round(durationMs)}ms`);
+  }
+}
+
+/**
+ * Express middleware timing each request and collecting its SQL queries
+ */
+exports.metricsMiddleware = (req, res, next) => {
+  if (!config.enabled) {
+    return next();
+  }
+
+  const store = { start: process.hrtime.bigint(), queries: 0, queryMs: 0 };
+  res.on('finish', () => record(req, res, store));
+
+  requestContext.run(store, next);
+};
+
+/**
+ * Wrap middleware that parses the request stream itself (multer uploads).
+ * Its callback runs in the socket's async context, so queries of the
+ * following handlers would not be counted against the request.
+ * @param {Function} middleware - Express middleware
+ * @returns {Function}
+ */
+exports.withRequestContext = (middleware) => (req, res, next) => {
+  middleware(req, res, AsyncResource.bind(next));
+};
+
+/**
+ * Count the queries of a Sequelize instance against the request running them
+ * @param {Sequelize} sequelize - Sequelize instance
+ */
+exports.instrumentSequelize = (sequelize) => {
+  if (!config.enabled || instrumented.has(sequelize)) {
+    return;
+  }
+  instrumented.add(sequelize);
+
+  const queryStarts = new WeakMap();
+
+  sequelize.addHook('beforeQuery', (options, query) => {
+    if (requestContext.getStore()) {
+      queryStarts.set(query, process.hrtime.bigint());
+    }
+  });
+
+  sequelize.addHook('afterQuery', (options, query) => {
+    const store = requestContext.getStore();
+    const start = queryStarts.get(query);
+    if (!store || start === undefined) {
+      return;
+    }
+
+    queryStarts.delete(query);
+    store.queries++;
+    store.queryMs += elapsedMs(start);
+  });
+};
+
+/**
+ * Latency bound (ms) below which the given share of requests finished,
+ * estimated from the histogram as the upper bound of the bucket
+ * @param {Array<number>} buckets - Counts per bucket
+ * @param {number} total - Number of requests
+ * @param {number} quantile - e.g. 0.95
+ * @returns {number|string} - Bucket bound, or "+Inf"
+ */
+function histogramQuantile(buckets, total, quantile) {
+  const target = Math.ceil(total * quantile);
+  let seen = 0;
+  for (let i = 0; i < buckets.length; i++) {
+    seen += buckets[i];
+    if (seen >= target) {
+      return i < config.latencyBuckets.length ? config.latencyBuckets[i] : '+Inf';
+    }
+  }
+  return '+Inf';
+}
+
+/**
+ * Metrics of all routes since start-up (or the last reset), slowest first
+ * @returns {Object}
+ */
+exports.getMetrics = () => {
+  const result = {};
+
+  const entries = [...routes.entries()]
+    .sort(([, a], [, b]) => b.totalMs / b.requests - a.totalMs / a.requests);
+
+  for (const [key, stats] of entries) {
+    const histogram = {};
+    config.latencyBuckets.forEach((bound, i) => {
+      histogram[`le_${bound}`] = stats.buckets[i];
+    });
+    histogram['+Inf'] = stats.buckets[config.latencyBuckets.length];
+
+    result[key] = {
+      requests: stats.requests,
+      errors: stats.errors,
+      latencyMs: {
+        average: round(stats.totalMs / stats.requests),
+        max: round(stats.maxMs),
+        p50: histogramQuantile(stats.buckets, stats.requests, 0.5),
+        p95: histogramQuantile(stats.buckets, stats.requests, 0.95),
+        p99: histogramQuantile(stats.buckets, stats.requests, 0.99),
+        histogram
+      },
+      sql: {
+        queries: stats.queries,
+        averageQueries: round(stats.queries / stats.requests),
+        maxQueries: stats.maxQueries,
+        totalMs: round(stats.queryMs),
+        averageMs: round(stats.queryMs / stats.requests)
+      }
+    };
+  }
+
+  return {
+    since: startedAt.toISOString(),
+    uptimeSeconds: Math.round(process.uptime()),
+    routes: result
+  };
+};
+
+exports.resetMetrics = () => {
+  routes.clear();
+  startedAt = new Date();
+};
+
+/**
+ * Only let requests from this machine through (unless remote access is allowed)
+ */
+exports.localOnly = (req, res, next) => {
+  if (config.allowRemote || LOCAL_ADDRESSES.has(req.socket.remoteAddress)) {
+    return next();
+  }
+  res.status(403).json({ message: 'Metrics are only available locally' });
+};
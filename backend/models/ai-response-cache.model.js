@@ -0,0 +1,56 @@
+// backend/models/ai-response-cache.model.js
+
+const { DataTypes } = require('sequelize');
+const { sequelize } = require('../config/database');
+
+const AiResponseCache = sequelize.define('AiResponseCache', {
+  cacheKey: {
+    type: DataTypes.STRING(64),
+    primaryKey: true,
+    comment: 'SHA-256 of the endpoint and the normalised request body'
+  },
+  purpose: {
+    type: DataTypes.STRING,
+    allowNull: true,
+    comment: 'What the call was for (e.g. document_analysis, insight_generation)'
+  },
+  response: {
+    type: DataTypes.JSON,
+    allowNull: false
+  },
+  expiresAt: {
+    type: DataTypes.DATE,
+    allowNull: false
+  },
+  lastAccessedAt: {
+    type: DataTypes.DATE,
+    allowNull: false,
+    defaultValue: DataTypes.NOW
+  },
+  hits: {
+    type: DataTypes.INTEGER,
+    allowNull: false,
+    defaultValue: 0
+  },
+  createdAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  },
+  updatedAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  }
+}, {
+  tableName: 'ai_response_cache',
+  timestamps: true,
+  indexes: [
+    {
+      fields: ['lastAccessedAt']
+    },
+    {
+      fields: ['expiresAt']
+    }
+  ]
+});
+
+module.exports = AiResponseCache;
@@ -0,0 +1,88 @@
+// backend/models/analysis-job.model.js
+
+const { DataTypes } = require('sequelize');
+const { sequelize } = require('../config/database');
+
+const AnalysisJob = sequelize.define('AnalysisJob', {
+  id: {
+    type: DataTypes.UUID,
+    defaultValue: DataTypes.UUIDV4,
+    primaryKey: true
+  },
+  userId: {
+    type: DataTypes.UUID,
+    allowNull: false
+  },
+  documentType: {
+    type: DataTypes.STRING,
+    allowNull: false
+  },
+  documentIds: {
+    type: DataTypes.JSON,
+    allowNull: false,
+    defaultValue: []
+  },
+  templateInfo: {
+    type: DataTypes.JSON,
+    allowNull: true,
+    comment: 'Name, description, perspective settings and question mix requested for the template'
+  },
+  status: {
+    type: DataTypes.ENUM,
+    values: ['queued', 'running', 'completed', 'failed'],
+    defaultValue: 'queued',
+    allowNull: false
+  },
+  stage: {
+    type: DataTypes.STRING,
+    allowNull: true,
+    comment: 'Stage currently running (upload, analysis, supplement, save)'
+  },
+  stages: {
+    type: DataTypes.JSON,
+    allowNull: true,
+    comment: 'Per-stage status and counters'
+  },
+  attempts: {
+    type: DataTypes.INTEGER,
+    defaultValue: 0,
+    allowNull: false
+  },
+  templateId: {
+    type: DataTypes.UUID,
+    allowNull: true
+  },
+  error: {
+    type: DataTypes.TEXT,
+    allowNull: true
+  },
+  startedAt: {
+    type: DataTypes.DATE,
+    allowNull: true
+  },
+  completedAt: {
+    type: DataTypes.DATE,
+    allowNull: true
+  },
+  createdAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  },
+  updatedAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  }
+}, {
+  tableName: 'analysis_jobs',
+  timestamps: true,
+  indexes: [
+    {
+      fields: ['status', 'createdAt']
+    },
+    {
+      fields: ['userId']
+    }
+  ]
+});
+
+module.exports = AnalysisJob;
@@ -79,6 +79,10 @@ const CampaignParticipant = sequelize.define('CampaignParticipant', {
     {
       unique: true,
       fields: ['campaignId', 'employeeId']
+    },
+    // Completion rate on the dashboard
+    {
+      fields: ['status']
     }
   ]
 });
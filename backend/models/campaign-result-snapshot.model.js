@@ -0,0 +1,74 @@
+// backend/models/campaign-result-snapshot.model.js
+
+const { DataTypes } = require('sequelize');
+const { sequelize } = require('../config/database');
+
+const CampaignResultSnapshot = sequelize.define('CampaignResultSnapshot', {
+  id: {
+    type: DataTypes.UUID,
+    defaultValue: DataTypes.UUIDV4,
+    primaryKey: true
+  },
+  campaignId: {
+    type: DataTypes.UUID,
+    allowNull: false,
+    references: {
+      model: 'campaigns',
+      key: 'id'
+    }
+  },
+  relationshipType: {
+    type: DataTypes.ENUM,
+    values: ['manager', 'peer', 'direct_report', 'self', 'external'],
+    allowNull: false
+  },
+  questionId: {
+    type: DataTypes.UUID,
+    allowNull: false
+  },
+  responseCount: {
+    type: DataTypes.INTEGER,
+    allowNull: false,
+    defaultValue: 0,
+    comment: 'Number of responses to this question from this relationship type'
+  },
+  ratingSum: {
+    type: DataTypes.FLOAT,
+    allowNull: false,
+    defaultValue: 0
+  },
+  ratingCount: {
+    type: DataTypes.INTEGER,
+    allowNull: false,
+    defaultValue: 0
+  },
+  ratingDistribution: {
+    type: DataTypes.JSON,
+    allowNull: true,
+    comment: 'Histogram of rating values, e.g. {"1": 0, "4": 3}'
+  },
+  textResponses: {
+    type: DataTypes.JSON,
+    allowNull: true,
+    comment: 'Text answers for open-ended questions'
+  },
+  createdAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  },
+  updatedAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  }
+}, {
+  tableName: 'campaign_result_snapshots',
+  timestamps: true,
+  indexes: [
+    {
+      unique: true,
+      fields: ['campaignId', 'relationshipType', 'questionId']
+    }
+  ]
+});
+
+module.exports = CampaignResultSnapshot;
@@ -51,6 +51,11 @@ const Campaign = sequelize.define('Campaign', {
     type: DataTypes.FLOAT,
     defaultValue: 0
   },
+  resultsSnapshotAt: {
+    type: DataTypes.DATE,
+    allowNull: true,
+    comment: 'When the results snapshot was last rebuilt; null means it must be rebuilt before use'
+  },
   lastReminderSent: {
     type: DataTypes.DATE,
     allowNull: true
@@ -83,7 +88,13 @@ const Campaign = sequelize.define('Campaign', {
   }
 }, {
   tableName: 'campaigns',
-  timestamps: true
+  timestamps: true,
+  indexes: [
+    // Active campaigns by deadline (dashboard deadlines and counts)
+    {
+      fields: ['status', 'endDate']
+    }
+  ]
 });
 
 module.exports = Campaign;
\ No newline at end of file
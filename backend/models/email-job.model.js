@@ -0,0 +1,96 @@
+// backend/models/email-job.model.js
+
+const { DataTypes } = require('sequelize');
+const { sequelize } = require('../config/database');
+
+const EmailJob = sequelize.define('EmailJob', {
+  id: {
+    type: DataTypes.UUID,
+    defaultValue: DataTypes.UUIDV4,
+    primaryKey: true
+  },
+  batchId: {
+    type: DataTypes.UUID,
+    allowNull: false,
+    comment: 'Groups the emails queued by one request (e.g. a campaign launch)'
+  },
+  campaignId: {
+    type: DataTypes.UUID,
+    allowNull: true
+  },
+  participantId: {
+    type: DataTypes.UUID,
+    allowNull: true
+  },
+  communicationType: {
+    type: DataTypes.ENUM,
+    values: ['invitation', 'reminder', 'thank_you', 'instruction', 'other'],
+    defaultValue: 'other'
+  },
+  recipient: {
+    type: DataTypes.STRING,
+    allowNull: false
+  },
+  subject: {
+    type: DataTypes.STRING,
+    allowNull: true
+  },
+  html: {
+    type: DataTypes.TEXT,
+    allowNull: true
+  },
+  text: {
+    type: DataTypes.TEXT,
+    allowNull: true
+  },
+  status: {
+    type: DataTypes.ENUM,
+    values: ['pending', 'processing', 'sent', 'failed'],
+    defaultValue: 'pending',
+    allowNull: false
+  },
+  attempts: {
+    type: DataTypes.INTEGER,
+    defaultValue: 0,
+    allowNull: false
+  },
+  nextAttemptAt: {
+    type: DataTypes.DATE,
+    allowNull: false,
+    defaultValue: DataTypes.NOW,
+    comment: 'The job is not picked up before this time (retry backoff or deliberate delay)'
+  },
+  lastError: {
+    type: DataTypes.TEXT,
+    allowNull: true
+  },
+  messageId: {
+    type: DataTypes.STRING,
+    allowNull: true
+  },
+  sentAt: {
+    type: DataTypes.DATE,
+    allowNull: true
+  },
+  createdAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  },
+  updatedAt: {
+    type: DataTypes.DATE,
+    defaultValue: DataTypes.NOW
+  }
+}, {
+  tableName: 'email_jobs',
+  timestamps: true,
+  indexes: [
+    {
+      fields: ['status', 'nextAttemptAt']
+    },
+    {
+      fields: ['batchId']
+    }
+  ]
+});
+
+module.exports = EmailJob;
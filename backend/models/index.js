@@ -8,9 +8,13 @@ const Employee = require('./employee.model');
 const Campaign = require('./campaign.model');
 const CampaignParticipant = require('./campaign-participant.model');
 const Response = require('./response.model');
+const CampaignResultSnapshot = require('./campaign-result-snapshot.model');
 const EmailSettings = require('./email-settings.model');
 const CommunicationTemplate = require('./communication-template.model');
 const CommunicationLog = require('./communication-log.model');
+const EmailJob = require('./email-job.model');
+const AiResponseCache = require('./ai-response-cache.model');
+const AnalysisJob = require('./analysis-job.model');
 const { Template, Question, SourceDocument, RatingScale } = require('./template.model');
 const BrandingSettings = require('./branding-settings.model');
 const Insight = require('./insight.model');
@@ -64,6 +68,10 @@ Response.belongsTo(CampaignParticipant, { foreignKey: 'participantId', as: 'part
 Question.hasMany(Response, { foreignKey: 'questionId' });
 Response.belongsTo(Question, { foreignKey: 'questionId' });
 
+// Result snapshot associations
+Campaign.hasMany(CampaignResultSnapshot, { foreignKey: 'campaignId', as: 'resultSnapshots', onDelete: 'CASCADE' });
+CampaignResultSnapshot.belongsTo(Campaign, { foreignKey: 'campaignId', as: 'campaign' });
+
 // Email Settings associations
 User.hasMany(EmailSettings, { foreignKey: 'updatedBy' });
 EmailSettings.belongsTo(User, { foreignKey: 'updatedBy' });
@@ -127,9 +135,13 @@ module.exports = {
   Campaign,
   CampaignParticipant,
   Response,
+  CampaignResultSnapshot,
   EmailSettings,
   CommunicationTemplate,
   CommunicationLog,
+  EmailJob,
+  AiResponseCache,
+  AnalysisJob,
   BrandingSettings,
   Insight,
   Notification,
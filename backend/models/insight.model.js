@@ -63,7 +63,13 @@ const Insight = sequelize.define('Insight', {
   }
 }, {
   tableName: 'insights',
-  timestamps: true
+  timestamps: true,
+  indexes: [
+    // Recent reports on the dashboard
+    {
+      fields: ['createdAt']
+    }
+  ]
 });
 
 module.exports = Insight;
\ No newline at end of file
@@ -81,7 +81,19 @@ const Response = sequelize.define('Response', {
   }
 }, {
   tableName: 'responses',
-  timestamps: true
+  timestamps: true,
+  indexes: [
+    {
+      fields: ['campaignId', 'participantId', 'questionId']
+    },
+    {
+      // Results aggregation joins responses through campaign_participants
+      fields: ['participantId', 'questionId']
+    },
+    {
+      fields: ['targetEmployeeId']
+    }
+  ]
 });
 
 module.exports = Response;
\ No newline at end of file
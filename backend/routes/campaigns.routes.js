@@ -4,14 +4,19 @@ const express = require('express');
 const router = express.Router();
 const campaignsController = require('../controllers/campaigns.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
+const dashboardStats = require('../services/dashboard-stats.service');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
 
+// Writes here change the dashboard stats
+router.use(dashboardStats.invalidateOnWrite);
+
 // Special endpoints that might conflict with /:id routes should be defined first
 router.post('/suggest-assessors', campaignsController.suggestAssessors);
 router.post('/generate-email-templates', campaignsController.generateEmailTemplates);
 router.post('/send-reminders', campaignsController.sendReminders); 
+router.get('/email-jobs/:batchId', campaignsController.getEmailJobStatus);
 
 // Get all campaigns
 router.get('/', campaignsController.getAllCampaigns);
@@ -2,6 +2,7 @@ const express = require('express');
 const router = express.Router();
 const { sequelize } = require('../models');
 const { v4: uuidv4 } = require('uuid');
+const resultSnapshotService = require('../services/result-snapshot.service');
 
 // Route to check if responses table exists and test direct insert
 router.get('/test-responses', async (req, res) => {
@@ -90,6 +91,9 @@ router.get('/test-responses', async (req, res) => {
           type: sequelize.QueryTypes.INSERT
         });
         
+        // Results read the snapshot, so rebuild it to include the test record
+        await resultSnapshotService.invalidateCampaignSnapshot(campaign[0].id);
+        
         // Verify the insert
         const inserted = await sequelize.query(
           "SELECT * FROM responses WHERE id = ?;",
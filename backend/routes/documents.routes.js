@@ -3,6 +3,7 @@ const router = express.Router();
 const documentsController = require('../controllers/documents.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
 const upload = require('../middleware/upload.middleware');
+const { withRequestContext } = require('../middleware/metrics.middleware');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
@@ -10,11 +11,14 @@ router.use(authMiddleware);
 // Get all documents
 router.get('/', documentsController.getAllDocuments);
 
+// Get the status of a document analysis job
+router.get('/analysis-jobs/:jobId', documentsController.getAnalysisJob);
+
 // Get document by ID
 router.get('/:id', documentsController.getDocumentById);
 
 // Upload documents
-router.post('/upload', upload.array('files'), documentsController.uploadDocuments);
+router.post('/upload', withRequestContext(upload.array('files')), documentsController.uploadDocuments);
 
 // Delete document
 router.delete('/:id', documentsController.deleteDocument);
@@ -5,12 +5,16 @@ const router = express.Router();
 const employeesController = require('../controllers/employees.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
 const employeeUpload = require('../middleware/employee-upload.middleware');
+const { withRequestContext } = require('../middleware/metrics.middleware');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
 
 // Import employees from file
-router.post('/import', employeeUpload.single('file'), employeesController.importEmployees);
+router.post('/import', withRequestContext(employeeUpload.single('file')), employeesController.importEmployees);
+
+// Get the progress of an import
+router.get('/import/:importId', employeesController.getImportProgress);
 
 // Get all employees
 router.get('/', employeesController.getAllEmployees);
@@ -3,12 +3,13 @@
 const express = require('express');
 const router = express.Router();
 const feedbackController = require('../controllers/feedback.controller');
+const dashboardStats = require('../services/dashboard-stats.service');
 
 // Route for evaluating feedback with AI
 router.post('/evaluate', feedbackController.evaluateFeedback);
 
 // Route for submitting feedback
-router.post('/submit', feedbackController.submitFeedback);
+router.post('/submit', dashboardStats.invalidateOnWrite, feedbackController.submitFeedback);
 
 // NEW ROUTE: Get assessment data by token
 router.get('/assessment/:token', feedbackController.getAssessmentByToken);
@@ -2,6 +2,7 @@ const express = require('express');
 const router = express.Router();
 const { sequelize } = require('../models');
 const { v4: uuidv4 } = require('uuid');
+const resultSnapshotService = require('../services/result-snapshot.service');
 
 // Route to fix database issues
 router.get('/fix-responses', async (req, res) => {
@@ -39,7 +40,10 @@ router.get('/fix-responses', async (req, res) => {
     `);
     
     console.log('Recreated responses table without foreign key constraints');
-    
+
+    // The new table starts empty, so no results snapshot matches it any more
+    await resultSnapshotService.invalidateAllSnapshots();
+
     // Step 3: Try inserting a test record
     const testId = uuidv4();
     
@@ -69,6 +73,9 @@ router.get('/fix-responses', async (req, res) => {
         type: sequelize.QueryTypes.INSERT
       });
       
+      // Results read the snapshot, so rebuild it to include the test record
+      await resultSnapshotService.invalidateCampaignSnapshot(campaign[0].id);
+      
       console.log('Successfully inserted test record');
     }
     
@@ -4,10 +4,14 @@ const express = require('express');
 const router = express.Router();
 const insightsController = require('../controllers/insights.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
+const dashboardStats = require('../services/dashboard-stats.service');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
 
+// Writes here change the dashboard stats
+router.use(dashboardStats.invalidateOnWrite);
+
 // Get available campaigns for insights
 router.get('/campaigns', insightsController.getAvailableCampaigns);
 
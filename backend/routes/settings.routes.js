@@ -2,7 +2,7 @@ const express = require('express');
 const router = express.Router();
 const settingsController = require('../controllers/settings.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
-const axios = require('axios');
+const aiClient = require('../services/ai-client.service');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
@@ -36,15 +36,11 @@ router.get('/flux/status', async (req, res) => {
     }
     
     // Make a real API call to test the connection
-    const response = await axios.get(
-      fluxAiConfig.getEndpointUrl('llms'),
-      {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      }
-    );
+    const response = await aiClient.request({
+      method: 'GET',
+      url: fluxAiConfig.getEndpointUrl('llms'),
+      purpose: 'connection_test'
+    });
     
     return res.status(200).json({
       status: 'success',
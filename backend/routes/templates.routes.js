@@ -2,10 +2,14 @@ const express = require('express');
 const router = express.Router();
 const templatesController = require('../controllers/templates.controller');
 const { authMiddleware } = require('../middleware/auth.middleware');
+const dashboardStats = require('../services/dashboard-stats.service');
 
 // Apply auth middleware to all routes
 router.use(authMiddleware);
 
+// Writes here change the dashboard stats
+router.use(dashboardStats.invalidateOnWrite);
+
 // Template routes
 router.get('/', templatesController.getAllTemplates);
 router.post('/generate-configured', templatesController.generateConfiguredTemplate);
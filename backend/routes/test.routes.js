@@ -2,8 +2,9 @@
 
 const express = require('express');
 const router = express.Router();
-const axios = require('axios');
 const fluxAiConfig = require('../config/flux-ai');
+const aiClient = require('../services/ai-client.service');
+const { testFluxAiConnectivity } = require('../services/flux-ai.service');
 
 // Test Flux AI API connectivity
 router.get('/flux-api', async (req, res) => {
@@ -17,118 +18,7 @@ router.get('/flux-api', async (req, res) => {
       endpoints: fluxAiConfig.endpoints
     });
     
-    // First, try to get available models
-    let modelsResponse;
-    try {
-      modelsResponse = await axios.get(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`,
-        {
-          headers: {
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Models API response:', modelsResponse.data);
-    } catch (modelsError) {
-      console.error('Models API error:', modelsError.message);
-      
-      // Try with different auth
-      try {
-        modelsResponse = await axios.get(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.llms}`,
-          {
-            headers: {
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Models API response with Bearer auth:', modelsResponse.data);
-      } catch (bearerError) {
-        console.error('Models API error with Bearer auth:', bearerError.message);
-      }
-    }
-    
-    // Second, try to get balance
-    let balanceResponse;
-    try {
-      balanceResponse = await axios.get(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`,
-        {
-          headers: {
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Balance API response:', balanceResponse.data);
-    } catch (balanceError) {
-      console.error('Balance API error:', balanceError.message);
-      
-      // Try with different auth
-      try {
-        balanceResponse = await axios.get(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.balance}`,
-          {
-            headers: {
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Balance API response with Bearer auth:', balanceResponse.data);
-      } catch (bearerError) {
-        console.error('Balance API error with Bearer auth:', bearerError.message);
-      }
-    }
-    
-    // Third, make a simple chat request without files
-    let chatResponse;
-    try {
-      chatResponse = await axios.post(
-        `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-        {
-          messages: [
-            {
-              role: "user",
-              content: "Hello, can you tell me how to attach files to API requests?"
-            }
-          ],
-          stream: false
-        },
-        {
-          headers: {
-            'Content-Type': 'application/json',
-            'X-API-KEY': fluxAiConfig.apiKey
-          }
-        }
-      );
-      console.log('Chat API response:', chatResponse.data);
-    } catch (chatError) {
-      console.error('Chat API error:', chatError.message);
-      
-      // Try with different auth
-      try {
-        chatResponse = await axios.post(
-          `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints.chat}`,
-          {
-            messages: [
-              {
-                role: "user",
-                content: "Hello, can you tell me how to attach files to API requests?"
-              }
-            ],
-            stream: false
-          },
-          {
-            headers: {
-              'Content-Type': 'application/json',
-              'Authorization': `Bearer ${fluxAiConfig.apiKey}`
-            }
-          }
-        );
-        console.log('Chat API response with Bearer auth:', chatResponse.data);
-      } catch (bearerError) {
-        console.error('Chat API error with Bearer auth:', bearerError.message);
-      }
-    }
+    const { models, balance, chat } = await testFluxAiConnectivity();
     
     // Return results
     res.status(200).json({
@@ -140,9 +30,9 @@ router.get('/flux-api', async (req, res) => {
         model: fluxAiConfig.model
       },
       endpoints: {
-        models: modelsResponse?.data || null,
-        balance: balanceResponse?.data || null,
-        chat: chatResponse?.data || null
+        models,
+        balance,
+        chat
       }
     });
   } catch (error) {
@@ -157,23 +47,16 @@ router.get('/flux-api', async (req, res) => {
 // FluxAI test endpoint
 router.get('/flux-ai-test', async (req, res) => {
   try {
-    const axios = require('axios');
-    const fluxAiConfig = require('../config/flux-ai');
-    
     console.log('[TEST] Testing FluxAI connection with:');
     console.log(`[TEST] API URL: ${fluxAiConfig.baseUrl}/v1/llms`);
     console.log(`[TEST] API Key present: ${!!fluxAiConfig.apiKey}`);
     
     // Test the connection to the FluxAI API
-    const response = await axios.get(
-      `${fluxAiConfig.baseUrl}/v1/llms`,
-      {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      }
-    );
+    const response = await aiClient.request({
+      method: 'GET',
+      url: `${fluxAiConfig.baseUrl}/v1/llms`,
+      purpose: 'connection_test'
+    });
     
     console.log('[TEST] FluxAI connection successful');
     
@@ -0,0 +1,98 @@
+// backend/scripts/benchmark-email-rendering.js
+//
+// Renders personalised campaign emails with compiled templates and compares
+// them with per-email placeholder replacement (the previous approach).
+// Usage: node scripts/benchmark-email-rendering.js [emailCount]
+
+const { performance } = require('perf_hooks');
+const { compileEmailTemplate } = require('../utils/template-compiler');
+
+const EMAIL_COUNT = parseInt(process.argv[2] || '10000', 10);
+const RUNS = 5;
+
+const TEMPLATE = {
+  subject: 'Invitation to provide feedback for {targetName} ({campaignName})',
+  content: `
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto;">
+      <h2 style="color: {primaryColor};">{companyName} 360 Feedback</h2>
+      <p>Hello {assessorName},</p>
+      <p>You've been invited to provide feedback for <strong>{targetName}</strong> as part of the <strong>{campaignName}</strong> feedback campaign.</p>
+      <p>Your insights are valuable for {targetName}'s professional development.</p>
+      <p>Please complete your feedback by {deadline}.</p>
+      <p><a href="{feedbackUrl}" style="display: inline-block; background-color: {primaryColor}; color: white; padding: 10px 20px;">Provide Feedback</a></p>
+      <p>If the button does not work, copy this link into your browser: {feedbackUrl}</p>
+      <p>Thank you for your participation!<br/>{companyName}</p>
+    </div>
+  `
+};
+
+const BRANDING = { companyName: 'Acme Corp', primaryColor: '#3B82F6' };
+
+// Per-email replacement as previously done in campaigns.controller.js
+function replacePlaceholders(template, data) {
+  let content = template;
+  for (const [key, value] of Object.entries(data)) {
+    content = content.replace(new RegExp(`{${key}}`, 'g'), value || '');
+  }
+  return content;
+}
+
+function generateRecipients(count) {
+  return Array.from({ length: count }, (_, i) => ({
+    assessorName: `Assessor ${i}`,
+    targetName: `Target ${i % 50}`,
+    campaignName: `Campaign ${i % 50}`,
+    deadline: new Date(2026, 0, 1 + (i % 28)).toLocaleDateString(),
+    feedbackUrl: `http://localhost:5173/feedback/token-${i}`
+  }));
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+function time(fn) {
+  const timings = [];
+  let output;
+  for (let run = 0; run < RUNS; run++) {
+    const start = performance.now();
+    output = fn();
+    timings.push(performance.now() - start);
+  }
+  return { ms: median(timings), output };
+}
+
+function run() {
+  const recipients = generateRecipients(EMAIL_COUNT);
+
+  const replaced = time(() => recipients.map(vars => {
+    const data = { ...vars, ...BRANDING };
+    return {
+      subject: replacePlaceholders(TEMPLATE.subject, data),
+      html: replacePlaceholders(TEMPLATE.content, data)
+    };
+  }));
+
+  const compiled = time(() => {
+    const render = compileEmailTemplate(TEMPLATE, BRANDING);
+    return recipients.map(vars => render(vars));
+  });
+
+  const identical = replaced.output.every((email, i) => (
+    email.subject === compiled.output[i].subject && email.html === compiled.output[i].html
+  ));
+
+  console.log(`Rendering ${EMAIL_COUNT} personalised emails (median of ${RUNS} runs)`);
+  console.log(`  per-email replacement: ${replaced.ms.toFixed(1)}ms (${(replaced.ms * 1000 / EMAIL_COUNT).toFixed(2)}us/email)`);
+  console.log(`  compiled template:     ${compiled.ms.toFixed(1)}ms (${(compiled.ms * 1000 / EMAIL_COUNT).toFixed(2)}us/email, incl. compile)`);
+  console.log(`  speed-up: ${(replaced.ms / compiled.ms).toFixed(1)}x, output identical: ${identical ? 'yes' : 'NO'}`);
+
+  return identical;
+}
+
+if (require.main === module) {
+  process.exit(run() ? 0 : 1);
+}
+
+module.exports = { generateRecipients };
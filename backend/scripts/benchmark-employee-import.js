@@ -0,0 +1,165 @@
+// backend/scripts/benchmark-employee-import.js
+//
+// Generates synthetic HR extracts and measures the employee import pipeline:
+// rows per second and peak memory. By default only the streaming reader runs;
+// with --db the full import (chunked lookups and bulk upserts) runs against a
+// throw-away SQLite file, twice, so the second pass measures updates.
+//
+// Usage:
+//   node scripts/benchmark-employee-import.js [--rows 10000,100000] [--xlsx] [--db] [--keep]
+
+const os = require('os');
+const path = require('path');
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index !== -1 && args[index + 1] ? args[index + 1] : fallback;
+};
+
+const ROW_COUNTS = option('rows', '10000,100000').split(',').map(n => parseInt(n, 10));
+const USE_XLSX = args.includes('--xlsx');
+const USE_DB = args.includes('--db');
+const KEEP = args.includes('--keep');
+
+const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'pulse360-import-'));
+if (USE_DB) {
+  process.env.DB_STORAGE = path.join(workDir, 'benchmark.sqlite');
+}
+
+const HEADERS = ['Employee ID', 'First Name', 'Last Name', 'Email', 'Job Title', 'Department', 'Sub Function', 'Level', 'Manager ID'];
+
+function syntheticRow(i) {
+  return [
+    `E${String(i).padStart(7, '0')}`,
+    `First${i}`,
+    `Last${i}`,
+    // Every 500th row has an invalid email to exercise per-row error reporting
+    i % 500 === 499 ? `broken-email-${i}` : `employee.${i}@example.com`,
+    `Job title ${i % 40}`,
+    `Department ${i % 12}`,
+    `Team ${i % 60}`,
+    ['Director', 'Manager', 'Senior', 'Associate'][i % 4],
+    i > 10 ? `E${String(Math.floor(i / 10)).padStart(7, '0')}` : ''
+  ];
+}
+
+// Write the CSV with a stream so generating the file doesn't skew memory use
+async function generateCsv(filePath, rowCount) {
+  const out = fs.createWriteStream(filePath);
+  const write = (line) => (out.write(line) ? Promise.resolve() : new Promise(resolve => out.once('drain', resolve)));
+
+  await write(`${HEADERS.join(',')}\n`);
+  for (let i = 0; i < rowCount; i++) {
+    await write(`${syntheticRow(i).join(',')}\n`);
+  }
+  await new Promise(resolve => out.end(resolve));
+}
+
+function generateXlsx(filePath, rowCount) {
+  const XLSX = require('xlsx');
+  const rows = [HEADERS];
+  for (let i = 0; i < rowCount; i++) rows.push(syntheticRow(i));
+  const workbook = XLSX.utils.book_new();
+  XLSX.utils.book_append_sheet(workbook, XLSX.utils.aoa_to_sheet(rows), 'Employees');
+  XLSX.writeFile(workbook, filePath);
+}
+
+// Sample RSS while the work runs to report the peak
+async function measure(work) {
+  if (global.gc) global.gc();
+  const baseline = process.memoryUsage().rss;
+  let peak = baseline;
+  const sampler = setInterval(() => {
+    peak = Math.max(peak, process.memoryUsage().rss);
+  }, 10);
+
+  const start = performance.now();
+  const output = await work();
+  const elapsed = performance.now() - start;
+
+  clearInterval(sampler);
+  peak = Math.max(peak, process.memoryUsage().rss);
+  return { output, elapsed, peakMb: (peak - baseline) / (1024 * 1024) };
+}
+
+async function readOnly(filePath) {
+  const { readRows, resolveColumns, mapRow, validateRecord } = require('../utils/employee-import-reader');
+  let columns = null;
+  let rows = 0;
+  let invalid = 0;
+
+  for await (const { cells } of readRows(filePath)) {
+    if (!columns) {
+      columns = resolveColumns(null, cells);
+      continue;
+    }
+    rows++;
+    if (validateRecord(mapRow(cells, columns))) invalid++;
+  }
+
+  return { rows, invalid };
+}
+
+async function run() {
+  let importService;
+  let sequelize;
+
+  if (USE_DB) {
+    console.log = () => {};
+    const models = require('../models');
+    sequelize = models.sequelize;
+    await models.syncDatabase(true);
+    importService = require('../services/import.service');
+  }
+
+  const report = (...parts) => process.stdout.write(`${parts.join(' ')}\n`);
+  report(`Employee import benchmark (${USE_DB ? 'full import into SQLite' : 'reader only'}, ${USE_XLSX ? 'xlsx' : 'csv'})`);
+
+  try {
+    for (const rowCount of ROW_COUNTS) {
+      const filePath = path.join(workDir, `employees-${rowCount}.${USE_XLSX ? 'xlsx' : 'csv'}`);
+      if (USE_XLSX) {
+        generateXlsx(filePath, rowCount);
+      } else {
+        await generateCsv(filePath, rowCount);
+      }
+      const sizeMb = fs.statSync(filePath).size / (1024 * 1024);
+      report(`\n${rowCount} rows (${sizeMb.toFixed(1)} MB)`);
+
+      if (!USE_DB) {
+        const { output, elapsed, peakMb } = await measure(() => readOnly(filePath));
+        report(`  read + map + validate: ${elapsed.toFixed(0)}ms, ${(output.rows / (elapsed / 1000)).toFixed(0)} rows/s, peak RSS +${peakMb.toFixed(1)} MB, ${output.invalid} invalid rows`);
+        continue;
+      }
+
+      for (const pass of ['insert', 'update']) {
+        const { output, elapsed, peakMb } = await measure(() => importService.processEmployeeFile({
+          filePath,
+          mapping: null,
+          batchId: `benchmark-${rowCount}-${pass}`
+        }));
+        report(`  ${pass} pass: ${elapsed.toFixed(0)}ms, ${(output.total / (elapsed / 1000)).toFixed(0)} rows/s, peak RSS +${peakMb.toFixed(1)} MB`);
+        report(`    inserted ${output.inserted}, updated ${output.updated}, errors ${output.errorCount}, duplicates ${output.duplicateCount}`);
+      }
+
+      await sequelize.query('DELETE FROM employees');
+    }
+  } finally {
+    if (sequelize) await sequelize.close();
+    if (!KEEP) fs.rmSync(workDir, { recursive: true, force: true });
+  }
+}
+
+if (require.main === module) {
+  run()
+    .then(() => process.exit(0))
+    .catch(err => {
+      console.error('Benchmark failed:', err);
+      process.exit(1);
+    });
+}
+
+module.exports = { generateCsv, generateXlsx };
@@ -0,0 +1,144 @@
+// backend/scripts/benchmark-question-dedup.js
+//
+// Deduplicates synthetic AI-generated question banks with the indexed engine
+// (utils/question-dedup.js) and with the previous pairwise comparison, and
+// checks that both keep the same questions.
+// Usage: node scripts/benchmark-question-dedup.js [questionCount] [--skip-pairwise]
+
+const { performance } = require('perf_hooks');
+const { deduplicateQuestionList, deduplicateQuestionGroups } = require('../utils/question-dedup');
+
+const args = process.argv.slice(2);
+const QUESTION_COUNT = parseInt(args.find(arg => /^\d+$/.test(arg)) || '10000', 10);
+const SKIP_PAIRWISE = args.includes('--skip-pairwise');
+const PERSPECTIVES = ['manager', 'peer', 'direct_report', 'self', 'external'];
+
+const OPENINGS = [
+  'How effectively does this person', 'How well does this person', 'To what extent does this person',
+  'How consistently does this person', 'How often does this person', 'Rate how well this person',
+  'What could this person do to better', 'Describe how this person', 'How successfully does this person'
+];
+const VERBS = [
+  'communicate', 'share', 'explain', 'prioritise', 'delegate', 'coach', 'support', 'challenge',
+  'listen to', 'give feedback on', 'plan', 'align', 'manage', 'resolve', 'negotiate', 'present'
+];
+const OBJECTS = [
+  'complex ideas', 'team goals', 'project risks', 'customer needs', 'conflicting priorities', 'strategic plans',
+  'difficult conversations', 'new initiatives', 'budget decisions', 'performance expectations',
+  'cross-functional work', 'stakeholder concerns', 'technical trade-offs', 'organisational change'
+];
+const CONTEXTS = [
+  'with the team', 'to senior leaders', 'under pressure', 'across departments', 'in meetings',
+  'with external partners', 'during change', 'when deadlines are tight', 'in writing', 'one to one', ''
+];
+
+// Small deterministic PRNG so runs are comparable
+function createRandom(seed) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6D2B79F5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+/**
+ * Generate questions the way AI responses look: varied phrasings with many
+ * near-duplicates (reworded, extended, re-punctuated or repeated questions)
+ * @param {number} count - Number of questions
+ * @param {number} seed - PRNG seed
+ * @returns {Array<Object>}
+ */
+function generateQuestions(count, seed = 42) {
+  const random = createRandom(seed);
+  const pick = (list) => list[Math.floor(random() * list.length)];
+  const questions = [];
+
+  for (let i = 0; i < count; i++) {
+    let text;
+    if (questions.length > 0 && random() < 0.3) {
+      // Variant of an earlier question
+      const words = pick(questions).text.replace(/\?$/, '').split(' ');
+      const change = random();
+      if (change < 0.3) {
+        words.push(pick(CONTEXTS) || 'consistently');
+      } else if (change < 0.6 && words.length > 4) {
+        words.splice(1 + Math.floor(random() * (words.length - 1)), 1);
+      } else if (change < 0.8) {
+        words[Math.floor(random() * words.length)] = pick(VERBS);
+      }
+      text = `${words.join(' ')}${random() < 0.5 ? '?' : '.'}`;
+      if (random() < 0.2) text = text.toUpperCase();
+    } else {
+      text = `${pick(OPENINGS)} ${pick(VERBS)} ${pick(OBJECTS)} ${pick(CONTEXTS)}`.trim();
+      // A share of unique detail keeps the vocabulary realistic
+      if (random() < 0.5) text += ` for ${pick(OBJECTS)} in area ${Math.floor(random() * 500)}`;
+      text += '?';
+    }
+
+    questions.push({
+      text,
+      type: random() < 0.75 ? 'rating' : 'open_ended',
+      perspective: PERSPECTIVES[i % PERSPECTIVES.length]
+    });
+  }
+
+  return questions;
+}
+
+function time(fn) {
+  const start = performance.now();
+  const output = fn();
+  return { ms: performance.now() - start, output };
+}
+
+const sameQuestions = (a, b) => a.length === b.length && a.every((question, i) => question === b[i]);
+
+function run() {
+  const { legacyDeduplicateQuestions } = require('./check-question-dedup');
+  const questions = generateQuestions(QUESTION_COUNT);
+  let identical = true;
+
+  console.log(`Deduplicating ${QUESTION_COUNT} synthetic questions`);
+
+  // One large question bank
+  const indexed = time(() => deduplicateQuestionList(questions));
+  console.log(`  single list, indexed:  ${indexed.ms.toFixed(1)}ms, kept ${indexed.output.length}`);
+
+  if (!SKIP_PAIRWISE) {
+    const pairwise = time(() => legacyDeduplicateQuestions(questions));
+    const same = sameQuestions(pairwise.output, indexed.output);
+    identical = identical && same;
+    console.log(`  single list, pairwise: ${pairwise.ms.toFixed(1)}ms, kept ${pairwise.output.length}`);
+    console.log(`  speed-up: ${(pairwise.ms / indexed.ms).toFixed(1)}x, same questions kept: ${same ? 'yes' : 'NO'}`);
+  }
+
+  // A template library: one group per template and perspective
+  const groups = {};
+  questions.forEach((question, i) => {
+    const key = `template-${Math.floor(i / 100)}:${question.perspective}`;
+    (groups[key] = groups[key] || []).push(question);
+  });
+
+  const indexedGroups = time(() => deduplicateQuestionGroups(groups));
+  const keptInGroups = Object.values(indexedGroups.output).reduce((sum, list) => sum + list.length, 0);
+  console.log(`\n  ${Object.keys(groups).length} groups, indexed batch: ${indexedGroups.ms.toFixed(1)}ms, kept ${keptInGroups}`);
+
+  if (!SKIP_PAIRWISE) {
+    const pairwiseGroups = time(() => Object.keys(groups).map(key => legacyDeduplicateQuestions(groups[key])));
+    const same = Object.keys(groups).every((key, i) => sameQuestions(pairwiseGroups.output[i], indexedGroups.output[key]));
+    identical = identical && same;
+    console.log(`  ${Object.keys(groups).length} groups, pairwise:      ${pairwiseGroups.ms.toFixed(1)}ms`);
+    console.log(`  same questions kept: ${same ? 'yes' : 'NO'}`);
+  }
+
+  return identical;
+}
+
+if (require.main === module) {
+  process.exit(run() ? 0 : 1);
+}
+
+module.exports = { generateQuestions, createRandom };
@@ -0,0 +1,108 @@
+// backend/scripts/benchmark-results-aggregation.js
+//
+// Measures how campaign results aggregation scales with the number of responses.
+// Usage: node scripts/benchmark-results-aggregation.js [questionCount]
+
+const { performance } = require('perf_hooks');
+const {
+  RELATIONSHIP_TYPES,
+  createAggregate,
+  addResponse,
+  buildRatingAverages,
+  buildAggregatedResponses
+} = require('../utils/results-aggregator');
+
+const RESPONSE_COUNTS = [1000, 10000, 100000, 500000];
+const RUNS = 5;
+
+// Build a synthetic template with a mix of rating and open-ended questions
+function generateQuestions(count) {
+  const questions = [];
+  for (let i = 0; i < count; i++) {
+    questions.push({
+      id: `question-${i}`,
+      text: `Synthetic question ${i}`,
+      type: i % 5 === 4 ? 'open_ended' : 'rating',
+      category: `Category ${i % 6}`,
+      perspective: 'all',
+      order: i
+    });
+  }
+  return questions;
+}
+
+// Build synthetic response rows as returned by the aggregation query
+function generateResponses(count, questions) {
+  const responses = [];
+  const participantCount = Math.max(1, Math.ceil(count / questions.length));
+
+  for (let i = 0; i < count; i++) {
+    const participant = i % participantCount;
+    const question = questions[i % questions.length];
+    responses.push({
+      id: `response-${i}`,
+      participantId: `participant-${participant}`,
+      questionId: question.id,
+      ratingValue: question.type === 'rating' ? 1 + (i % 5) : null,
+      textResponse: question.type === 'rating' ? null : `Answer ${i}`,
+      relationshipType: RELATIONSHIP_TYPES[participant % RELATIONSHIP_TYPES.length],
+      Question: question
+    });
+  }
+  return responses;
+}
+
+function aggregate(responses, questions) {
+  const result = createAggregate(questions);
+  responses.forEach(response => addResponse(result, response));
+
+  return {
+    ratingAverages: buildRatingAverages(result),
+    peer: buildAggregatedResponses(result, 'peer'),
+    directReport: buildAggregatedResponses(result, 'direct_report'),
+    external: buildAggregatedResponses(result, 'external')
+  };
+}
+
+function median(values) {
+  const sorted = [...values].sort((a, b) => a - b);
+  return sorted[Math.floor(sorted.length / 2)];
+}
+
+function run() {
+  const questionCount = parseInt(process.argv[2], 10) || 50;
+  const questions = generateQuestions(questionCount);
+
+  console.log(`Results aggregation benchmark (${questionCount} questions, median of ${RUNS} runs)`);
+  console.log('responses\ttotal ms\tus/response\tscaling vs previous');
+
+  let previous = null;
+  for (const count of RESPONSE_COUNTS) {
+    const responses = generateResponses(count, questions);
+
+    // Warm up once so JIT compilation is not part of the measurement
+    aggregate(responses.map(r => ({ ...r })), questions);
+
+    const timings = [];
+    for (let run = 0; run < RUNS; run++) {
+      const copy = responses.map(r => ({ ...r }));
+      const start = performance.now();
+      aggregate(copy, questions);
+      timings.push(performance.now() - start);
+    }
+
+    const ms = median(timings);
+    const scaling = previous
+      ? `${(ms / previous.ms).toFixed(1)}x time for ${(count / previous.count).toFixed(1)}x responses`
+      : '-';
+
+    console.log(`${count}\t\t${ms.toFixed(2)}\t${((ms * 1000) / count).toFixed(3)}\t\t${scaling}`);
+    previous = { count, ms };
+  }
+}
+
+if (require.main === module) {
+  run();
+}
+
+module.exports = { generateQuestions, generateResponses };
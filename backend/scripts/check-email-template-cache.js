@@ -0,0 +1,123 @@
+// backend/scripts/check-email-template-cache.js
+//
+// Checks that the compiled email template cache never keeps a renderer built
+// from a template or branding that was edited while the renderer was being
+// loaded. Each case holds one lookup open, edits the other source and clears
+// the cache mid-render, then expects the next render to show the edit.
+// Uses a throw-away SQLite file.
+//
+// Usage: node scripts/check-email-template-cache.js [--keep]
+
+const os = require('os');
+const path = require('path');
+const fs = require('fs');
+
+const KEEP = process.argv.includes('--keep');
+
+// Point the app at a scratch database before any model is loaded
+const storage = path.join(os.tmpdir(), `pulse360-email-template-cache-${Date.now()}.sqlite`);
+process.env.DB_STORAGE = storage;
+
+const report = (...parts) => process.stdout.write(`${parts.join(' ')}\n`);
+console.log = () => {};
+
+const { sequelize, syncDatabase, User, CommunicationTemplate, BrandingSettings } = require('../models');
+const emailTemplates = require('../services/email-template.service');
+
+const VARS = { assessorName: 'Alex', targetName: 'Sam', campaignName: 'Q3', deadline: 'Friday', feedbackUrl: 'http://localhost/feedback/x' };
+
+/**
+ * Make one of the service's lookups wait until released, so a render stays in flight
+ * @param {string} method - getTemplate or getBranding
+ * @returns {Function} - release(), which also restores the method
+ */
+function hold(method) {
+  let open;
+  const gate = new Promise(resolve => { open = resolve; });
+  const original = emailTemplates[method];
+
+  emailTemplates[method] = async (...methodArgs) => {
+    await gate;
+    return original.apply(emailTemplates, methodArgs);
+  };
+
+  return () => {
+    delete emailTemplates[method];
+    open();
+  };
+}
+
+async function run() {
+  await syncDatabase(true);
+  const admin = await User.findOne();
+  const options = { relationshipType: 'peer', templateType: 'invitation', userId: admin.id };
+
+  const template = await CommunicationTemplate.create({
+    name: 'Peer invitation',
+    templateType: 'invitation',
+    recipientType: 'peer',
+    subject: 'Old subject for {targetName}',
+    content: '<p>{companyName} asks {assessorName} for feedback</p>',
+    isDefault: true,
+    createdBy: admin.id
+  });
+  const branding = await BrandingSettings.create({ userId: admin.id, companyName: 'Old Company' });
+
+  const results = [];
+  const check = (name, passed, detail) => results.push({ name, passed, detail });
+
+  // Template edited while the branding lookup of a render is still pending
+  emailTemplates.invalidateTemplates();
+  emailTemplates.invalidateBranding(admin.id);
+  let release = hold('getBranding');
+  let inFlight = emailTemplates.render(options, VARS);
+  await emailTemplates.getTemplate(options.relationshipType, options.templateType);
+  await template.update({ subject: 'New subject for {targetName}' });
+  emailTemplates.invalidateTemplates();
+  release();
+  await inFlight;
+
+  let email = await emailTemplates.render(options, VARS);
+  check('template edited during a render', email.subject === 'New subject for Sam', email.subject);
+
+  // Branding edited while the template lookup of a render is still pending
+  emailTemplates.invalidateTemplates();
+  emailTemplates.invalidateBranding(admin.id);
+  release = hold('getTemplate');
+  inFlight = emailTemplates.render(options, VARS);
+  await emailTemplates.getBranding(admin.id);
+  await branding.update({ companyName: 'New Company' });
+  emailTemplates.invalidateBranding(admin.id);
+  release();
+  await inFlight;
+
+  email = await emailTemplates.render(options, VARS);
+  check('branding edited during a render', email.html.includes('New Company'), email.html);
+
+  // Without edits the renderer is cached and reused
+  const first = await emailTemplates.getRenderer(options.relationshipType, options.templateType, admin.id);
+  const second = await emailTemplates.getRenderer(options.relationshipType, options.templateType, admin.id);
+  check('unchanged renderer is reused', first === second);
+
+  let failed = 0;
+  for (const { name, passed, detail } of results) {
+    if (!passed) failed++;
+    report(`${passed ? 'PASS' : 'FAIL'}  ${name}${detail ? ` (${detail})` : ''}`);
+  }
+  report(`\n${results.length - failed}/${results.length} checks passed`);
+
+  return failed === 0;
+}
+
+if (require.main === module) {
+  run()
+    .then(async ok => {
+      await sequelize.close();
+      if (!KEEP && fs.existsSync(storage)) fs.unlinkSync(storage);
+      process.exit(ok ? 0 : 1);
+    })
+    .catch(err => {
+      console.error('Email template cache check failed:', err);
+      process.exit(1);
+    });
+}
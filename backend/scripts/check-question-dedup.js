@@ -0,0 +1,164 @@
+// backend/scripts/check-question-dedup.js
+//
+// Checks that the indexed question deduplication keeps exactly the questions
+// the previous pairwise implementation kept: hand-picked edge cases, then
+// random question sets with a small vocabulary so near-duplicates are common.
+// Usage: node scripts/check-question-dedup.js [randomTrials]
+
+const { calculateSimilarity, deduplicateQuestions } = require('../services/question-parser.service');
+const { deduplicateQuestionGroups } = require('../utils/question-dedup');
+
+const TRIALS = parseInt(process.argv[2] || '500', 10);
+
+// The previous implementation of deduplicateQuestions, kept as the reference
+function legacyDeduplicateQuestions(questions) {
+  const uniqueQuestions = [];
+  const textMap = new Set();
+
+  for (const question of questions) {
+    const normalizedText = question.text
+      .toLowerCase()
+      .replace(/[.,?!;:]/g, '')
+      .replace(/\s+/g, ' ')
+      .trim();
+
+    let isDuplicate = false;
+
+    if (textMap.has(normalizedText)) {
+      isDuplicate = true;
+    } else {
+      for (const existingQuestion of uniqueQuestions) {
+        const existingText = existingQuestion.text
+          .toLowerCase()
+          .replace(/[.,?!;:]/g, '')
+          .replace(/\s+/g, ' ')
+          .trim();
+
+        if (calculateSimilarity(normalizedText, existingText) > 0.85) {
+          isDuplicate = true;
+          break;
+        }
+      }
+    }
+
+    if (!isDuplicate) {
+      textMap.add(normalizedText);
+      uniqueQuestions.push(question);
+    }
+  }
+  return uniqueQuestions;
+}
+
+const EDGE_CASES = {
+  'exact and re-punctuated repeats': [
+    'How well does this person listen?', 'how well does this person listen', 'How  well does this person listen!!'
+  ],
+  'longer text containing a kept one': [
+    'How well does this person listen', 'How well does this person listen to the team every day'
+  ],
+  'shorter text contained in a kept one': [
+    'How well does this person listen to the team every day', 'How well does this person listen'
+  ],
+  'similarity exactly at the threshold is kept': [
+    // 17 of 20 shared words = 0.85, which is not above the threshold
+    'a b c d e f g h i j k l m n o p q r s t', 'a b c d e f g h i j k l m n o p q x y z'
+  ],
+  'just above the threshold is dropped': [
+    'a b c d e f g h i j k l m n o p q r s t', 'a b c d e f g h i j k l m n o p q r x y'
+  ],
+  'repeated words count once': [
+    'lead lead lead the team', 'lead the team team', 'the team'
+  ],
+  'empty and punctuation-only texts': [
+    '', '?!', '   ', 'Something', ''
+  ],
+  'single words': [
+    'Leadership', 'leadership?', 'Leadership skills', 'Skills'
+  ],
+  'dropped question does not hide later ones': [
+    'a b c d e f g', 'a b c d e f g h', 'h i j k l m n', 'a b c d e f x'
+  ],
+  'tabs, newlines and other whitespace': [
+    'How\twell does\nthis person plan?', 'how well does this person plan', 'How well does this person plan'
+  ]
+};
+
+// Random texts from a small vocabulary so that overlaps are frequent
+function randomQuestions(random, count) {
+  const vocabulary = 'the a this person team how well does lead plan share listen coach goals risks clearly often change support'.split(' ');
+  const punctuation = ['', '?', '.', '!', ',', ';'];
+  const questions = [];
+
+  for (let i = 0; i < count; i++) {
+    if (questions.length > 0 && random() < 0.25) {
+      // Edit an earlier question
+      const words = questions[Math.floor(random() * questions.length)].text.split(' ');
+      if (random() < 0.5) words.push(vocabulary[Math.floor(random() * vocabulary.length)]);
+      else if (words.length > 1) words.splice(Math.floor(random() * words.length), 1);
+      questions.push({ text: words.join(random() < 0.1 ? '  ' : ' ') });
+      continue;
+    }
+
+    const length = 1 + Math.floor(random() * 14);
+    const words = Array.from({ length }, () => {
+      const word = vocabulary[Math.floor(random() * vocabulary.length)];
+      return (random() < 0.1 ? word.toUpperCase() : word) + punctuation[Math.floor(random() * punctuation.length)];
+    });
+    questions.push({ text: words.join(' ') });
+  }
+
+  return questions;
+}
+
+const sameQuestions = (a, b) => a.length === b.length && a.every((question, i) => question === b[i]);
+
+function run() {
+  const { createRandom } = require('./benchmark-question-dedup');
+  const results = [];
+  const check = (name, passed, detail) => results.push({ name, passed, detail });
+
+  for (const [name, texts] of Object.entries(EDGE_CASES)) {
+    const questions = texts.map(text => ({ text }));
+    const expected = legacyDeduplicateQuestions(questions);
+    const actual = deduplicateQuestions(questions);
+    check(name, sameQuestions(expected, actual), `kept ${actual.length} of ${questions.length}`);
+  }
+
+  const random = createRandom(7);
+  let mismatches = 0;
+  let groupMismatches = 0;
+  let compared = 0;
+
+  for (let trial = 0; trial < TRIALS; trial++) {
+    const questions = randomQuestions(random, 1 + Math.floor(random() * 200));
+    compared += questions.length;
+    if (!sameQuestions(legacyDeduplicateQuestions(questions), deduplicateQuestions(questions))) {
+      mismatches++;
+    }
+
+    // The batch API gives every group the result of deduplicating it alone
+    const groups = { first: questions.slice(0, 50), second: questions.slice(50), third: [] };
+    const batch = deduplicateQuestionGroups(groups);
+    if (!Object.keys(groups).every(key => sameQuestions(legacyDeduplicateQuestions(groups[key]), batch[key]))) {
+      groupMismatches++;
+    }
+  }
+
+  check('random question sets', mismatches === 0, `${TRIALS} sets, ${compared} questions, ${mismatches} mismatch(es)`);
+  check('random sets deduplicated as groups', groupMismatches === 0, `${groupMismatches} mismatch(es)`);
+
+  let failed = 0;
+  for (const { name, passed, detail } of results) {
+    if (!passed) failed++;
+    console.log(`${passed ? 'PASS' : 'FAIL'}  ${name}${detail ? ` (${detail})` : ''}`);
+  }
+  console.log(`\n${results.length - failed}/${results.length} checks passed`);
+
+  return failed === 0;
+}
+
+if (require.main === module) {
+  process.exit(run() ? 0 : 1);
+}
+
+module.exports = { legacyDeduplicateQuestions };
@@ -0,0 +1,239 @@
+// backend/scripts/load-test-dashboard.js
+//
+// Loads the dashboard stats endpoint against a throw-away SQLite file, with
+// the cache cleared before every request and then with it warm. Reports
+// latency and SQL queries per request from /api/metrics, and checks the stats
+// against the separate queries the endpoint used to run.
+//
+// Usage:
+//   node scripts/load-test-dashboard.js [--campaigns 200] [--participants 50]
+//                                       [--requests 200] [--concurrency 20] [--keep]
+
+const os = require('os');
+const path = require('path');
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index !== -1 && args[index + 1] ? parseInt(args[index + 1], 10) : fallback;
+};
+
+const CAMPAIGNS = option('campaigns', 200);
+const PARTICIPANTS = option('participants', 50);
+const REQUESTS = option('requests', 200);
+const CONCURRENCY = option('concurrency', 20);
+const KEEP = args.includes('--keep');
+
+// Point the app at a scratch database before any model is loaded
+const storage = path.join(os.tmpdir(), `pulse360-dashboard-test-${Date.now()}.sqlite`);
+process.env.DB_STORAGE = storage;
+process.env.NODE_ENV = 'production';
+
+const axios = require('axios');
+
+// Silence per-request logging from the app so it does not skew the timings
+const report = (...parts) => process.stdout.write(`${parts.join(' ')}\n`);
+console.log = () => {};
+
+const {
+  sequelize,
+  syncDatabase,
+  User,
+  Employee,
+  Template,
+  Campaign,
+  CampaignParticipant,
+  Insight
+} = require('../models');
+const { enableWriteAheadLog } = require('../config/database');
+const dashboardStats = require('../services/dashboard-stats.service');
+const metrics = require('../middleware/metrics.middleware');
+const app = require('../app');
+
+const DAY = 24 * 60 * 60 * 1000;
+const STATUSES = ['draft', 'active', 'active', 'completed'];
+
+async function seed() {
+  await syncDatabase(true);
+  await enableWriteAheadLog();
+
+  const admin = await User.findOne();
+
+  const employees = await Employee.bulkCreate(
+    Array.from({ length: PARTICIPANTS + 1 }, (_, i) => ({
+      employeeId: `DASH-${i}`,
+      firstName: 'Dashboard',
+      lastName: `Tester ${i}`,
+      email: `dashboard.tester.${i}@example.com`
+    }))
+  );
+  const [target, ...assessors] = employees;
+
+  const templates = await Template.bulkCreate(
+    Array.from({ length: 20 }, (_, i) => ({
+      name: `Dashboard template ${i}`,
+      documentType: 'leadership_model',
+      status: i % 3 === 0 ? 'pending_review' : 'approved',
+      createdBy: admin.id
+    }))
+  );
+
+  const campaigns = await Campaign.bulkCreate(
+    Array.from({ length: CAMPAIGNS }, (_, i) => ({
+      name: `Dashboard campaign ${i}`,
+      status: STATUSES[i % STATUSES.length],
+      templateId: templates[i % templates.length].id,
+      targetEmployeeId: target.id,
+      createdBy: admin.id,
+      startDate: new Date(Date.now() - 7 * DAY),
+      endDate: new Date(Date.now() + ((i % 30) - 5) * DAY)
+    }))
+  );
+
+  for (const [c, campaign] of campaigns.entries()) {
+    await CampaignParticipant.bulkCreate(
+      assessors.map((employee, i) => ({
+        campaignId: campaign.id,
+        employeeId: employee.id,
+        relationshipType: 'peer',
+        status: (i + c) % 3 === 0 ? 'completed' : 'invited',
+        invitationToken: `${campaign.id}-${employee.id}`
+      }))
+    );
+  }
+
+  await Insight.bulkCreate(
+    campaigns.slice(0, Math.ceil(CAMPAIGNS / 4)).map((campaign, i) => ({
+      campaignId: campaign.id,
+      type: 'growth_blueprint',
+      status: 'completed',
+      title: `Dashboard insight ${i}`
+    }))
+  );
+}
+
+// The counters as the endpoint computed them before, one query each
+async function legacyCounts() {
+  const [[participants]] = await sequelize.query(`
+    SELECT COUNT(DISTINCT CP.id) as activeCount, COUNT(DISTINCT CP.campaignId) as cycleCount
+    FROM campaign_participants CP
+    JOIN campaigns C ON CP.campaignId = C.id
+    WHERE C.status = 'active'
+  `);
+  const [[responses]] = await sequelize.query(`
+    SELECT
+      (SELECT COALESCE(SUM(responseCount), 0) FROM campaign_result_snapshots) as count,
+      CASE
+        WHEN (SELECT COUNT(*) FROM campaign_participants) > 0
+        THEN (SELECT COUNT(*) FROM campaign_participants WHERE status = 'completed') * 100.0 /
+             (SELECT COUNT(*) FROM campaign_participants)
+        ELSE 0
+      END as completionRate
+  `);
+  const [[templates]] = await sequelize.query(`
+    SELECT
+      COALESCE(SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END), 0) as activeCount,
+      COALESCE(SUM(CASE WHEN status = 'pending_approval' THEN 1 ELSE 0 END), 0) as pendingCount
+    FROM templates
+  `);
+  const [[reports]] = await sequelize.query(`
+    SELECT COALESCE(COUNT(*), 0) as count FROM insights WHERE createdAt >= datetime('now', '-30 days')
+  `);
+
+  return { participants, responses, templates, reports };
+}
+
+async function compareWithLegacy() {
+  dashboardStats.invalidate();
+  const stats = await dashboardStats.getStats();
+  const legacy = await legacyCounts();
+  const mismatches = [];
+
+  for (const [section, values] of Object.entries(legacy)) {
+    for (const [field, expected] of Object.entries(values)) {
+      const actual = stats[section][field];
+      if (Math.abs(Number(actual) - Number(expected)) > 1e-9) {
+        mismatches.push(`${section}.${field}: ${actual} (expected ${expected})`);
+      }
+    }
+  }
+
+  return mismatches;
+}
+
+async function load(baseUrl, { cold }) {
+  const latencies = [];
+  let remaining = REQUESTS;
+
+  const worker = async () => {
+    while (remaining > 0) {
+      remaining--;
+      if (cold) dashboardStats.invalidate();
+      const start = performance.now();
+      await axios.get(`${baseUrl}/api/dashboard/raw-stats`);
+      latencies.push(performance.now() - start);
+    }
+  };
+
+  // Cold requests run one at a time so each one really computes the stats
+  await Promise.all(Array.from({ length: cold ? 1 : CONCURRENCY }, worker));
+  return latencies.sort((a, b) => a - b);
+}
+
+function percentile(sorted, p) {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+async function summarize(label, baseUrl, latencies) {
+  const { data } = await axios.get(`${baseUrl}/api/metrics`);
+  const route = data.routes['GET /api/dashboard/raw-stats'];
+
+  report(`\n${label}`);
+  report(`  latency ms  p50: ${percentile(latencies, 50).toFixed(1)}  p95: ${percentile(latencies, 95).toFixed(1)}  max: ${latencies[latencies.length - 1].toFixed(1)}`);
+  report(`  server-side average: ${route.latencyMs.average}ms, histogram p95 bound: ${route.latencyMs.p95}ms`);
+  report(`  SQL per request: ${route.sql.averageQueries} queries (max ${route.sql.maxQueries}), ${route.sql.averageMs}ms`);
+
+  metrics.resetMetrics();
+}
+
+async function run() {
+  report(`Dashboard stats load test: ${CAMPAIGNS} campaigns x ${PARTICIPANTS} participants, ${REQUESTS} requests`);
+  report(`Database: ${storage}`);
+
+  await seed();
+  const server = app.listen(0);
+  const baseUrl = `http://127.0.0.1:${server.address().port}`;
+
+  try {
+    const mismatches = await compareWithLegacy();
+    report(`\nStats match the previous separate queries: ${mismatches.length === 0 ? 'yes' : 'NO'}`);
+    mismatches.forEach(mismatch => report(`  - ${mismatch}`));
+
+    metrics.resetMetrics();
+    await summarize('Cache cleared before every request', baseUrl, await load(baseUrl, { cold: true }));
+    await summarize(`Warm cache, concurrency ${CONCURRENCY}`, baseUrl, await load(baseUrl, { cold: false }));
+
+    return mismatches.length === 0;
+  } finally {
+    server.close();
+    await sequelize.close();
+
+    if (!KEEP) {
+      [storage, `${storage}-wal`, `${storage}-shm`].forEach(file => {
+        if (fs.existsSync(file)) fs.unlinkSync(file);
+      });
+    }
+  }
+}
+
+if (require.main === module) {
+  run()
+    .then(ok => process.exit(ok ? 0 : 1))
+    .catch(err => {
+      console.error('Load test failed:', err);
+      process.exit(1);
+    });
+}
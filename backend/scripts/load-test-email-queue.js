@@ -0,0 +1,185 @@
+// backend/scripts/load-test-email-queue.js
+//
+// Pushes a batch of campaign emails through the persistent email queue against
+// a local SMTP stand-in and reports throughput, retries and communication logs.
+// Uses a throw-away SQLite file, so no real mail server or data is touched.
+//
+// Usage:
+//   node scripts/load-test-email-queue.js [--emails 500] [--concurrency 5]
+//                                         [--rate 50] [--fail-rate 0.05]
+//                                         [--latency 20] [--keep]
+
+const os = require('os');
+const net = require('net');
+const path = require('path');
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index !== -1 && args[index + 1] ? parseFloat(args[index + 1]) : fallback;
+};
+
+const EMAILS = option('emails', 500);
+const CONCURRENCY = option('concurrency', 5);
+const RATE = option('rate', 50);
+const FAIL_RATE = option('fail-rate', 0.05);
+const LATENCY = option('latency', 20);
+const KEEP = args.includes('--keep');
+
+// Configure the queue and point the app at a scratch database before any model is loaded
+const storage = path.join(os.tmpdir(), `pulse360-email-queue-${Date.now()}.sqlite`);
+process.env.DB_STORAGE = storage;
+process.env.EMAIL_QUEUE_CONCURRENCY = String(CONCURRENCY);
+process.env.EMAIL_QUEUE_RATE_LIMIT = String(RATE);
+process.env.EMAIL_QUEUE_POLL_INTERVAL = '100';
+process.env.EMAIL_QUEUE_RETRY_DELAY = '200';
+
+/**
+ * Minimal SMTP server that accepts every message, optionally after a delay,
+ * and rejects a share of recipients with a temporary error
+ * @param {Object} options - latency (ms per message) and failRate (0-1)
+ * @returns {Promise<Object>} - { server, port, stats }
+ */
+function startSmtpStandIn({ latency = 0, failRate = 0 } = {}) {
+  const stats = { connections: 0, accepted: 0, rejected: 0 };
+
+  const server = net.createServer(socket => {
+    stats.connections++;
+    let buffer = '';
+    let inData = false;
+
+    socket.write('220 localhost SMTP stand-in\r\n');
+
+    socket.on('data', chunk => {
+      buffer += chunk.toString('utf8');
+
+      while (buffer.length > 0) {
+        if (inData) {
+          const end = buffer.indexOf('\r\n.\r\n');
+          if (end === -1) return;
+          buffer = buffer.slice(end + 5);
+          inData = false;
+          stats.accepted++;
+          setTimeout(() => socket.write(`250 2.0.0 Ok: queued as ${stats.accepted}\r\n`), latency);
+          continue;
+        }
+
+        const lineEnd = buffer.indexOf('\r\n');
+        if (lineEnd === -1) return;
+        const line = buffer.slice(0, lineEnd);
+        buffer = buffer.slice(lineEnd + 2);
+        const command = line.slice(0, 4).toUpperCase();
+
+        if (command === 'EHLO' || command === 'HELO') {
+          socket.write('250-localhost\r\n250 PIPELINING\r\n');
+        } else if (command === 'RCPT' && Math.random() < failRate) {
+          stats.rejected++;
+          socket.write('451 4.3.0 Temporary failure, try again later\r\n');
+        } else if (command === 'DATA') {
+          inData = true;
+          socket.write('354 End data with <CR><LF>.<CR><LF>\r\n');
+        } else if (command === 'QUIT') {
+          socket.end('221 2.0.0 Bye\r\n');
+        } else {
+          socket.write('250 2.0.0 Ok\r\n');
+        }
+      }
+    });
+
+    socket.on('error', () => {});
+  });
+
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, port: server.address().port, stats }));
+  });
+}
+
+async function run() {
+  const report = (...parts) => process.stdout.write(`${parts.join(' ')}\n`);
+  console.log = () => {};
+
+  const { sequelize, syncDatabase, EmailSettings } = require('../models');
+  const { enableWriteAheadLog } = require('../config/database');
+  const emailService = require('../services/email.service');
+  const emailQueue = require('../services/email-queue.service');
+
+  report(`Email queue load test: ${EMAILS} emails, concurrency ${CONCURRENCY}, ${RATE}/s, fail rate ${FAIL_RATE}`);
+  report(`Database: ${storage}`);
+
+  const smtp = await startSmtpStandIn({ latency: LATENCY, failRate: FAIL_RATE });
+  await syncDatabase(true);
+  await enableWriteAheadLog();
+
+  const settings = await EmailSettings.findOne() || await EmailSettings.create({});
+  await settings.update({
+    host: '127.0.0.1',
+    port: String(smtp.port),
+    secure: false,
+    requireAuth: false,
+    fromEmail: 'pulse360@example.com',
+    fromName: 'Pulse360 Load Test',
+    devMode: false
+  });
+  await emailService.initialize();
+
+  try {
+    let start = performance.now();
+    const { batchId } = await emailQueue.enqueue(
+      Array.from({ length: EMAILS }, (_, i) => ({
+        recipient: `assessor.${i}@example.com`,
+        subject: `Feedback request ${i}`,
+        html: `<p>Please provide your feedback, assessor ${i}.</p>`,
+        communicationType: i % 2 === 0 ? 'invitation' : 'instruction'
+      }))
+    );
+    report(`\nEnqueued in ${(performance.now() - start).toFixed(1)}ms (this is what the launch request waits for)`);
+
+    start = performance.now();
+    await emailQueue.start();
+
+    let progress = await emailQueue.getBatchProgress(batchId);
+    while (!progress.completed) {
+      await new Promise(resolve => setTimeout(resolve, 250));
+      progress = await emailQueue.getBatchProgress(batchId);
+    }
+    const elapsed = performance.now() - start;
+
+    const [{ attempts }] = await sequelize.query(
+      'SELECT SUM(attempts) AS attempts FROM email_jobs WHERE batchId = ?',
+      { replacements: [batchId], type: sequelize.QueryTypes.SELECT }
+    );
+    const [{ logs }] = await sequelize.query(
+      'SELECT COUNT(*) AS logs FROM communication_logs',
+      { type: sequelize.QueryTypes.SELECT }
+    );
+
+    report(`Drained in ${(elapsed / 1000).toFixed(2)}s: ${(progress.sent / (elapsed / 1000)).toFixed(1)} emails/s`);
+    report(`  sent: ${progress.sent}, failed: ${progress.failed}, delivery attempts: ${attempts}`);
+    report(`  SMTP connections opened: ${smtp.stats.connections}, temporary rejections: ${smtp.stats.rejected}`);
+    report(`  communication_logs rows: ${logs} (expected ${progress.sent + progress.failed})`);
+  } finally {
+    await emailQueue.stop();
+    if (emailService.transporter) emailService.transporter.close();
+    smtp.server.close();
+    await sequelize.close();
+
+    if (!KEEP) {
+      [storage, `${storage}-wal`, `${storage}-shm`].forEach(file => {
+        if (fs.existsSync(file)) fs.unlinkSync(file);
+      });
+    }
+  }
+}
+
+if (require.main === module) {
+  run()
+    .then(() => process.exit(0))
+    .catch(err => {
+      console.error('Load test failed:', err);
+      process.exit(1);
+    });
+}
+
+module.exports = { startSmtpStandIn };
@@ -0,0 +1,203 @@
+// backend/scripts/load-test-feedback.js
+//
+// Simulates many assessors submitting feedback at the same time against a
+// throw-away SQLite file and reports latency percentiles and SQLITE_BUSY rates.
+//
+// Usage:
+//   node scripts/load-test-feedback.js [--participants 300] [--questions 40]
+//                                      [--concurrency 300] [--resubmit] [--keep]
+
+const os = require('os');
+const path = require('path');
+const fs = require('fs');
+const { performance } = require('perf_hooks');
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index !== -1 && args[index + 1] ? parseInt(args[index + 1], 10) : fallback;
+};
+
+const PARTICIPANTS = option('participants', 300);
+const QUESTIONS = option('questions', 40);
+const CONCURRENCY = option('concurrency', PARTICIPANTS);
+const RESUBMIT = args.includes('--resubmit');
+const KEEP = args.includes('--keep');
+
+// Point the app at a scratch database before any model is loaded. Development
+// mode makes the API return error messages, which is how SQLITE_BUSY is counted.
+const storage = path.join(os.tmpdir(), `pulse360-load-test-${Date.now()}.sqlite`);
+process.env.DB_STORAGE = storage;
+process.env.NODE_ENV = 'development';
+
+const axios = require('axios');
+const { v4: uuidv4 } = require('uuid');
+
+// Silence per-request logging from the app so it does not skew the timings
+const report = (...parts) => process.stdout.write(`${parts.join(' ')}\n`);
+console.log = () => {};
+
+const {
+  sequelize,
+  syncDatabase,
+  User,
+  Employee,
+  Template,
+  Question,
+  Campaign,
+  CampaignParticipant
+} = require('../models');
+const { enableWriteAheadLog } = require('../config/database');
+const resultSnapshotService = require('../services/result-snapshot.service');
+const app = require('../app');
+
+async function seed() {
+  await syncDatabase(true);
+  await enableWriteAheadLog();
+
+  const admin = await User.findOne();
+
+  const employees = await Employee.bulkCreate(
+    Array.from({ length: PARTICIPANTS + 1 }, (_, i) => ({
+      employeeId: `LOAD-${i}`,
+      firstName: 'Load',
+      lastName: `Tester ${i}`,
+      email: `load.tester.${i}@example.com`
+    }))
+  );
+  const [target, ...assessors] = employees;
+
+  const template = await Template.create({
+    name: 'Load test template',
+    documentType: 'leadership_model',
+    createdBy: admin.id
+  });
+
+  const questions = await Question.bulkCreate(
+    Array.from({ length: QUESTIONS }, (_, i) => ({
+      text: `Load test question ${i}`,
+      type: i % 4 === 3 ? 'open_ended' : 'rating',
+      category: `Category ${i % 5}`,
+      perspective: 'peer',
+      order: i,
+      templateId: template.id
+    }))
+  );
+
+  const campaign = await Campaign.create({
+    name: 'Load test campaign',
+    status: 'active',
+    templateId: template.id,
+    targetEmployeeId: target.id,
+    createdBy: admin.id,
+    startDate: new Date(),
+    endDate: new Date(Date.now() + 7 * 24 * 60 * 60 * 1000)
+  });
+
+  const participants = await CampaignParticipant.bulkCreate(
+    assessors.map(employee => ({
+      campaignId: campaign.id,
+      employeeId: employee.id,
+      relationshipType: 'peer',
+      status: 'invited',
+      invitationToken: uuidv4()
+    }))
+  );
+
+  await resultSnapshotService.rebuildCampaignSnapshot(campaign.id);
+
+  return { campaign, target, questions, participants };
+}
+
+function buildPayload({ campaign, target, questions }, participant) {
+  return {
+    campaignId: campaign.id,
+    assessorToken: participant.invitationToken,
+    targetEmployeeId: target.id,
+    responses: questions.map(question => (
+      question.type === 'rating'
+        ? { questionId: question.id, rating: 1 + Math.floor(Math.random() * 5) }
+        : { questionId: question.id, text: `Load test answer from ${participant.id}` }
+    ))
+  };
+}
+
+async function submitAll(baseUrl, fixture) {
+  const results = [];
+  const queue = [...fixture.participants];
+
+  const worker = async () => {
+    while (queue.length > 0) {
+      const participant = queue.shift();
+      const start = performance.now();
+      try {
+        await axios.post(`${baseUrl}/api/feedback/submit`, buildPayload(fixture, participant));
+        results.push({ ms: performance.now() - start, ok: true });
+      } catch (error) {
+        const message = (error.response && error.response.data && error.response.data.error) || error.message;
+        results.push({ ms: performance.now() - start, ok: false, busy: /SQLITE_BUSY/.test(message) });
+      }
+    }
+  };
+
+  const start = performance.now();
+  await Promise.all(Array.from({ length: Math.min(CONCURRENCY, queue.length) }, worker));
+  return { results, elapsed: performance.now() - start };
+}
+
+function percentile(sorted, p) {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)];
+}
+
+function summarize(label, { results, elapsed }) {
+  const latencies = results.map(r => r.ms).sort((a, b) => a - b);
+  const failed = results.filter(r => !r.ok).length;
+  const busy = results.filter(r => r.busy).length;
+
+  report(`\n${label}`);
+  report(`  submissions: ${results.length}, failed: ${failed}, SQLITE_BUSY: ${busy} (${((busy / results.length) * 100).toFixed(1)}%)`);
+  report(`  latency ms  p50: ${percentile(latencies, 50).toFixed(1)}  p95: ${percentile(latencies, 95).toFixed(1)}  p99: ${percentile(latencies, 99).toFixed(1)}  max: ${latencies[latencies.length - 1].toFixed(1)}`);
+  report(`  throughput: ${(results.length / (elapsed / 1000)).toFixed(1)} submissions/s`);
+}
+
+async function run() {
+  report(`Feedback submission load test: ${PARTICIPANTS} assessors x ${QUESTIONS} questions, concurrency ${CONCURRENCY}`);
+  report(`Database: ${storage}`);
+
+  const fixture = await seed();
+  const server = app.listen(0);
+  const baseUrl = `http://127.0.0.1:${server.address().port}`;
+
+  try {
+    summarize('First submission', await submitAll(baseUrl, fixture));
+
+    if (RESUBMIT) {
+      summarize('Re-submission (replaces previous answers)', await submitAll(baseUrl, fixture));
+    }
+
+    const campaign = await Campaign.findByPk(fixture.campaign.id);
+    const check = await resultSnapshotService.checkCampaignSnapshot(fixture.campaign.id);
+    report(`\nCampaign completion rate: ${campaign.completionRate}% (status: ${campaign.status})`);
+    report(`Results snapshot consistent with raw responses: ${check.consistent ? 'yes' : 'NO'}`);
+    check.mismatches.slice(0, 10).forEach(mismatch => report(`  - ${mismatch}`));
+  } finally {
+    server.close();
+    await sequelize.close();
+
+    if (!KEEP) {
+      [storage, `${storage}-wal`, `${storage}-shm`].forEach(file => {
+        if (fs.existsSync(file)) fs.unlinkSync(file);
+      });
+    }
+  }
+}
+
+if (require.main === module) {
+  run()
+    .then(() => process.exit(0))
+    .catch(err => {
+      console.error('Load test failed:', err);
+      process.exit(1);
+    });
+}
@@ -0,0 +1,70 @@
+// backend/scripts/rebuild-result-snapshots.js
+//
+// Rebuild (backfill) campaign results snapshots from raw responses, or check
+// them against the live computation.
+//
+// Usage:
+//   node scripts/rebuild-result-snapshots.js                 rebuild every campaign
+//   node scripts/rebuild-result-snapshots.js --stale         rebuild campaigns without a snapshot
+//   node scripts/rebuild-result-snapshots.js <campaignId>    rebuild one campaign
+//   node scripts/rebuild-result-snapshots.js --check [id]    compare snapshots with live results
+
+const { Campaign } = require('../models');
+const resultSnapshotService = require('../services/result-snapshot.service');
+
+async function checkSnapshots(campaignId) {
+  const campaignIds = campaignId
+    ? [campaignId]
+    : (await Campaign.findAll({ attributes: ['id'] })).map(c => c.id);
+
+  let inconsistent = 0;
+  for (const id of campaignIds) {
+    const result = await resultSnapshotService.checkCampaignSnapshot(id);
+    if (result.consistent) {
+      console.log(`[OK] ${id}`);
+    } else {
+      inconsistent++;
+      console.log(`[MISMATCH] ${id}`);
+      result.mismatches.forEach(mismatch => console.log(`  - ${mismatch}`));
+    }
+  }
+
+  console.log(`Checked ${campaignIds.length} campaign(s), ${inconsistent} inconsistent.`);
+  return inconsistent === 0;
+}
+
+async function rebuildSnapshots(args) {
+  const campaignId = args.find(arg => !arg.startsWith('--'));
+
+  if (campaignId) {
+    const rowCount = await resultSnapshotService.rebuildCampaignSnapshot(campaignId);
+    console.log(`Rebuilt snapshot for campaign ${campaignId} (${rowCount} rows).`);
+    return true;
+  }
+
+  const rebuilt = await resultSnapshotService.rebuildAllSnapshots({
+    onlyStale: args.includes('--stale')
+  });
+  console.log(`Rebuilt snapshots for ${rebuilt.length} campaign(s).`);
+  return true;
+}
+
+// Run the function if this file is executed directly
+if (require.main === module) {
+  const args = process.argv.slice(2);
+  const task = args.includes('--check')
+    ? checkSnapshots(args.find(arg => !arg.startsWith('--')))
+    : rebuildSnapshots(args);
+
+  task
+    .then(ok => {
+      console.log('Script completed.');
+      process.exit(ok ? 0 : 1);
+    })
+    .catch(err => {
+      console.error('Script failed:', err);
+      process.exit(1);
+    });
+}
+
+module.exports = { checkSnapshots, rebuildSnapshots };
@@ -0,0 +1,162 @@
+// backend/scripts/test-ai-client.js
+//
+// Exercises the shared AI client against a local mock of the Flux AI chat
+// endpoint: in-flight coalescing, cache hits, TTL expiry, LRU eviction,
+// the concurrency limit and keep-alive connection reuse. No database or
+// API key is needed (the persistent cache tier is disabled).
+// Usage: node scripts/test-ai-client.js
+
+const http = require('http');
+
+const MAX_CONCURRENCY = 3;
+const RESPONSE_DELAY_MS = 50;
+
+process.env.FLUX_AI_API_KEY = process.env.FLUX_AI_API_KEY || 'test-key';
+process.env.FLUX_AI_CACHE_PERSISTENT = 'false';
+process.env.FLUX_AI_MAX_CONCURRENCY = String(MAX_CONCURRENCY);
+
+/**
+ * Start a mock chat completions server that records what it receives
+ * @returns {Promise<Object>} - { server, port, stats }
+ */
+function startMockServer() {
+  const stats = { requests: 0, active: 0, peakActive: 0, connections: 0, authHeaders: [] };
+
+  const server = http.createServer((req, res) => {
+    let body = '';
+    req.on('data', chunk => { body += chunk; });
+    req.on('end', () => {
+      stats.requests++;
+      stats.active++;
+      stats.peakActive = Math.max(stats.peakActive, stats.active);
+      stats.authHeaders.push(req.headers['x-api-key'] ? 'x-api-key' : req.headers.authorization ? 'bearer' : 'none');
+
+      const { messages = [] } = JSON.parse(body || '{}');
+      const prompt = messages.length > 0 ? messages[messages.length - 1].content : '';
+
+      setTimeout(() => {
+        stats.active--;
+        res.writeHead(200, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({
+          choices: [{ message: { role: 'assistant', content: `echo: ${prompt}` } }],
+          usage: { prompt_tokens: prompt.length, completion_tokens: prompt.length + 6 }
+        }));
+      }, RESPONSE_DELAY_MS);
+    });
+  });
+
+  server.on('connection', () => { stats.connections++; });
+
+  return new Promise(resolve => {
+    server.listen(0, '127.0.0.1', () => resolve({ server, port: server.address().port, stats }));
+  });
+}
+
+const prompt = (text) => ({ messages: [{ role: 'user', content: text }], stream: false });
+
+async function run() {
+  const { server, port, stats } = await startMockServer();
+  process.env.FLUX_AI_BASE_URL = `http://127.0.0.1:${port}`;
+
+  // Loaded after the environment is set, as the config reads it on require
+  const fluxAiConfig = require('../config/flux-ai');
+  const { AiClient } = require('../services/ai-client.service');
+
+  const createClient = (cache = {}) => new AiClient({
+    ...fluxAiConfig,
+    cache: { ...fluxAiConfig.cache, ...cache }
+  });
+
+  const quiet = console.log;
+  console.log = () => {};
+
+  const results = [];
+  const check = (name, passed, detail) => results.push({ name, passed, detail });
+  const resetServer = () => Object.assign(stats, { requests: 0, peakActive: 0, connections: 0, authHeaders: [] });
+
+  try {
+    // Identical prompts in flight at the same time reach the API once
+    let client = createClient();
+    resetServer();
+    const answers = await Promise.all(Array.from({ length: 10 }, () => client.chat(prompt('same question'))));
+    check('identical concurrent prompts are coalesced', stats.requests === 1,
+      `${stats.requests} upstream request(s) for 10 calls`);
+    check('coalesced callers get the same answer',
+      answers.every(a => a.choices[0].message.content === 'echo: same question'));
+
+    answers[0].choices[0].message.content = 'changed by a caller';
+    const again = await client.chat(prompt('same question'));
+    check('repeated prompt is served from the cache', stats.requests === 1,
+      `${stats.requests} upstream request(s) after a repeat`);
+    check('cached answers cannot be changed by callers', again.choices[0].message.content === 'echo: same question');
+
+    const { cacheHits, coalesced } = client.getStats().chat;
+    check('stats count cache hits and coalesced calls', cacheHits === 1 && coalesced === 9,
+      `cacheHits ${cacheHits}, coalesced ${coalesced}`);
+
+    // Distinct prompts stay within the concurrency limit over reused connections
+    resetServer();
+    await Promise.all(Array.from({ length: 20 }, (_, i) => client.chat(prompt(`question ${i}`))));
+    check('distinct prompts are all sent', stats.requests === 20, `${stats.requests} upstream requests`);
+    check(`at most ${MAX_CONCURRENCY} requests in flight`, stats.peakActive <= MAX_CONCURRENCY,
+      `peak ${stats.peakActive}`);
+    check('keep-alive connections are reused', stats.connections <= MAX_CONCURRENCY,
+      `${stats.connections} connection(s) for 20 requests`);
+
+    const usage = client.getStats().chat;
+    check('token usage is recorded', usage.promptTokens > 0 && usage.completionTokens > usage.promptTokens,
+      `in ${usage.promptTokens}, out ${usage.completionTokens}`);
+
+    // Entries expire after their TTL
+    client = createClient();
+    resetServer();
+    await client.chat(prompt('short lived'), { ttl: 30 });
+    await new Promise(resolve => setTimeout(resolve, 60));
+    await client.chat(prompt('short lived'), { ttl: 30 });
+    check('expired entries are fetched again', stats.requests === 2, `${stats.requests} upstream requests`);
+
+    // The least recently used entry is evicted first
+    client = createClient({ memoryEntries: 2 });
+    resetServer();
+    await client.chat(prompt('a'));
+    await client.chat(prompt('b'));
+    await client.chat(prompt('a')); // 'a' becomes most recently used
+    await client.chat(prompt('c')); // evicts 'b'
+    await client.chat(prompt('a'));
+    const beforeB = stats.requests;
+    await client.chat(prompt('b'));
+    check('least recently used entry is evicted', beforeB === 3 && stats.requests === 4,
+      `${beforeB} request(s) before re-asking 'b', ${stats.requests} after`);
+
+    // Caching can be bypassed and the auth scheme chosen per call
+    resetServer();
+    await client.chat(prompt('a'), { cache: false, authScheme: 'x-api-key' });
+    check('cache: false always reaches the API', stats.requests === 1, `${stats.requests} upstream request(s)`);
+    check('X-API-KEY auth is sent when asked for', stats.authHeaders[0] === 'x-api-key', stats.authHeaders[0]);
+
+    client.httpAgent.destroy();
+  } finally {
+    console.log = quiet;
+    server.close();
+  }
+
+  let failed = 0;
+  for (const { name, passed, detail } of results) {
+    if (!passed) failed++;
+    console.log(`${passed ? 'PASS' : 'FAIL'}  ${name}${detail ? ` (${detail})` : ''}`);
+  }
+  console.log(`\n${results.length - failed}/${results.length} checks passed`);
+
+  return failed === 0;
+}
+
+if (require.main === module) {
+  run()
+    .then(passed => process.exit(passed ? 0 : 1))
+    .catch(err => {
+      console.error('AI client test failed:', err);
+      process.exit(1);
+    });
+}
+
+module.exports = { startMockServer };
@@ -1,7 +1,10 @@
 // backend/server.js
 const app = require('./app');
 const { testConnection, syncDatabase } = require('./models');
-const { sequelize } = require('./config/database');
+const { sequelize, enableWriteAheadLog } = require('./config/database');
+const resultSnapshotService = require('./services/result-snapshot.service');
+const emailQueue = require('./services/email-queue.service');
+const analysisJobs = require('./services/analysis-job.service');
 require('dotenv').config();
 
 const PORT = process.env.PORT || 5000;
@@ -39,6 +42,30 @@ const addColumnIfMissing = async () => {
   }
 };
 
+// Add the resultsSnapshotAt column used to track stale results snapshots
+const addResultsSnapshotColumn = async () => {
+  try {
+    const columns = await sequelize.query(
+      "PRAGMA table_info(campaigns);",
+      { type: sequelize.QueryTypes.SELECT }
+    );
+    
+    // Fresh databases get the column from sync
+    if (columns.length === 0 || columns.some(column => column.name === 'resultsSnapshotAt')) {
+      return;
+    }
+    
+    console.log('Adding resultsSnapshotAt column to campaigns table...');
+    await sequelize.query(
+      "ALTER TABLE campaigns ADD COLUMN resultsSnapshotAt DATETIME;",
+      { type: sequelize.QueryTypes.RAW }
+    );
+    console.log('resultsSnapshotAt column added successfully!');
+  } catch (error) {
+    console.error('Error checking/adding resultsSnapshotAt column:', error);
+  }
+};
+
 // Add the missing columns to the responses table
 const addResponseTableColumns = async () => {
   try {
@@ -136,6 +163,8 @@ const startServer = async () => {
     const isConnected = await testConnection();
     
     if (isConnected) {
+      await enableWriteAheadLog();
+      
       // Add our column safely without altering tables
       await addColumnIfMissing();
       
@@ -145,6 +174,9 @@ const startServer = async () => {
       // Create communication_logs table if it doesn't exist
       await createCommunicationLogsTable();
       
+      // Track results snapshot freshness per campaign
+      await addResultsSnapshotColumn();
+      
       // Normal sync without force or alter
       await syncDatabase(false);
       
@@ -152,6 +184,23 @@ const startServer = async () => {
       app.listen(PORT, () => {
         console.log(`Server running on port ${PORT}`);
       });
+      
+      // Backfill results snapshots for campaigns that don't have one yet
+      resultSnapshotService.rebuildAllSnapshots({ onlyStale: true })
+        .then(rebuilt => {
+          if (rebuilt.length > 0) {
+            console.log(`Rebuilt results snapshots for ${rebuilt.length} campaign(s)`);
+          }
+        })
+        .catch(error => console.error('Error backfilling results snapshots:', error));
+      
+      // Send queued campaign emails, including any left over from the last run
+      emailQueue.start()
+        .catch(error => console.error('Error starting email queue worker:', error));
+      
+      // Run document analysis jobs, resuming any left unfinished by the last run
+      analysisJobs.start()
+        .catch(error => console.error('Error starting document analysis workers:', error));
     } else {
       console.error('Database connection failed. Cannot start server.');
       process.exit(1);
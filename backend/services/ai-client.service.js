@@ -0,0 +1,369 @@
+// backend/services/ai-client.service.js
+
+const http = require('http');
+const https = require('https');
+const crypto = require('crypto');
+const axios = require('axios');
+const fluxAiConfig = require('../config/flux-ai');
+
+// Prune the persistent cache after this many writes
+const PRUNE_EVERY_WRITES = 50;
+
+/**
+ * Stable JSON serialisation (object keys sorted) so equal requests hash equally
+ * @param {*} value - Any JSON-serialisable value
+ * @returns {string}
+ */
+function stableStringify(value) {
+  if (value === null || typeof value !== 'object') {
+    return JSON.stringify(value);
+  }
+  if (Array.isArray(value)) {
+    return `[${value.map(item => (item === undefined ? 'null' : stableStringify(item))).join(',')}]`;
+  }
+  return `{${Object.keys(value)
+    .filter(key => value[key] !== undefined)
+    .sort()
+    .map(key => `${JSON.stringify(key)}:${stableStringify(value[key])}`)
+    .join(',')}}`;
+}
+
+/**
+ * Counting semaphore limiting the number of requests in flight
+ */
+class Semaphore {
+  constructor(limit) {
+    this.limit = Math.max(1, limit);
+    this.active = 0;
+    this.waiting = [];
+  }
+
+  async acquire() {
+    if (this.active < this.limit) {
+      this.active++;
+      return;
+    }
+    await new Promise(resolve => this.waiting.push(resolve));
+  }
+
+  release() {
+    const next = this.waiting.shift();
+    if (next) {
+      // Hand the slot straight to the next waiter
+      next();
+    } else {
+      this.active--;
+    }
+  }
+}
+
+/**
+ * Shared client for the Flux AI API. Every AI call in the backend goes
+ * through it so they share keep-alive connections, a concurrency limit,
+ * in-flight deduplication, the response cache and call statistics.
+ */
+class AiClient {
+  constructor(config = fluxAiConfig) {
+    this.config = config;
+    this.httpAgent = new http.Agent({ keepAlive: true, maxSockets: config.maxConcurrency });
+    this.httpsAgent = new https.Agent({ keepAlive: true, maxSockets: config.maxConcurrency });
+    this.http = axios.create({
+      timeout: config.timeout,
+      httpAgent: this.httpAgent,
+      httpsAgent: this.httpsAgent,
+      maxBodyLength: Infinity,
+      maxContentLength: Infinity
+    });
+    this.semaphore = new Semaphore(config.maxConcurrency);
+    this.inFlight = new Map();
+    this.memoryCache = new Map();
+    this.cacheWrites = 0;
+    this.resetStats();
+  }
+
+  /**
+   * Send a chat completion request
+   * @param {Object} body - Chat completion request body
+   * @param {Object} options - purpose (for stats), cache (default true), ttl (ms),
+   *                           authScheme ('bearer' or 'x-api-key')
+   * @returns {Promise<Object>} - Response body
+   */
+  async chat(body, { purpose = 'chat', cache = true, ttl, authScheme = 'bearer' } = {}) {
+    const url = this.config.getEndpointUrl('chat');
+
+    // Remove any undefined parameters to avoid API issues
+    const requestBody = { ...body };
+    Object.keys(requestBody).forEach(key => {
+      if (requestBody[key] === undefined) {
+        delete requestBody[key];
+      }
+    });
+
+    const useCache = cache && this.config.cache.enabled;
+    if (!useCache) {
+      const response = await this.send({ method: 'POST', url, data: requestBody, purpose, authScheme });
+      return response.data;
+    }
+
+    const key = this.cacheKey(url, requestBody);
+
+    // Identical requests already on their way share the same answer.
+    // Callers get their own copy, so one caller can't change another's answer.
+    if (this.inFlight.has(key)) {
+      this.record(purpose, { coalesced: true });
+      return structuredClone(await this.inFlight.get(key));
+    }
+
+    const pending = this.fetchCached(key, { url, body: requestBody, purpose, ttl, authScheme })
+      .finally(() => this.inFlight.delete(key));
+
+    this.inFlight.set(key, pending);
+    return structuredClone(await pending);
+  }
+
+  async fetchCached(key, { url, body, purpose, ttl, authScheme }) {
+    const cached = await this.getCached(key);
+    if (cached) {
+      this.record(purpose, { cached: true });
+      return cached;
+    }
+
+    const response = await this.send({ method: 'POST', url, data: body, purpose, authScheme });
+    if (isCacheableResponse(response.data)) {
+      await this.setCached(key, response.data, { purpose, ttl });
+    }
+    return response.data;
+  }
+
+  /**
+   * Send any other request (uploads, storage, deletes) through the shared
+   * agents and concurrency limit, without caching
+   * @param {Object} options - method, url, data, headers, purpose, authScheme, timeout
+   * @returns {Promise<Object>} - axios response
+   */
+  async request(options) {
+    return this.send(options);
+  }
+
+  async send({ method, url, data, headers = {}, purpose = 'request', authScheme = 'bearer', timeout }) {
+    const authHeader = authScheme === 'x-api-key'
+      ? { 'X-API-KEY': this.config.apiKey }
+      : { 'Authorization': `Bearer ${this.config.apiKey}` };
+
+    await this.semaphore.acquire();
+    const start = Date.now();
+
+    try {
+      const response = await this.http.request({
+        method,
+        url,
+        data,
+        timeout,
+        headers: {
+          ...authHeader,
+          ...(data && typeof data.getHeaders !== 'function' ? { 'Content-Type': 'application/json' } : {}),
+          ...headers
+        }
+      });
+
+      this.record(purpose, { latency: Date.now() - start, usage: response.data && response.data.usage });
+      return response;
+    } catch (error) {
+      this.record(purpose, { latency: Date.now() - start, error: true });
+      throw error;
+    } finally {
+      this.semaphore.release();
+    }
+  }
+
+  cacheKey(url, body) {
+    return crypto.createHash('sha256').update(`${url}\n${stableStringify(body)}`).digest('hex');
+  }
+
+  async getCached(key) {
+    const now = Date.now();
+    const entry = this.memoryCache.get(key);
+
+    if (entry) {
+      this.memoryCache.delete(key);
+      if (entry.expiresAt > now) {
+        // Re-insert to mark as most recently used
+        this.memoryCache.set(key, entry);
+        return entry.value;
+      }
+    }
+
+    if (!this.config.cache.persistent) {
+      return null;
+    }
+
+    try {
+      const { AiResponseCache } = require('../models');
+      const row = await AiResponseCache.findByPk(key);
+      if (!row) return null;
+
+      if (new Date(row.expiresAt).getTime() <= now) {
+        await row.destroy();
+        return null;
+      }
+
+      this.remember(key, row.response, new Date(row.expiresAt).getTime());
+      AiResponseCache.update(
+        { lastAccessedAt: new Date(), hits: row.hits + 1 },
+        { where: { cacheKey: key } }
+      ).catch(error => console.error('[FLUX AI] Error updating cache entry:', error.message));
+
+      return row.response;
+    } catch (error) {
+      console.error('[FLUX AI] Error reading response cache:', error.message);
+      return null;
+    }
+  }
+
+  async setCached(key, value, { purpose, ttl }) {
+    const expiresAt = Date.now() + (ttl || this.config.cache.ttl);
+    this.remember(key, value, expiresAt);
+
+    if (!this.config.cache.persistent) {
+      return;
+    }
+
+    try {
+      const { AiResponseCache } = require('../models');
+      await AiResponseCache.upsert({
+        cacheKey: key,
+        purpose,
+        response: value,
+        expiresAt: new Date(expiresAt),
+        lastAccessedAt: new Date(),
+        hits: 0
+      });
+
+      this.cacheWrites++;
+      if (this.cacheWrites % PRUNE_EVERY_WRITES === 0) {
+        await this.prunePersistentCache();
+      }
+    } catch (error) {
+      console.error('[FLUX AI] Error writing response cache:', error.message);
+    }
+  }
+
+  remember(key, value, expiresAt) {
+    this.memoryCache.delete(key);
+    this.memoryCache.set(key, { value, expiresAt });
+
+    // Evict least recently used entries (the Map keeps insertion order)
+    while (this.memoryCache.size > this.config.cache.memoryEntries) {
+      this.memoryCache.delete(this.memoryCache.keys().next().value);
+    }
+  }
+
+  /**
+   * Remove expired entries and the least recently used ones above the limit
+   * @returns {Promise<number>} - Number of removed entries
+   */
+  async prunePersistentCache() {
+    const { AiResponseCache, sequelize } = require('../models');
+    const { Op } = require('sequelize');
+
+    const expired = await AiResponseCache.destroy({
+      where: { expiresAt: { [Op.lte]: new Date() } }
+    });
+
+    const count = await AiResponseCache.count();
+    let evicted = 0;
+    if (count > this.config.cache.maxEntries) {
+      const [, metadata] = await sequelize.query(
+        `DELETE FROM ai_response_cache WHERE cacheKey IN (
+          SELECT cacheKey FROM ai_response_cache ORDER BY lastAccessedAt ASC LIMIT ?
+        )`,
+        { replacements: [count - this.config.cache.maxEntries] }
+      );
+      evicted = (metadata && metadata.changes) || count - this.config.cache.maxEntries;
+    }
+
+    if (expired + evicted > 0) {
+      console.log(`[FLUX AI] Pruned response cache: ${expired} expired, ${evicted} evicted`);
+    }
+    return expired + evicted;
+  }
+
+  /**
+   * Forget all cached responses (memory and persistent)
+   */
+  async clearCache() {
+    this.memoryCache.clear();
+    if (this.config.cache.persistent) {
+      const { AiResponseCache } = require('../models');
+      await AiResponseCache.destroy({ where: {} });
+    }
+  }
+
+  record(purpose, { latency, usage, cached, coalesced, error }) {
+    const stats = this.stats[purpose] || (this.stats[purpose] = {
+      requests: 0,
+      cacheHits: 0,
+      coalesced: 0,
+      errors: 0,
+      totalLatencyMs: 0,
+      maxLatencyMs: 0,
+      promptTokens: 0,
+      completionTokens: 0
+    });
+
+    if (cached) {
+      stats.cacheHits++;
+      console.log(`[FLUX AI] ${purpose}: served from cache`);
+      return;
+    }
+    if (coalesced) {
+      stats.coalesced++;
+      console.log(`[FLUX AI] ${purpose}: joined identical request in flight`);
+      return;
+    }
+
+    stats.requests++;
+    stats.totalLatencyMs += latency;
+    stats.maxLatencyMs = Math.max(stats.maxLatencyMs, latency);
+    if (error) {
+      stats.errors++;
+    }
+    if (usage) {
+      stats.promptTokens += usage.prompt_tokens || 0;
+      stats.completionTokens += usage.completion_tokens || 0;
+    }
+
+    console.log(`[FLUX AI] ${purpose}: ${error ? 'failed' : 'completed'} in ${latency}ms` +
+      (usage ? ` (tokens in ${usage.prompt_tokens || 0}, out ${usage.completion_tokens || 0})` : ''));
+  }
+
+  /**
+   * Per-purpose call statistics since start-up (or the last reset)
+   * @returns {Object}
+   */
+  getStats() {
+    const result = {};
+    for (const [purpose, stats] of Object.entries(this.stats)) {
+      result[purpose] = {
+        ...stats,
+        averageLatencyMs: stats.requests > 0 ? Math.round(stats.totalLatencyMs / stats.requests) : 0
+      };
+    }
+    return result;
+  }
+
+  resetStats() {
+    this.stats = {};
+  }
+}
+
+// Only successful completions are worth keeping
+function isCacheableResponse(data) {
+  return !!(data && Array.isArray(data.choices) && data.choices.length > 0);
+}
+
+const aiClient = new AiClient();
+
+module.exports = aiClient;
+module.exports.AiClient = AiClient;
+module.exports.stableStringify = stableStringify;
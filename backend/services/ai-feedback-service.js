@@ -1,6 +1,6 @@
 // services/ai-feedback-service.js
-const axios = require('axios');
 require('dotenv').config();
+const aiClient = require('./ai-client.service');
 
 /**
  * Service for evaluating feedback quality using FluxAI
@@ -72,24 +72,16 @@ class AiFeedbackService {
           requestData.model = this.fluxAiConfig.model;
         }
 
-        // Make the API call with proper headers
-        const response = await axios({
-          method: 'POST',
-          url: `${this.fluxAiConfig.baseUrl}${this.fluxAiConfig.endpoints.chat}`,
-          headers: {
-            'Content-Type': 'application/json',
-            'X-API-KEY': this.fluxAiConfig.apiKey
-          },
-          data: requestData
+        // Make the API call through the shared client (this endpoint uses X-API-KEY auth)
+        const data = await aiClient.chat(requestData, {
+          purpose: 'feedback_evaluation',
+          authScheme: 'x-api-key'
         });
 
-        // Log information for debugging
-        console.log('FluxAI API status code:', response.status);
-
-        if (response.data && response.data.choices && response.data.choices.length > 0) {
+        if (data && data.choices && data.choices.length > 0) {
           // Extract the content from the response, handling different possible formats
           let aiContent = null;
-          const choice = response.data.choices[0];
+          const choice = data.choices[0];
 
           if (typeof choice.message === 'object' && choice.message.content) {
             // Standard format: choice.message is an object with content property
@@ -166,10 +158,10 @@ class AiFeedbackService {
             };
           } else {
             console.warn('Could not extract content from AI response');
-            console.log('Raw response data:', JSON.stringify(response.data, null, 2));
+            console.log('Raw response data:', JSON.stringify(data, null, 2));
           }
         } else {
-          console.warn('No choices in API response:', JSON.stringify(response.data, null, 2));
+          console.warn('No choices in API response:', JSON.stringify(data, null, 2));
         }
 
         // If we reach this point, something went wrong with parsing the response
@@ -966,42 +958,37 @@ Question Z: [e.g., Ratings for Q-Z (Category C) and Q-W (Category C) seem contra
 
     try {
       // Try a simple check of the API first
-      const response = await axios({
+      const response = await aiClient.request({
         method: 'GET',
         url: `${this.fluxAiConfig.baseUrl}${this.fluxAiConfig.endpoints.llms}`,
-        headers: {
-          'X-API-KEY': this.fluxAiConfig.apiKey
-        }
+        purpose: 'connection_test',
+        authScheme: 'x-api-key'
       });
 
       console.log('FluxAI models endpoint response:', JSON.stringify(response.data, null, 2));
 
       // Now test the chat endpoint with a very simple request
-      const chatResponse = await axios({
-        method: 'POST',
-        url: `${this.fluxAiConfig.baseUrl}${this.fluxAiConfig.endpoints.chat}`,
-        headers: {
-          'Content-Type': 'application/json',
-          'X-API-KEY': this.fluxAiConfig.apiKey
-        },
-        data: {
-          messages: [
-            {
-              role: "user",
-              content: "Hello, this is a test message. Can you reply with a simple greeting?"
-            }
-          ],
-          stream: false
-        }
+      // A connection test must reach the API, so the response cache is skipped
+      const chatResponse = await aiClient.chat({
+        messages: [
+          {
+            role: "user",
+            content: "Hello, this is a test message. Can you reply with a simple greeting?"
+          }
+        ],
+        stream: false
+      }, {
+        purpose: 'connection_test',
+        cache: false,
+        authScheme: 'x-api-key'
       });
 
-      console.log('FluxAI chat response status:', chatResponse.status);
-      console.log('FluxAI chat response data:', JSON.stringify(chatResponse.data, null, 2));
+      console.log('FluxAI chat response data:', JSON.stringify(chatResponse, null, 2));
 
       return {
         success: true,
         llmsResponse: response.data,
-        chatResponse: chatResponse.data
+        chatResponse
       };
 
     } catch (error) {
@@ -0,0 +1,440 @@
+// backend/services/analysis-job.service.js
+
+const path = require('path');
+const { fork } = require('child_process');
+const { sequelize, AnalysisJob, Document, Template } = require('../models');
+const config = require('../config/analysis-jobs');
+
+const WORKER_SCRIPT = path.join(__dirname, '../workers/document-analysis.worker.js');
+
+// Pipeline stages in order, with their share of the overall progress
+const STAGES = {
+  upload: 30,
+  analysis: 40,
+  supplement: 15,
+  save: 15
+};
+
+const initialStages = () => Object.fromEntries(
+  Object.keys(STAGES).map(stage => [stage, { status: 'pending' }])
+);
+
+/**
+ * Overall progress (0-100) from the per-stage status
+ * @param {Object} stages - Per-stage status as stored on the job
+ * @returns {number}
+ */
+function stageProgress(stages) {
+  let progress = 0;
+
+  for (const [stage, weight] of Object.entries(STAGES)) {
+    const state = (stages && stages[stage]) || {};
+    if (state.status === 'completed' || state.status === 'skipped') {
+      progress += weight;
+    } else if (state.status === 'running') {
+      // Uploads report how many files are done; other stages count as half done
+      const share = state.total > 0 ? state.completed / state.total : 0.5;
+      progress += weight * share;
+    }
+  }
+
+  return Math.round(progress);
+}
+
+/**
+ * Background document analysis. Requests enqueue a job in the analysis_jobs
+ * table and return straight away; a pool of worker processes runs the
+ * uploads, AI calls and template creation, recording progress per stage.
+ * Jobs interrupted by a restart or a crashed worker are run again; the
+ * template ID is recorded in the transaction that saves the template, so a
+ * job that already created its template is not run a second time.
+ *
+ * The same module runs in the web process (enqueue, pool, status) and in
+ * each worker process (runJob).
+ */
+class AnalysisJobService {
+  constructor() {
+    this.running = false;
+    this.workers = [];
+    this.timer = null;
+    this.dispatching = false;
+    this.wakeRequested = false;
+  }
+
+  /**
+   * Queue the analysis of documents into a new template
+   * @param {Object} params - documents, documentType, userId, templateInfo
+   * @returns {Promise<Object>} - The created job
+   */
+  async enqueue({ documents, documentType, userId, templateInfo }) {
+    const documentIds = documents.map(doc => doc.id);
+
+    const job = await sequelize.transaction(async (transaction) => {
+      const created = await AnalysisJob.create({
+        userId,
+        documentType,
+        documentIds,
+        templateInfo,
+        stages: initialStages()
+      }, { transaction });
+
+      await Document.update(
+        { status: 'analysis_in_progress', analysisError: null },
+        { where: { id: documentIds }, transaction }
+      );
+
+      return created;
+    });
+
+    console.log(`[ANALYSIS] Queued job ${job.id} for ${documentIds.length} document(s)`);
+    this.wake();
+
+    return job;
+  }
+
+  /**
+   * Status of one of the user's jobs
+   * @param {string} jobId - Job ID returned by enqueue
+   * @param {string} userId - Owner of the job
+   * @returns {Promise<Object|null>}
+   */
+  async getJob(jobId, userId) {
+    const job = await AnalysisJob.findOne({ where: { id: jobId, userId } });
+    return job ? this.describeJob(job) : null;
+  }
+
+  describeJob(job) {
+    return {
+      id: job.id,
+      status: job.status,
+      stage: job.stage,
+      stages: job.stages,
+      progress: job.status === 'completed' ? 100 : stageProgress(job.stages),
+      attempts: job.attempts,
+      documentIds: job.documentIds,
+      templateId: job.templateId,
+      error: job.error,
+      createdAt: job.createdAt,
+      startedAt: job.startedAt,
+      completedAt: job.completedAt,
+      statusUrl: `/api/documents/analysis-jobs/${job.id}`
+    };
+  }
+
+  /**
+   * Start the worker pool and resume jobs left unfinished by the last run
+   */
+  async start() {
+    if (!config.enabled || this.running) {
+      return;
+    }
+
+    this.running = true;
+
+    const interrupted = await AnalysisJob.findAll({ where: { status: 'running' } });
+    for (const job of interrupted) {
+      await this.requeue(job.id, 'Interrupted by a server restart');
+    }
+    if (interrupted.length > 0) {
+      console.log(`[ANALYSIS] Resuming ${interrupted.length} job(s) interrupted by a restart`);
+    }
+
+    for (let i = 0; i < config.workers; i++) {
+      this.spawnWorker();
+    }
+
+    console.log(`[ANALYSIS] Worker pool started (${config.workers} process(es), ${config.uploadConcurrency} parallel upload(s) per job)`);
+    this.wake();
+  }
+
+  /**
+   * Stop the pool. Jobs still running are resumed on the next start.
+   */
+  async stop() {
+    this.running = false;
+    clearTimeout(this.timer);
+    this.timer = null;
+
+    const exits = this.workers.map(worker => new Promise(resolve => {
+      worker.child.once('exit', resolve);
+      worker.child.kill();
+    }));
+    await Promise.all(exits);
+  }
+
+  spawnWorker() {
+    const worker = { child: fork(WORKER_SCRIPT), jobId: null };
+
+    worker.child.on('message', message => this.handleMessage(worker, message));
+    worker.child.on('exit', (code, signal) => this.handleExit(worker, code, signal));
+
+    this.workers.push(worker);
+    return worker;
+  }
+
+  handleMessage(worker, message) {
+    if (!message || message.type !== 'finished' || message.jobId !== worker.jobId) {
+      return;
+    }
+
+    worker.jobId = null;
+
+    // A job the worker could not settle (e.g. a database error) must not stay "running"
+    AnalysisJob.update(
+      { status: 'failed', error: 'Analysis ended without a result', completedAt: new Date() },
+      { where: { id: message.jobId, status: 'running' } }
+    )
+      .catch(error => console.error('[ANALYSIS] Error settling job:', error.message))
+      .finally(() => this.wake());
+  }
+
+  handleExit(worker, code, signal) {
+    this.workers = this.workers.filter(w => w !== worker);
+
+    if (worker.jobId) {
+      console.error(`[ANALYSIS] Worker exited (${signal || code}) while running job ${worker.jobId}`);
+      this.requeue(worker.jobId, `Worker exited (${signal || code})`)
+        .catch(error => console.error('[ANALYSIS] Error re-queuing job:', error.message));
+    }
+
+    if (this.running) {
+      this.spawnWorker();
+      this.wake();
+    }
+  }
+
+  /**
+   * Put an interrupted job back in the queue, or fail it after too many attempts
+   * @param {string} jobId - Job ID
+   * @param {string} reason - Why the job was interrupted
+   */
+  async requeue(jobId, reason) {
+    const job = await AnalysisJob.findByPk(jobId);
+    if (!job || job.status !== 'running') {
+      return;
+    }
+
+    if (job.attempts >= config.maxAttempts) {
+      await this.failJob(job, `${reason}; gave up after ${job.attempts} attempt(s)`);
+      return;
+    }
+
+    await job.update({ status: 'queued', error: reason });
+  }
+
+  /**
+   * Hand queued jobs to idle workers now instead of waiting for the next poll
+   */
+  wake() {
+    if (!this.running) {
+      return;
+    }
+    if (this.dispatching) {
+      this.wakeRequested = true;
+      return;
+    }
+
+    clearTimeout(this.timer);
+    this.timer = null;
+    this.dispatching = true;
+
+    this.dispatch()
+      .catch(error => console.error('[ANALYSIS] Error dispatching jobs:', error))
+      .finally(() => {
+        this.dispatching = false;
+        if (this.wakeRequested) {
+          this.wakeRequested = false;
+          this.wake();
+        } else {
+          this.schedule();
+        }
+      });
+  }
+
+  schedule() {
+    if (!this.running || this.timer) {
+      return;
+    }
+
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.wake();
+    }, config.pollInterval);
+  }
+
+  async dispatch() {
+    const idle = this.workers.filter(worker => !worker.jobId && worker.child.connected);
+
+    while (this.running && idle.length > 0) {
+      const job = await this.claimNextJob();
+      if (!job) {
+        break;
+      }
+
+      const worker = idle.shift();
+      worker.jobId = job.id;
+      worker.child.send({ type: 'run', jobId: job.id });
+      console.log(`[ANALYSIS] Job ${job.id} started (attempt ${job.attempts})`);
+    }
+  }
+
+  /**
+   * Mark the oldest queued job as running and return it. Only the web
+   * process claims jobs, so a conditional update is enough.
+   * @returns {Promise<Object|null>}
+   */
+  async claimNextJob() {
+    const job = await AnalysisJob.findOne({
+      where: { status: 'queued' },
+      order: [['createdAt', 'ASC']]
+    });
+    if (!job) {
+      return null;
+    }
+
+    const [claimed] = await AnalysisJob.update(
+      {
+        status: 'running',
+        stage: null,
+        stages: initialStages(),
+        attempts: job.attempts + 1,
+        startedAt: new Date()
+      },
+      { where: { id: job.id, status: 'queued' } }
+    );
+
+    return claimed > 0 ? job.reload() : null;
+  }
+
+  /**
+   * Run a claimed job (called in a worker process)
+   * @param {string} jobId - Job ID
+   * @returns {Promise<Object|null>} - The finished job
+   */
+  async runJob(jobId) {
+    const job = await AnalysisJob.findByPk(jobId);
+    if (!job || job.status !== 'running') {
+      return null;
+    }
+
+    const stages = initialStages();
+    let current = null;
+    let lastWrite = Promise.resolve();
+
+    const saveStages = () => {
+      const snapshot = { stage: current, stages: JSON.parse(JSON.stringify(stages)) };
+      lastWrite = lastWrite
+        .then(() => AnalysisJob.update(snapshot, { where: { id: jobId } }))
+        .catch(error => console.error('[ANALYSIS] Error saving job progress:', error.message));
+    };
+
+    // Called by the pipeline whenever a stage starts or reports progress
+    const onStage = (stage, details = {}) => {
+      if (!stages[stage]) {
+        return;
+      }
+
+      if (stage !== current) {
+        const now = new Date().toISOString();
+        for (const name of Object.keys(STAGES)) {
+          if (name === stage) break;
+          if (stages[name].status === 'running') {
+            stages[name] = { ...stages[name], status: 'completed', completedAt: now };
+          } else if (stages[name].status === 'pending') {
+            stages[name] = { status: 'skipped' };
+          }
+        }
+        stages[stage] = { status: 'running', startedAt: now };
+        current = stage;
+      }
+
+      Object.assign(stages[stage], details);
+      saveStages();
+    };
+
+    try {
+      // An earlier attempt saved the template before it was interrupted
+      if (job.templateId) {
+        const existing = await Template.findByPk(job.templateId);
+        if (existing) {
+          stages.save = { status: 'completed', completedAt: new Date().toISOString() };
+          return this.completeJob(job, existing, stages);
+        }
+      }
+
+      const documents = await Document.findAll({ where: { id: job.documentIds } });
+
+      // Required here as the documents controller also depends on this service
+      const { startDocumentAnalysis } = require('../controllers/documents.controller');
+      const template = await startDocumentAnalysis(
+        documents,
+        job.documentType,
+        job.userId,
+        job.templateInfo || {},
+        {
+          onStage,
+          uploadConcurrency: config.uploadConcurrency,
+          onTemplateCreated: (created, transaction) => AnalysisJob.update(
+            { templateId: created.id },
+            { where: { id: jobId }, transaction }
+          )
+        }
+      );
+
+      await lastWrite;
+
+      if (!template || !template.id) {
+        if (current) stages[current].status = 'failed';
+        return this.failJob(job, 'Failed to generate template', stages);
+      }
+
+      return this.completeJob(job, template, stages);
+    } catch (error) {
+      await lastWrite;
+      if (current) stages[current].status = 'failed';
+      return this.failJob(job, error.message, stages);
+    }
+  }
+
+  async completeJob(job, template, stages) {
+    const now = new Date().toISOString();
+    for (const name of Object.keys(STAGES)) {
+      if (stages[name].status === 'running') {
+        stages[name] = { ...stages[name], status: 'completed', completedAt: now };
+      } else if (stages[name].status === 'pending') {
+        stages[name] = { status: 'skipped' };
+      }
+    }
+
+    await job.update({
+      status: 'completed',
+      stage: null,
+      stages,
+      templateId: template.id,
+      error: null,
+      completedAt: new Date()
+    });
+
+    console.log(`[ANALYSIS] Job ${job.id} completed, template ${template.id}`);
+    return job;
+  }
+
+  async failJob(job, message, stages) {
+    await job.update({
+      status: 'failed',
+      error: message,
+      ...(stages ? { stages } : {}),
+      completedAt: new Date()
+    });
+
+    await Document.update(
+      { status: 'analysis_failed', analysisError: message },
+      { where: { id: job.documentIds, status: 'analysis_in_progress' } }
+    );
+
+    console.error(`[ANALYSIS] Job ${job.id} failed: ${message}`);
+    return job;
+  }
+}
+
+module.exports = new AnalysisJobService();
@@ -0,0 +1,256 @@
+// backend/services/dashboard-stats.service.js
+
+const { sequelize } = require('../models');
+
+// How long computed stats are served before they are recomputed
+const STATS_TTL_MS = parseInt(process.env.DASHBOARD_STATS_TTL || '30000', 10);
+
+// Helper to format time ago
+function getTimeAgo(date) {
+  const now = new Date();
+  const diffInSeconds = Math.floor((now - date) / 1000);
+
+  if (diffInSeconds < 60) return 'Just now';
+  if (diffInSeconds < 3600) return `${Math.floor(diffInSeconds / 60)} minutes ago`;
+  if (diffInSeconds < 86400) return `${Math.floor(diffInSeconds / 3600)} hours ago`;
+  if (diffInSeconds < 172800) return 'Yesterday';
+  return `${Math.floor(diffInSeconds / 86400)} days ago`;
+}
+
+/**
+ * Dashboard statistics, computed in three queries and cached for a short
+ * time. Writes to campaigns, feedback and insights invalidate the cache.
+ */
+class DashboardStatsService {
+  constructor() {
+    this.cached = null;
+    this.expiresAt = 0;
+    this.pending = null;
+    this.generation = 0;
+
+    this.invalidateOnWrite = this.invalidateOnWrite.bind(this);
+  }
+
+  /**
+   * Get the dashboard statistics, from the cached query results when fresh
+   * @returns {Promise<Object>}
+   */
+  async getStats() {
+    return this.buildStats(await this.getRawStats());
+  }
+
+  async getRawStats() {
+    if (this.cached && Date.now() < this.expiresAt) {
+      return this.cached;
+    }
+
+    // Concurrent dashboard loads share one computation
+    if (!this.pending) {
+      const generation = this.generation;
+      this.pending = this.queryStats()
+        .then(raw => {
+          // Don't keep results that were invalidated while they were computed
+          if (generation === this.generation) {
+            this.cached = raw;
+            this.expiresAt = Date.now() + STATS_TTL_MS;
+          }
+          return raw;
+        })
+        .finally(() => {
+          this.pending = null;
+        });
+    }
+
+    return this.pending;
+  }
+
+  /**
+   * Forget the cached statistics (called after writes that change them)
+   */
+  invalidate() {
+    this.generation++;
+    this.cached = null;
+    this.expiresAt = 0;
+  }
+
+  /**
+   * Router middleware invalidating the cache after successful writes
+   */
+  invalidateOnWrite(req, res, next) {
+    if (req.method !== 'GET' && req.method !== 'HEAD') {
+      res.on('finish', () => {
+        if (res.statusCode < 400) {
+          this.invalidate();
+        }
+      });
+    }
+    next();
+  }
+
+  async queryStats() {
+    // All counters in one statement, one aggregate subquery per table.
+    // Responses are summed from current results snapshots; campaigns whose
+    // snapshot is stale (resultsSnapshotAt cleared) are counted from responses.
+    const [counts] = await sequelize.query(`
+      SELECT
+        P.activeCount AS activeParticipants,
+        P.cycleCount AS activeCycles,
+        PS.total AS totalParticipants,
+        PS.completed AS completedParticipants,
+        S.responseCount AS responseCount,
+        T.activeCount AS activeTemplates,
+        T.pendingCount AS pendingTemplates,
+        R.count AS recentReports
+      FROM
+        (SELECT
+           COUNT(DISTINCT CP.id) AS activeCount,
+           COUNT(DISTINCT CP.campaignId) AS cycleCount
+         FROM campaign_participants CP
+         JOIN campaigns C ON CP.campaignId = C.id
+         WHERE C.status = 'active') P,
+        (SELECT
+           COUNT(*) AS total,
+           COALESCE(SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END), 0) AS completed
+         FROM campaign_participants) PS,
+        (SELECT
+           (SELECT COALESCE(SUM(RS.responseCount), 0)
+            FROM campaign_result_snapshots RS
+            JOIN campaigns C ON RS.campaignId = C.id
+            WHERE C.resultsSnapshotAt IS NOT NULL)
+           + (SELECT COUNT(*)
+              FROM responses R
+              JOIN campaign_participants CP ON R.participantId = CP.id
+              JOIN campaigns C ON CP.campaignId = C.id
+              WHERE C.resultsSnapshotAt IS NULL) AS responseCount) S,
+        (SELECT
+           COALESCE(SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END), 0) AS activeCount,
+           COALESCE(SUM(CASE WHEN status = 'pending_approval' THEN 1 ELSE 0 END), 0) AS pendingCount
+         FROM templates) T,
+        (SELECT COUNT(*) AS count
+         FROM insights
+         WHERE createdAt >= datetime('now', '-30 days')) R
+    `, { type: sequelize.QueryTypes.SELECT });
+
+    // Upcoming deadlines (uses the campaigns status/endDate index)
+    const deadlines = await sequelize.query(`
+      SELECT
+        id,
+        name,
+        CAST(JULIANDAY(endDate) - JULIANDAY('now') AS INTEGER) as daysRemaining,
+        CASE
+          WHEN JULIANDAY(endDate) - JULIANDAY('now') <= 3 THEN 'high'
+          WHEN JULIANDAY(endDate) - JULIANDAY('now') <= 7 THEN 'medium'
+          ELSE 'low'
+        END as priority
+      FROM campaigns
+      WHERE status = 'active' AND endDate > datetime('now')
+      ORDER BY endDate ASC
+      LIMIT 5
+    `, { type: sequelize.QueryTypes.SELECT });
+
+    // Latest activity of each kind in the last 7 days, in one statement
+    const activityRows = await sequelize.query(`
+      SELECT * FROM (
+        SELECT 'template' AS type, id, name, NULL AS count, createdAt
+        FROM templates
+        WHERE createdAt >= datetime('now', '-7 days')
+        ORDER BY createdAt DESC
+        LIMIT 1
+      )
+      UNION ALL
+      SELECT * FROM (
+        SELECT 'participants' AS type, C.id, C.name, COUNT(CP.id) AS count, MAX(CP.createdAt) AS createdAt
+        FROM campaign_participants CP
+        JOIN campaigns C ON CP.campaignId = C.id
+        WHERE CP.createdAt >= datetime('now', '-7 days')
+        GROUP BY C.id
+        ORDER BY MAX(CP.createdAt) DESC
+        LIMIT 1
+      )
+      UNION ALL
+      SELECT * FROM (
+        SELECT 'report' AS type, C.id, C.name, COUNT(I.id) AS count, MAX(I.createdAt) AS createdAt
+        FROM insights I
+        JOIN campaigns C ON I.campaignId = C.id
+        WHERE I.createdAt >= datetime('now', '-7 days')
+        GROUP BY C.id
+        ORDER BY MAX(I.createdAt) DESC
+        LIMIT 1
+      )
+    `, { type: sequelize.QueryTypes.SELECT });
+
+    return { counts: counts || {}, deadlines, activityRows };
+  }
+
+  // Response shape of /api/dashboard/raw-stats; relative times are computed per request
+  buildStats({ counts, deadlines, activityRows }) {
+    const totalParticipants = counts.totalParticipants || 0;
+
+    const results = {
+      participants: {
+        activeCount: counts.activeParticipants || 0,
+        cycleCount: counts.activeCycles || 0
+      },
+      responses: {
+        count: counts.responseCount || 0,
+        completionRate: totalParticipants > 0
+          ? (counts.completedParticipants || 0) * 100.0 / totalParticipants
+          : 0
+      },
+      templates: {
+        activeCount: counts.activeTemplates || 0,
+        pendingCount: counts.pendingTemplates || 0
+      },
+      reports: {
+        count: counts.recentReports || 0
+      },
+      deadlines,
+      activities: activityRows.map(activity => this.describeActivity(activity))
+    };
+
+    // Add raw query info to help with debugging
+    if (process.env.NODE_ENV === 'development') {
+      results._debug = {
+        rawCounts: counts,
+        rawActivities: activityRows
+      };
+    }
+
+    return results;
+  }
+
+  // Activity entries with navigation IDs, as shown on the dashboard
+  describeActivity(activity) {
+    const timeAgo = getTimeAgo(new Date(activity.createdAt));
+
+    if (activity.type === 'template') {
+      return {
+        type: 'template',
+        id: activity.id,
+        title: 'New template added',
+        description: activity.name,
+        timeAgo
+      };
+    }
+
+    if (activity.type === 'participants') {
+      return {
+        type: 'participants',
+        campaignId: activity.id,
+        title: `${activity.count} users added to cycle`,
+        description: activity.name,
+        timeAgo
+      };
+    }
+
+    return {
+      type: 'report',
+      campaignId: activity.id,
+      title: `${activity.count} reports generated`,
+      description: activity.name,
+      timeAgo
+    };
+  }
+}
+
+module.exports = new DashboardStatsService();
@@ -0,0 +1,318 @@
+// backend/services/email-queue.service.js
+
+const { Op, Transaction } = require('sequelize');
+const { v4: uuidv4 } = require('uuid');
+const { sequelize, EmailJob } = require('../models');
+const emailService = require('./email.service');
+const config = require('../config/email-queue');
+
+const JOB_UPDATE_FIELDS = ['status', 'attempts', 'nextAttemptAt', 'lastError', 'messageId', 'sentAt', 'updatedAt'];
+
+/**
+ * Persistent outbound email queue. Requests enqueue rendered emails in the
+ * email_jobs table and return straight away; a single in-process worker
+ * drains due jobs through the pooled SMTP transport of the email service.
+ */
+class EmailQueueService {
+  constructor() {
+    this.running = false;
+    this.draining = false;
+    this.timer = null;
+    this.currentDrain = null;
+  }
+
+  /**
+   * Add rendered emails to the queue
+   * @param {Array<Object>} jobs - recipient, subject, html, text, campaignId, participantId, communicationType, delay (ms)
+   * @param {Object} options - Optional transaction
+   * @returns {Promise<Object>} - { batchId, total }
+   */
+  async enqueue(jobs, { transaction } = {}) {
+    const batchId = uuidv4();
+    const now = Date.now();
+
+    if (jobs.length > 0) {
+      await EmailJob.bulkCreate(
+        jobs.map(job => ({
+          batchId,
+          campaignId: job.campaignId || null,
+          participantId: job.participantId || null,
+          communicationType: job.communicationType || 'other',
+          recipient: job.recipient,
+          subject: job.subject,
+          html: job.html,
+          text: job.text,
+          nextAttemptAt: new Date(now + (job.delay || 0))
+        })),
+        { transaction }
+      );
+    }
+
+    console.log(`[EMAIL QUEUE] Queued ${jobs.length} email(s) in batch ${batchId}`);
+
+    // Start sending once the enqueuing transaction has committed
+    if (transaction && typeof transaction.afterCommit === 'function') {
+      transaction.afterCommit(() => this.wake());
+    } else {
+      this.wake();
+    }
+
+    return { batchId, total: jobs.length };
+  }
+
+  /**
+   * Progress of one enqueued batch
+   * @param {string} batchId - Batch ID returned by enqueue
+   * @returns {Promise<Object|null>} - Counts per status, or null for an unknown batch
+   */
+  async getBatchProgress(batchId) {
+    const rows = await sequelize.query(
+      `SELECT status, COUNT(*) AS count FROM email_jobs WHERE batchId = ? GROUP BY status`,
+      {
+        replacements: [batchId],
+        type: sequelize.QueryTypes.SELECT
+      }
+    );
+
+    if (rows.length === 0) {
+      return null;
+    }
+
+    const progress = { batchId, total: 0, pending: 0, processing: 0, sent: 0, failed: 0 };
+    rows.forEach(row => {
+      progress[row.status] = Number(row.count);
+      progress.total += Number(row.count);
+    });
+    progress.completed = progress.pending === 0 && progress.processing === 0;
+
+    if (progress.failed > 0) {
+      progress.failures = await EmailJob.findAll({
+        where: { batchId, status: 'failed' },
+        attributes: ['participantId', 'recipient', 'communicationType', 'lastError'],
+        limit: 100,
+        raw: true
+      });
+    }
+
+    return progress;
+  }
+
+  /**
+   * Put jobs that were being sent when the process stopped back in the queue
+   * @returns {Promise<number>} - Number of recovered jobs
+   */
+  async recoverStaleJobs() {
+    const [recovered] = await EmailJob.update(
+      { status: 'pending', nextAttemptAt: new Date() },
+      { where: { status: 'processing' } }
+    );
+
+    if (recovered > 0) {
+      console.log(`[EMAIL QUEUE] Re-queued ${recovered} email(s) interrupted by a restart`);
+    }
+
+    return recovered;
+  }
+
+  /**
+   * Start the polling worker
+   */
+  async start() {
+    if (!config.enabled || this.running) {
+      return;
+    }
+
+    this.running = true;
+    await this.recoverStaleJobs();
+    console.log(`[EMAIL QUEUE] Worker started (concurrency ${config.concurrency}, ${config.rateLimit}/s)`);
+    this.wake();
+  }
+
+  /**
+   * Stop polling and wait for the batch that is being sent
+   */
+  async stop() {
+    this.running = false;
+    clearTimeout(this.timer);
+    this.timer = null;
+
+    if (this.currentDrain) {
+      await this.currentDrain;
+    }
+  }
+
+  /**
+   * Drain due jobs now instead of waiting for the next poll
+   */
+  wake() {
+    if (!this.running || this.draining) {
+      return;
+    }
+
+    clearTimeout(this.timer);
+    this.timer = null;
+    this.currentDrain = this.drain()
+      .catch(error => console.error('[EMAIL QUEUE] Error draining queue:', error))
+      .finally(() => {
+        this.currentDrain = null;
+        this.schedule();
+      });
+  }
+
+  schedule() {
+    if (!this.running || this.timer) {
+      return;
+    }
+
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.wake();
+    }, config.pollInterval);
+  }
+
+  /**
+   * Send due jobs batch by batch until none are left
+   * @returns {Promise<number>} - Number of processed jobs
+   */
+  async drain() {
+    this.draining = true;
+    let processed = 0;
+
+    try {
+      while (this.running) {
+        const jobs = await this.claimDueJobs(config.concurrency * 10);
+        if (jobs.length === 0) {
+          break;
+        }
+
+        await this.sendJobs(jobs);
+        processed += jobs.length;
+      }
+    } finally {
+      this.draining = false;
+    }
+
+    return processed;
+  }
+
+  /**
+   * Mark due pending jobs as processing and return them
+   * @param {number} limit - Maximum number of jobs to claim
+   * @returns {Promise<Array>} - Claimed jobs
+   */
+  async claimDueJobs(limit) {
+    return sequelize.transaction({ type: Transaction.TYPES.IMMEDIATE }, async (transaction) => {
+      const jobs = await EmailJob.findAll({
+        where: {
+          status: 'pending',
+          nextAttemptAt: { [Op.lte]: new Date() }
+        },
+        order: [['nextAttemptAt', 'ASC']],
+        limit,
+        transaction
+      });
+
+      if (jobs.length === 0) {
+        return [];
+      }
+
+      await EmailJob.update(
+        { status: 'processing', attempts: sequelize.literal('attempts + 1') },
+        { where: { id: jobs.map(job => job.id) }, transaction }
+      );
+
+      return jobs.map(job => ({
+        ...job.get({ plain: true }),
+        status: 'processing',
+        attempts: job.attempts + 1
+      }));
+    });
+  }
+
+  /**
+   * Send claimed jobs with bounded concurrency, then record the outcomes
+   * in one upsert and one batched communication log insert
+   * @param {Array} jobs - Claimed jobs
+   */
+  async sendJobs(jobs) {
+    const queue = [...jobs];
+    const outcomes = [];
+
+    const worker = async () => {
+      while (queue.length > 0) {
+        const job = queue.shift();
+        try {
+          const info = await emailService.deliver({
+            to: job.recipient,
+            subject: job.subject,
+            html: job.html,
+            text: job.text
+          });
+          outcomes.push({ job, messageId: info.messageId });
+        } catch (error) {
+          outcomes.push({ job, error });
+        }
+      }
+    };
+
+    await Promise.all(Array.from({ length: Math.min(config.concurrency, jobs.length) }, worker));
+
+    const now = new Date();
+    const updates = [];
+    const logEntries = [];
+
+    outcomes.forEach(({ job, messageId, error }) => {
+      if (!error) {
+        updates.push({ ...job, status: 'sent', messageId, sentAt: now, lastError: null, updatedAt: now });
+        logEntries.push(this.buildLogEntry(job, 'sent', `Message ID: ${messageId}`, now));
+        return;
+      }
+
+      if (job.attempts >= config.maxAttempts) {
+        console.error(`[EMAIL QUEUE] Giving up on email to ${job.recipient} after ${job.attempts} attempt(s):`, error.message);
+        updates.push({ ...job, status: 'failed', lastError: error.message, updatedAt: now });
+        logEntries.push(this.buildLogEntry(job, 'failed', `Error: ${error.message}`, now));
+        return;
+      }
+
+      // Exponential backoff: base, 2x base, 4x base, ...
+      const delay = config.retryBaseDelay * Math.pow(2, job.attempts - 1);
+      console.log(`[EMAIL QUEUE] Email to ${job.recipient} failed (attempt ${job.attempts}), retrying in ${delay}ms`);
+      updates.push({
+        ...job,
+        status: 'pending',
+        lastError: error.message,
+        nextAttemptAt: new Date(now.getTime() + delay),
+        updatedAt: now
+      });
+    });
+
+    await EmailJob.bulkCreate(updates, { updateOnDuplicate: JOB_UPDATE_FIELDS });
+
+    if (logEntries.length > 0) {
+      try {
+        await emailService.logCommunications(logEntries);
+      } catch (logError) {
+        console.error('[EMAIL QUEUE] Error logging sent emails:', logError);
+      }
+    }
+
+    const sent = outcomes.filter(outcome => !outcome.error).length;
+    console.log(`[EMAIL QUEUE] Processed ${outcomes.length} email(s): ${sent} sent, ${outcomes.length - sent} failed`);
+  }
+
+  buildLogEntry(job, status, details, sentAt) {
+    return {
+      campaignId: job.campaignId,
+      participantId: job.participantId,
+      recipient: job.recipient,
+      subject: job.subject,
+      communicationType: job.communicationType,
+      status,
+      details,
+      sentAt: sentAt.toISOString()
+    };
+  }
+}
+
+module.exports = new EmailQueueService();
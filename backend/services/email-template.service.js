@@ -0,0 +1,289 @@
+// backend/services/email-template.service.js
+
+const { CommunicationTemplate, BrandingSettings } = require('../models');
+const { compileEmailTemplate } = require('../utils/template-compiler');
+
+const DEFAULT_COMPANY_NAME = 'Your Company';
+
+// Used when the template lookup itself fails; never cached
+const ERROR_FALLBACK_TEMPLATE = {
+  subject: '360 Feedback Request',
+  content: `<p>Please provide your feedback by clicking <a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">here</a>.</p>`
+};
+
+/**
+ * Find the template to use for a relationship type, falling back to the
+ * "all" recipient type, any template of the type and finally a built-in one
+ * @param {string} relationshipType - Assessor relationship type
+ * @param {string} templateType - invitation, instruction, reminder, ...
+ * @returns {Promise<Object>} - { subject, content }
+ */
+async function findEmailTemplate(relationshipType, templateType) {
+  console.log(`Looking for template: ${templateType} for ${relationshipType}`);
+  
+  // First try to find a template specifically for this relationship type
+  let template = await CommunicationTemplate.findOne({
+    where: {
+      templateType: templateType,
+      recipientType: relationshipType,
+      isDefault: true
+    }
+  });
+  
+  // If no specific template exists, fall back to the "all" recipient type
+  if (!template) {
+    console.log(`No specific template found, looking for 'all' type`);
+    template = await CommunicationTemplate.findOne({
+      where: {
+        templateType: templateType,
+        recipientType: 'all',
+        isDefault: true
+      }
+    });
+  }
+  
+  // If still no template, check for any template without isDefault requirement
+  if (!template) {
+    console.log(`No default template found, looking for any ${templateType} template`);
+    template = await CommunicationTemplate.findOne({
+      where: {
+        templateType: templateType
+      }
+    });
+  }
+  
+  // If no template found in database, use a hardcoded fallback
+  if (!template) {
+    console.log(`Using fallback template for ${templateType}-${relationshipType}`);
+    
+    // Fallback templates
+    if (templateType === 'invitation' && relationshipType === 'self') {
+      return {
+        subject: 'Complete your Self-Assessment for {campaignName}',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>As part of the <strong>{campaignName}</strong> feedback campaign, you're invited to complete a self-assessment.</p>
+          <p>Self-assessment is a crucial part of the 360-degree feedback process, giving you an opportunity to reflect on your own performance.</p>
+          <p>Please complete your self-assessment by {deadline}.</p>
+          <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Start Self-Assessment</a></p>
+          <p>Thank you for your participation!</p>
+        `
+      };
+    } else if (templateType === 'instruction' && relationshipType === 'self') {
+      return {
+        subject: 'Instructions for Your Self-Assessment',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>Here are some guidelines for completing your self-assessment as part of the <strong>{campaignName}</strong> feedback campaign:</p>
+          <ul>
+            <li>Be honest and reflective</li>
+            <li>Provide specific examples to support your assessment</li>
+            <li>Consider both your strengths and areas for development</li>
+            <li>Take your time to provide thoughtful responses</li>
+          </ul>
+          <p>Your self-assessment provides valuable context and will be considered alongside feedback from others.</p>
+          <p>If you haven't completed your assessment yet, please do so by {deadline}:</p>
+          <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Complete Self-Assessment</a></p>
+        `
+      };
+    } else if (templateType === 'invitation') {
+      return {
+        subject: 'Invitation to provide feedback for {targetName}',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>You've been invited to provide feedback for <strong>{targetName}</strong> as part of the <strong>{campaignName}</strong> feedback campaign.</p>
+          <p>Your insights are valuable for {targetName}'s professional development.</p>
+          <p>Please complete your feedback by {deadline}.</p>
+          <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Provide Feedback</a></p>
+          <p>Thank you for your participation!</p>
+        `
+      };
+    } else if (templateType === 'instruction') {
+      return {
+        subject: 'Guidelines for Providing Effective Feedback',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>Here are some guidelines for providing effective feedback for <strong>{targetName}</strong>:</p>
+          <ul>
+            <li>Be specific and provide examples</li>
+            <li>Focus on behaviors, not personality</li>
+            <li>Balance positive feedback with areas for development</li>
+            <li>Be constructive and actionable</li>
+          </ul>
+          <p>If you haven't completed your feedback yet, please do so by {deadline}:</p>
+          <p><a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">Provide Feedback</a></p>
+        `
+      };
+    } else if (templateType === 'reminder') {
+      return {
+        subject: 'Reminder: Complete your feedback for {targetName}',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>This is a friendly reminder to complete your feedback for <strong>{targetName}</strong> as part of the <strong>{campaignName}</strong> campaign.</p>
+          <p>Please complete your feedback by {deadline}.</p>
+          <p><a href="{feedbackUrl}">Complete Feedback</a></p>
+        `
+      };
+    } else {
+      return {
+        subject: '360 Feedback Request: {campaignName}',
+        content: `
+          <p>Hello {assessorName},</p>
+          <p>Please complete your feedback for the <strong>{campaignName}</strong> campaign by {deadline}.</p>
+          <p><a href="{feedbackUrl}">Provide Feedback</a></p>
+        `
+      };
+    }
+  }
+  
+  // If we have a template from the database, ensure it has both subject and content
+  if (template && template.subject && template.content) {
+    console.log('Found valid template from database:', template.id);
+    return {
+      subject: template.subject,
+      content: template.content
+    };
+  }
+  
+  // If template is missing required fields, use a basic fallback
+  console.log('Template is missing required fields, using emergency fallback');
+  return {
+    subject: `Feedback Request for ${templateType}`,
+    content: `<p>Please provide your feedback by clicking <a href="{feedbackUrl}" style="display: inline-block; background-color: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; font-weight: bold;">here</a>.</p>`
+  };
+}
+
+/**
+ * Compiled communication templates and branding, cached in memory.
+ * Caches are cleared by the communication template and branding settings
+ * controllers whenever they write, so a bulk send reads each template once.
+ */
+class EmailTemplateService {
+  constructor() {
+    this.templates = new Map();
+    this.branding = new Map();
+    this.renderers = new Map();
+    this.generation = 0;
+  }
+
+  /**
+   * Get the (cached) template source for a relationship and template type
+   * @param {string} relationshipType - Assessor relationship type
+   * @param {string} templateType - invitation, instruction, reminder, ...
+   * @returns {Promise<Object>} - { subject, content }
+   */
+  async getTemplate(relationshipType, templateType) {
+    const key = `${relationshipType}:${templateType}`;
+
+    if (!this.templates.has(key)) {
+      // Cache the promise so concurrent requests share one lookup
+      const lookup = findEmailTemplate(relationshipType, templateType);
+      this.templates.set(key, lookup);
+      lookup.catch(() => {
+        if (this.templates.get(key) === lookup) this.templates.delete(key);
+      });
+    }
+
+    try {
+      return await this.templates.get(key);
+    } catch (error) {
+      console.error('Error fetching email template:', error);
+      return ERROR_FALLBACK_TEMPLATE;
+    }
+  }
+
+  /**
+   * Get the (cached) branding values used in emails for a user
+   * @param {string} userId - Owner of the branding settings
+   * @returns {Promise<Object>} - { companyName, primaryColor, secondaryColor }
+   */
+  async getBranding(userId) {
+    const key = userId || '';
+
+    if (!this.branding.has(key)) {
+      const lookup = (userId ? BrandingSettings.findOne({ where: { userId } }) : Promise.resolve(null))
+        .then(settings => ({
+          companyName: (settings && settings.companyName) || DEFAULT_COMPANY_NAME,
+          primaryColor: (settings && settings.primaryColor) || '#3B82F6',
+          secondaryColor: (settings && settings.secondaryColor) || '#2563EB'
+        }));
+      this.branding.set(key, lookup);
+      lookup.catch(() => {
+        if (this.branding.get(key) === lookup) this.branding.delete(key);
+      });
+    }
+
+    try {
+      return await this.branding.get(key);
+    } catch (error) {
+      console.error('Error fetching branding settings:', error);
+      return { companyName: DEFAULT_COMPANY_NAME };
+    }
+  }
+
+  /**
+   * Get a compiled render function for a template with a user's branding bound in
+   * @param {string} relationshipType - Assessor relationship type
+   * @param {string} templateType - invitation, instruction, reminder, ...
+   * @param {string} userId - Campaign owner whose branding is used
+   * @returns {Promise<Function>} - render(vars) returning { subject, html }
+   */
+  async getRenderer(relationshipType, templateType, userId) {
+    const key = `${userId || ''}:${relationshipType}:${templateType}`;
+
+    if (this.renderers.has(key)) {
+      return this.renderers.get(key);
+    }
+
+    const generation = this.generation;
+    const [template, branding] = await Promise.all([
+      this.getTemplate(relationshipType, templateType),
+      this.getBranding(userId)
+    ]);
+    const renderer = compileEmailTemplate(template, branding);
+
+    // Don't keep a renderer built from the error fallback, or from a template
+    // or branding that was edited while it was loaded
+    if (template !== ERROR_FALLBACK_TEMPLATE && generation === this.generation) {
+      this.renderers.set(key, renderer);
+    }
+
+    return renderer;
+  }
+
+  /**
+   * Render an email for one recipient
+   * @param {Object} options - relationshipType, templateType, userId
+   * @param {Object} vars - Placeholder values for the recipient
+   * @returns {Promise<Object>} - { subject, html }
+   */
+  async render({ relationshipType, templateType, userId }, vars) {
+    const renderer = await this.getRenderer(relationshipType, templateType, userId);
+    return renderer(vars);
+  }
+
+  /**
+   * Drop cached templates after a communication template is written
+   */
+  invalidateTemplates() {
+    this.generation++;
+    this.templates.clear();
+    this.renderers.clear();
+  }
+
+  /**
+   * Drop cached branding after a user's branding settings are written
+   * @param {string} userId - Owner of the branding settings
+   */
+  invalidateBranding(userId) {
+    this.generation++;
+    this.branding.delete(userId || '');
+    for (const key of this.renderers.keys()) {
+      if (key.startsWith(`${userId || ''}:`)) {
+        this.renderers.delete(key);
+      }
+    }
+  }
+}
+
+module.exports = new EmailTemplateService();
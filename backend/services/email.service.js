@@ -1,7 +1,12 @@
 // backend/services/email.service.js
 
 const nodemailer = require('nodemailer');
-const { EmailSettings } = require('../models');
+const { v4: uuidv4 } = require('uuid');
+const { EmailSettings, sequelize } = require('../models');
+const emailQueueConfig = require('../config/email-queue');
+
+// Rows per INSERT into communication_logs; 12 bound parameters per row
+const LOG_BATCH_SIZE = 50;
 
 /**
  * Email service for Pulse360
@@ -36,7 +41,12 @@ class EmailService {
         devMode: settings.devMode
       });
       
-      // Create transporter
+      // Close the previous pool before replacing it
+      if (this.transporter && typeof this.transporter.close === 'function') {
+        this.transporter.close();
+      }
+      
+      // Create a pooled transporter so bulk sends reuse SMTP connections
       this.transporter = nodemailer.createTransport({
         host: settings.host,
         port: settings.port,
@@ -44,7 +54,11 @@ class EmailService {
         auth: settings.requireAuth ? {
           user: settings.username,
           pass: settings.password
-        } : undefined
+        } : undefined,
+        pool: true,
+        maxConnections: emailQueueConfig.concurrency,
+        rateDelta: 1000,
+        rateLimit: emailQueueConfig.rateLimit
       });
       
       this.settings = settings;
@@ -232,16 +246,12 @@ class EmailService {
         console.log('Email service initialized successfully');
       }
       
-      // Re-check settings from database to ensure we have the latest
-      const freshSettings = await EmailSettings.findOne();
-      if (!freshSettings) {
-        console.error('No email settings found in database!');
-        throw new Error('Email settings not found');
-      }
+      // Settings are cached by initialize() and refreshed by updateSettings()
+      const settings = this.settings;
       
       // Allow for explicitly passing devMode to override settings
       // This is a critical change - check if devMode is explicitly set in options
-      const devMode = options.devMode !== undefined ? options.devMode : freshSettings.devMode;
+      const devMode = options.devMode !== undefined ? options.devMode : settings.devMode;
       console.log(`Using devMode: ${devMode} (${options.devMode !== undefined ? 'from parameter' : 'from settings'})`);
       
       // Check for dev mode
@@ -250,55 +260,20 @@ class EmailService {
         // Continue execution and don't return early
       }
       
-      // Prepare email options
-      const mailOptions = {
-        from: `"${this.settings.fromName}" <${this.settings.fromEmail}>`,
-        to: options.to,
-        subject: options.subject,
-        text: options.text,
-        html: options.html
-      };
-      
-      // Add reply-to if configured
-      if (this.settings.replyTo) {
-        mailOptions.replyTo = this.settings.replyTo;
-      }
-      
-      // Send the email
-      console.log(`Sending actual email to ${options.to}...`);
-      const info = await this.transporter.sendMail(mailOptions);
+      const info = await this.deliver(options);
       console.log(`Email sent successfully! Message ID: ${info.messageId}`);
       
-      // Log this communication in the database using direct SQL
+      // Log this communication in the database
       try {
-        // Use raw query to directly insert
-        const { sequelize } = require('../config/database');
-        const { v4: uuidv4 } = require('uuid');
-        const id = uuidv4();
-        const now = new Date().toISOString();
-        
-        await sequelize.query(
-          `INSERT INTO communication_logs 
-          (id, campaignId, participantId, recipient, subject, type, communicationType, status, details, sentAt, createdAt, updatedAt) 
-          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-          {
-            replacements: [
-              id,
-              options.campaignId || null,
-              options.participantId || null,
-              options.to,
-              options.subject || null,
-              'email',
-              options.communicationType || 'other',
-              'sent',
-              `Message ID: ${info.messageId}`,
-              now,
-              now,
-              now
-            ],
-            type: sequelize.QueryTypes.INSERT
-          }
-        );
+        await this.logCommunications([{
+          campaignId: options.campaignId,
+          participantId: options.participantId,
+          recipient: options.to,
+          subject: options.subject,
+          communicationType: options.communicationType,
+          status: 'sent',
+          details: `Message ID: ${info.messageId}`
+        }]);
         
         console.log('Created log entry for sent email');
       } catch (logError) {
@@ -311,34 +286,15 @@ class EmailService {
       
       // Log the failed communication
       try {
-        // Use raw query to directly insert error
-        const { sequelize } = require('../config/database');
-        const { v4: uuidv4 } = require('uuid');
-        const id = uuidv4();
-        const now = new Date().toISOString();
-        
-        await sequelize.query(
-          `INSERT INTO communication_logs 
-          (id, campaignId, participantId, recipient, subject, type, communicationType, status, details, sentAt, createdAt, updatedAt) 
-          VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
-          {
-            replacements: [
-              id,
-              options.campaignId || null,
-              options.participantId || null,
-              options.to,
-              options.subject || null,
-              'email',
-              options.communicationType || 'other',
-              'failed',
-              `Error: ${error.message}`,
-              now,
-              now,
-              now
-            ],
-            type: sequelize.QueryTypes.INSERT
-          }
-        );
+        await this.logCommunications([{
+          campaignId: options.campaignId,
+          participantId: options.participantId,
+          recipient: options.to,
+          subject: options.subject,
+          communicationType: options.communicationType,
+          status: 'failed',
+          details: `Error: ${error.message}`
+        }]);
         
         console.log('Created log entry for failed email');
       } catch (logError) {
@@ -349,6 +305,77 @@ class EmailService {
     }
   }
 
+  /**
+   * Hand a message to the pooled SMTP transport without logging it.
+   * Used by sendEmail and by the email queue worker, which logs in batches.
+   * @param {Object} options - to, subject, text and html of the message
+   * @returns {Promise<Object>} - nodemailer send info
+   */
+  async deliver(options) {
+    if (!this.initialized) {
+      const success = await this.initialize();
+      if (!success) {
+        throw new Error('Email service not initialized');
+      }
+    }
+    
+    // Prepare email options
+    const mailOptions = {
+      from: `"${this.settings.fromName}" <${this.settings.fromEmail}>`,
+      to: options.to,
+      subject: options.subject,
+      text: options.text,
+      html: options.html
+    };
+    
+    // Add reply-to if configured
+    if (this.settings.replyTo) {
+      mailOptions.replyTo = this.settings.replyTo;
+    }
+    
+    return this.transporter.sendMail(mailOptions);
+  }
+
+  /**
+   * Insert communication log entries with multi-row INSERTs
+   * @param {Array<Object>} entries - recipient, subject, status, details, campaignId, participantId, communicationType
+   */
+  async logCommunications(entries) {
+    const now = new Date().toISOString();
+    
+    for (let i = 0; i < entries.length; i += LOG_BATCH_SIZE) {
+      const batch = entries.slice(i, i + LOG_BATCH_SIZE);
+      const replacements = [];
+      
+      batch.forEach(entry => {
+        replacements.push(
+          uuidv4(),
+          entry.campaignId || null,
+          entry.participantId || null,
+          entry.recipient,
+          entry.subject || null,
+          entry.type || 'email',
+          entry.communicationType || 'other',
+          entry.status,
+          entry.details || null,
+          entry.sentAt || now,
+          now,
+          now
+        );
+      });
+      
+      await sequelize.query(
+        `INSERT INTO communication_logs 
+        (id, campaignId, participantId, recipient, subject, type, communicationType, status, details, sentAt, createdAt, updatedAt) 
+        VALUES ${batch.map(() => '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)').join(', ')}`,
+        {
+          replacements,
+          type: sequelize.QueryTypes.INSERT
+        }
+      );
+    }
+  }
+
   /**
    * Log communication to database
    */
@@ -1,10 +1,21 @@
 // backend/services/flux-ai.service.js
 
-const axios = require('axios');
-const fs = require('fs').promises;
+const fs = require('fs');
 const path = require('path');
 const FormData = require('form-data');
 const fluxAiConfig = require('../config/flux-ai');
+const aiClient = require('./ai-client.service');
+
+// Storage information shared by quota checks. Uploads still running are counted
+// in inFlightBytes until they finish; uploads that finished since the last fetch
+// started are counted in uploadedBytes until a later fetch includes them.
+const storageCache = {
+  info: null,
+  fetchedAt: 0,
+  pending: null,
+  inFlightBytes: 0,
+  uploadedBytes: 0
+};
 
 /**
  * Upload a file to the Flux AI API
@@ -12,29 +23,38 @@ const fluxAiConfig = require('../config/flux-ai');
  * @returns {Promise<Object>} - The response from the API
  */
 async function uploadFileToFluxAi(filePath) {
+  let reservedBytes = 0;
+  let stored = false;
+
   try {
     // Check available storage space before uploading
     const spaceCheck = await checkStorageBeforeUpload(filePath);
     if (!spaceCheck.success) {
       return spaceCheck; // Return the error response
     }
+    reservedBytes = spaceCheck.fileSize;
 
-    // Read the file
-    const fileContent = await fs.readFile(filePath);
-    
-    // Create form data
+    // Stream the file instead of reading it into memory
     const form = new FormData();
-    form.append('file', fileContent, path.basename(filePath));
+    form.append('file', fs.createReadStream(filePath), {
+      filename: path.basename(filePath),
+      knownLength: spaceCheck.fileSize
+    });
     
     // Make the upload request
     const endpoint = fluxAiConfig.getEndpointUrl('files');
     
-    const response = await axios.post(endpoint, form, {
+    const response = await aiClient.request({
+      method: 'POST',
+      url: endpoint,
+      data: form,
       headers: {
-        'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-        ...form.getHeaders()
-      }
+        ...form.getHeaders(),
+        'Content-Length': form.getLengthSync()
+      },
+      purpose: 'file_upload'
     });
+    stored = true;
     
     return { success: true, data: response.data };
   } catch (error) {
@@ -46,6 +66,7 @@ async function uploadFileToFluxAi(filePath) {
       // Check if error is related to storage space
       if (error.response.data.error && 
           error.response.data.error.includes('storage')) {
+        invalidateStorageInfo();
         return {
           success: false,
           errorType: 'storage_limit',
@@ -56,28 +77,25 @@ async function uploadFileToFluxAi(filePath) {
     }
     
     return { success: false, error: error.message };
+  } finally {
+    settleUpload(reservedBytes, stored);
   }
 }
 
 /**
- * Make a chat request to the Flux AI API
+ * Make a chat request to the Flux AI API. Identical requests are answered
+ * from the shared response cache.
  * @param {Object} requestBody - The request body to send
+ * @param {Object} options - Client options (purpose, cache, ttl)
  * @returns {Promise<Object>} - The response from the API
  */
-async function makeAiChatRequest(requestBody) {
+async function makeAiChatRequest(requestBody, options = {}) {
   try {
     // Force the model exactly as specified in config
     const configuredModel = fluxAiConfig.model.trim();
     console.log(`Using configured model: ${configuredModel}`);
     requestBody.model = configuredModel;
     
-    // Remove any undefined parameters to avoid API issues
-    Object.keys(requestBody).forEach(key => {
-      if (requestBody[key] === undefined) {
-        delete requestBody[key];
-      }
-    });
-    
     // Log complete request for debugging
     console.log(`AI request payload:`, JSON.stringify({
       model: requestBody.model,
@@ -86,17 +104,11 @@ async function makeAiChatRequest(requestBody) {
       mode: requestBody.mode
     }));
     
-    // Make direct API request - NO FALLBACKS
-    const endpoint = fluxAiConfig.getEndpointUrl('chat');
-    const response = await axios.post(endpoint, requestBody, {
-      headers: {
-        'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-        'Content-Type': 'application/json'
-      }
-    });
+    // Make API request through the shared client - NO FALLBACKS
+    const data = await aiClient.chat(requestBody, { purpose: 'document_analysis', ...options });
     
-    console.log('Response received, model used:', response.data?.model || 'Not specified');
-    return response.data;
+    console.log('Response received, model used:', data?.model || 'Not specified');
+    return data;
   } catch (error) {
     console.error('Error making AI chat request:', error.message);
     throw error; // Always throw to let caller handle
@@ -113,12 +125,7 @@ async function getStorageInfo() {
     
     // Try both possible endpoints
     try {
-      const response = await axios.get(filesEndpoint, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      });
+      const response = await aiClient.request({ method: 'GET', url: filesEndpoint, purpose: 'storage_info' });
       
       return {
         success: true,
@@ -132,12 +139,7 @@ async function getStorageInfo() {
       console.log('Primary files endpoint failed, trying alternate endpoint');
       const altEndpoint = fluxAiConfig.baseUrl + '/v1/chat/files';
       
-      const response = await axios.get(altEndpoint, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      });
+      const response = await aiClient.request({ method: 'GET', url: altEndpoint, purpose: 'storage_info' });
       
       return {
         success: true,
@@ -160,6 +162,57 @@ async function getStorageInfo() {
   }
 }
 
+/**
+ * Storage information for quota checks, fetched at most once per
+ * storageInfoTtl and shared by concurrent callers
+ * @returns {Promise<Object>} - Same shape as getStorageInfo
+ */
+async function getCachedStorageInfo() {
+  if (storageCache.info && Date.now() - storageCache.fetchedAt < fluxAiConfig.storageInfoTtl) {
+    return storageCache.info;
+  }
+
+  if (!storageCache.pending) {
+    // Uploads finished before this point are included in the fetched numbers
+    const uploadedBeforeFetch = storageCache.uploadedBytes;
+    storageCache.pending = getStorageInfo()
+      .then(info => {
+        if (info.success) {
+          storageCache.info = info;
+          storageCache.fetchedAt = Date.now();
+          storageCache.uploadedBytes = Math.max(0, storageCache.uploadedBytes - uploadedBeforeFetch);
+        }
+        return info;
+      })
+      .finally(() => {
+        storageCache.pending = null;
+      });
+  }
+
+  return storageCache.pending;
+}
+
+/**
+ * Forget the cached storage information (after deletes or storage errors).
+ * Uploads that are still running stay reserved.
+ */
+function invalidateStorageInfo() {
+  storageCache.info = null;
+  storageCache.fetchedAt = 0;
+}
+
+/**
+ * Release the space reserved for an upload once it has finished
+ * @param {number} bytes - Bytes reserved by checkStorageBeforeUpload
+ * @param {boolean} stored - Whether the file was stored
+ */
+function settleUpload(bytes, stored) {
+  storageCache.inFlightBytes = Math.max(0, storageCache.inFlightBytes - bytes);
+  if (stored) {
+    storageCache.uploadedBytes += bytes;
+  }
+}
+
 /**
  * List all files in the Flux AI account
  * @returns {Promise<Array>} - Array of file objects
@@ -192,12 +245,8 @@ async function deleteFluxAiFile(fileId) {
     
     // Try the primary endpoint first
     try {
-      await axios.delete(filesEndpoint, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      });
+      await aiClient.request({ method: 'DELETE', url: filesEndpoint, purpose: 'file_delete' });
+      invalidateStorageInfo();
       
       return { success: true, message: 'File deleted successfully' };
     } catch (err) {
@@ -205,12 +254,8 @@ async function deleteFluxAiFile(fileId) {
       console.log('Primary delete endpoint failed, trying alternate endpoint');
       const altEndpoint = `${fluxAiConfig.baseUrl}/v1/chat/files/${fileId}`;
       
-      await axios.delete(altEndpoint, {
-        headers: {
-          'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-          'Content-Type': 'application/json'
-        }
-      });
+      await aiClient.request({ method: 'DELETE', url: altEndpoint, purpose: 'file_delete' });
+      invalidateStorageInfo();
       
       return { success: true, message: 'File deleted successfully' };
     }
@@ -221,18 +266,21 @@ async function deleteFluxAiFile(fileId) {
 }
 
 /**
- * Check if there's enough storage space before uploading a file
+ * Check if there's enough storage space before uploading a file. Storage
+ * information is cached briefly; space taken by running uploads and by
+ * uploads since it was fetched is reserved so parallel uploads don't
+ * overcommit it. The caller must release the space with settleUpload.
  * @param {string} filePath - Path to the file to upload
- * @returns {Promise<Object>} - Check result with success status
+ * @returns {Promise<Object>} - Check result with success status and fileSize
  */
 async function checkStorageBeforeUpload(filePath) {
   try {
     // Get file size
-    const stats = await fs.stat(filePath);
+    const stats = await fs.promises.stat(filePath);
     const fileSize = stats.size;
     
     // Get storage info
-    const storageInfo = await getStorageInfo();
+    const storageInfo = await getCachedStorageInfo();
     
     if (!storageInfo.success) {
       return { 
@@ -243,32 +291,90 @@ async function checkStorageBeforeUpload(filePath) {
     }
     
     // Check if there's enough space
-    if (fileSize > storageInfo.availableStorage) {
+    const availableStorage = storageInfo.availableStorage - storageCache.inFlightBytes - storageCache.uploadedBytes;
+    if (fileSize > availableStorage) {
       return {
         success: false,
         errorType: 'insufficient_space',
         error: 'Insufficient storage space',
         details: {
           fileSize,
-          availableStorage: storageInfo.availableStorage,
+          availableStorage,
           usedStorage: storageInfo.usedStorage,
           totalStorage: storageInfo.totalStorage
         }
       };
     }
     
-    return { success: true };
+    storageCache.inFlightBytes += fileSize;
+    return { success: true, fileSize };
   } catch (error) {
     console.error('Error checking storage space:', error.message);
     return { success: false, error: error.message };
   }
 }
 
+/**
+ * Check the models, balance and chat endpoints, trying the X-API-KEY header
+ * first and Bearer auth second. The chat request skips the response cache,
+ * as a connection test must reach the API.
+ * @returns {Promise<Object>} - { models, balance, chat }, null where both attempts failed
+ */
+async function testFluxAiConnectivity() {
+  const tryBothAuthSchemes = async (label, call) => {
+    try {
+      const data = await call('x-api-key');
+      console.log(`${label} API response:`, data);
+      return data;
+    } catch (error) {
+      console.error(`${label} API error:`, error.message);
+    }
+
+    try {
+      const data = await call('bearer');
+      console.log(`${label} API response with Bearer auth:`, data);
+      return data;
+    } catch (bearerError) {
+      console.error(`${label} API error with Bearer auth:`, bearerError.message);
+      return null;
+    }
+  };
+
+  const get = (endpoint) => async (authScheme) => {
+    const response = await aiClient.request({
+      method: 'GET',
+      url: `${fluxAiConfig.baseUrl}${fluxAiConfig.endpoints[endpoint]}`,
+      purpose: 'connection_test',
+      authScheme
+    });
+    return response.data;
+  };
+
+  const models = await tryBothAuthSchemes('Models', get('llms'));
+  const balance = await tryBothAuthSchemes('Balance', get('balance'));
+  const chat = await tryBothAuthSchemes('Chat', (authScheme) => aiClient.chat(
+    {
+      messages: [
+        {
+          role: 'user',
+          content: 'Hello, can you tell me how to attach files to API requests?'
+        }
+      ],
+      stream: false
+    },
+    { purpose: 'connection_test', cache: false, authScheme }
+  ));
+
+  return { models, balance, chat };
+}
+
 module.exports = {
   uploadFileToFluxAi,
   makeAiChatRequest,
   getStorageInfo,
   listFluxAiFiles,
   deleteFluxAiFile,
-  checkStorageBeforeUpload
+  checkStorageBeforeUpload,
+  invalidateStorageInfo,
+  testFluxAiConnectivity
 };
\ No newline at end of file
@@ -1,201 +1,260 @@
 // backend/services/import.service.js
 
-const XLSX = require('xlsx');
-const csv = require('csv-parser');
-const fs = require('fs');
-const path = require('path');
 const { Employee, sequelize } = require('../models');
+const {
+  readRows,
+  resolveColumns,
+  mapRow,
+  validateRecord
+} = require('../utils/employee-import-reader');
+
+// Rows written per transaction (one IN query and one bulk upsert each)
+const IMPORT_CHUNK_SIZE = 500;
+// Only the first errors/duplicates are kept in detail; the rest are counted
+const MAX_REPORTED_ISSUES = 1000;
+// How long the progress of a finished import stays available
+const PROGRESS_RETENTION_MS = 10 * 60 * 1000;
+
+// Progress of recent imports, keyed by user and import ID so that users
+// can't see or overwrite each other's imports
+const importProgress = new Map();
+const progressKey = (userId, importId) => `${userId}:${importId}`;
+
+/**
+ * Get the progress of a running or recently finished import
+ * @param {string} importId - Import ID the progress was registered under
+ * @param {string} userId - User who started the import
+ * @returns {Object|null}
+ */
+exports.getImportProgress = (importId, userId) => {
+  const progress = importProgress.get(progressKey(userId, importId));
+  return progress && progress.userId === userId ? progress : null;
+};
 
 // Process employee file (Excel or CSV)
-exports.processEmployeeFile = async ({ filePath, mapping, startRow = 1, updateExisting = true, batchId, userId }) => {
+exports.processEmployeeFile = async ({ filePath, mapping, startRow = 2, updateExisting = true, batchId, importId = batchId, userId, onProgress }) => {
+  const key = progressKey(userId, importId);
+  const progress = {
+    importId,
+    batchId,
+    userId,
+    status: 'processing',
+    percent: 0,
+    rowsRead: 0
+  };
+  importProgress.set(key, progress);
+
+  const result = {
+    total: 0,
+    inserted: 0,
+    updated: 0,
+    errors: [],
+    duplicates: [],
+    errorCount: 0,
+    duplicateCount: 0
+  };
+
+  const context = {
+    result,
+    updateExisting,
+    batchId,
+    seenIds: new Set(),
+    columns: null
+  };
+
+  const reportProgress = () => {
+    Object.assign(progress, {
+      total: result.total,
+      inserted: result.inserted,
+      updated: result.updated,
+      errorCount: result.errorCount,
+      duplicateCount: result.duplicateCount
+    });
+    if (onProgress) onProgress({ ...progress });
+  };
+
+  // Without an explicit mapping the first row is the header row
+  const firstDataRow = mapping && Object.keys(mapping).length > 0 ? startRow : Math.max(startRow, 2);
+  const onRead = (fraction) => {
+    progress.percent = Math.round(fraction * 100);
+  };
+
   try {
-    const fileExt = path.extname(filePath).toLowerCase();
-    let data = [];
-    
-    // Parse file based on extension
-    if (fileExt === '.csv') {
-      data = await parseCSV(filePath, startRow);
-    } else if (['.xlsx', '.xls'].includes(fileExt)) {
-      data = await parseExcel(filePath, startRow);
-    } else {
-      throw new Error('Unsupported file format. Please upload a CSV or Excel file.');
+    let chunk = [];
+
+    for await (const { rowNumber, cells } of readRows(filePath, { onRead })) {
+      progress.rowsRead = rowNumber;
+
+      // The first row holds the headers, used to find the columns when there is no mapping
+      if (!context.columns) {
+        context.columns = resolveColumns(mapping, cells);
+      }
+
+      if (rowNumber < firstDataRow) {
+        continue;
+      }
+
+      result.total++;
+      chunk.push({ row: rowNumber, record: mapRow(cells, context.columns) });
+
+      if (chunk.length >= IMPORT_CHUNK_SIZE) {
+        await processChunk(chunk, context);
+        chunk = [];
+        reportProgress();
+      }
     }
-    
-    // Validate the mapping against required fields
-    validateMapping(mapping);
-    
-    // Map data to employee records
-    const mappedData = data.map(row => mapRowToEmployee(row, mapping));
-    
-    // Process the mapped data
-    const result = await processEmployeeData(mappedData, updateExisting, batchId);
-    
+
+    if (!context.columns) {
+      throw new Error('No data found in file');
+    }
+
+    if (chunk.length > 0) {
+      await processChunk(chunk, context);
+    }
+
+    progress.status = 'completed';
+    progress.percent = 100;
+    reportProgress();
+
     return result;
   } catch (error) {
     console.error('Error processing employee file:', error);
+    progress.status = 'failed';
+    progress.error = error.message;
+    reportProgress();
     throw error;
+  } finally {
+    setTimeout(() => {
+      if (importProgress.get(key) === progress) importProgress.delete(key);
+    }, PROGRESS_RETENTION_MS).unref();
   }
 };
 
-// Parse CSV file
-const parseCSV = (filePath, startRow) => {
-  return new Promise((resolve, reject) => {
-    const results = [];
-    let rowCounter = 0;
-    
-    fs.createReadStream(filePath)
-      .pipe(csv())
-      .on('data', (data) => {
-        rowCounter++;
-        if (rowCounter >= startRow) {
-          results.push(data);
-        }
-      })
-      .on('end', () => {
-        resolve(results);
-      })
-      .on('error', (error) => {
-        reject(error);
-      });
-  });
-};
-
-// Parse Excel file
-const parseExcel = (filePath, startRow) => {
-  try {
-    const workbook = XLSX.readFile(filePath, { cellDates: true });
-    const sheetName = workbook.SheetNames[0]; // Use first sheet
-    const worksheet = workbook.Sheets[sheetName];
-    
-    // Convert to JSON with header row
-    const jsonData = XLSX.utils.sheet_to_json(worksheet, { 
-      defval: null, 
-      header: "A", 
-      blankrows: false 
-    });
-    
-    // Skip rows before startRow (adjust for 0-indexing and header)
-    return jsonData.slice(startRow - 1);
-  } catch (error) {
-    console.error('Error parsing Excel file:', error);
-    throw new Error(`Failed to parse Excel file: ${error.message}`);
+// Record a row-level problem, keeping details only for the first ones
+const addIssue = (result, kind, issue) => {
+  const countKey = kind === 'errors' ? 'errorCount' : 'duplicateCount';
+  result[countKey]++;
+  if (result[kind].length < MAX_REPORTED_ISSUES) {
+    result[kind].push(issue);
   }
 };
 
-// Validate the mapping
-const validateMapping = (mapping) => {
-  const requiredFields = ['employeeId', 'firstName', 'lastName', 'email'];
-  
-  for (const field of requiredFields) {
-    if (!mapping[field]) {
-      throw new Error(`Required field '${field}' is not mapped to a column.`);
+// Validate a chunk of rows and upsert the valid ones in one transaction
+const processChunk = async (rows, context) => {
+  const { result, seenIds, updateExisting, batchId, columns } = context;
+  const candidates = [];
+
+  for (const { row, record } of rows) {
+    const problem = validateRecord(record);
+    if (problem) {
+      addIssue(result, 'errors', { row, employeeId: record.employeeId, message: problem });
+      continue;
     }
-  }
-};
 
-// Map row data to employee schema
-const mapRowToEmployee = (row, mapping) => {
-  const employee = {};
-  
-  // Map each field based on the mapping
-  for (const [field, column] of Object.entries(mapping)) {
-    if (column && row[column] !== undefined) {
-      employee[field] = row[column];
+    // Check if this employeeId was already processed in this import
+    if (seenIds.has(record.employeeId)) {
+      addIssue(result, 'duplicates', {
+        row,
+        employeeId: record.employeeId,
+        message: 'Duplicate employee ID in import file'
+      });
+      continue;
     }
+
+    seenIds.add(record.employeeId);
+    candidates.push({ row, record });
   }
-  
-  return employee;
-};
 
-// Process employee data
-const processEmployeeData = async (employeeRecords, updateExisting, batchId) => {
-  const result = {
-    total: employeeRecords.length,
-    inserted: 0,
-    updated: 0,
-    errors: [],
-    duplicates: []
-  };
-  
-  // For duplicate detection
-  const processedIds = new Set();
-  
-  // Start a transaction
-  const transaction = await sequelize.transaction();
-  
+  if (candidates.length === 0) {
+    return;
+  }
+
+  const updateFields = [...Object.keys(columns), 'importBatch', 'lastUpdatedAt', 'updatedAt'];
+  // Counted only once the chunk has been written
+  const skipped = [];
+  let inserted = 0;
+  let updated = 0;
+
   try {
-    for (const [index, record] of employeeRecords.entries()) {
-      try {
-        // Skip records without required fields
-        if (!record.employeeId || !record.firstName || !record.lastName || !record.email) {
-          result.errors.push({
-            row: index + 1,
-            message: 'Missing required fields',
-            data: record
-          });
-          continue;
-        }
-        
-        // Check if this employeeId was already processed in this import
-        if (processedIds.has(record.employeeId)) {
-          result.duplicates.push({
-            row: index + 1,
-            employeeId: record.employeeId,
-            message: 'Duplicate employee ID in import file'
-          });
-          continue;
+    await sequelize.transaction(async (transaction) => {
+      // One IN query instead of a lookup per row
+      const existing = await Employee.findAll({
+        where: { employeeId: candidates.map(c => c.record.employeeId) },
+        attributes: ['employeeId'],
+        raw: true,
+        transaction
+      });
+      const existingIds = new Set(existing.map(e => e.employeeId));
+
+      const now = new Date();
+      const records = [];
+
+      for (const { row, record } of candidates) {
+        if (existingIds.has(record.employeeId)) {
+          if (!updateExisting) {
+            skipped.push({ row, employeeId: record.employeeId, message: 'Employee already exists' });
+            continue;
+          }
+          updated++;
+        } else {
+          inserted++;
         }
-        
-        processedIds.add(record.employeeId);
-        
-        // Check if employee already exists
-        const existingEmployee = await Employee.findOne({ 
-          where: { employeeId: record.employeeId },
+
+        records.push({
+          ...record,
+          status: 'active',
+          importBatch: batchId,
+          importedAt: now,
+          lastUpdatedAt: now
+        });
+      }
+
+      if (records.length > 0) {
+        // Existing employees only get the imported columns updated
+        await Employee.bulkCreate(records, {
+          updateOnDuplicate: updateFields,
+          conflictAttributes: ['employeeId'],
           transaction
         });
-        
-        if (existingEmployee) {
-          if (updateExisting) {
-            // Update existing employee
-            await existingEmployee.update({
-              ...record,
-              lastUpdatedAt: new Date(),
-              importBatch: batchId
-            }, { transaction });
-            
-            result.updated++;
-          } else {
-            result.duplicates.push({
-              row: index + 1,
-              employeeId: record.employeeId,
-              message: 'Employee already exists'
-            });
-          }
-        } else {
-          // Insert new employee
-          await Employee.create({
-            ...record,
-            importBatch: batchId
-          }, { transaction });
-          
-          result.inserted++;
+      }
+    });
+  } catch (error) {
+    // Fall back to row-by-row writes so one bad row doesn't fail the whole chunk
+    console.error('Bulk employee import failed for chunk, retrying row by row:', error.message);
+    await processRowsIndividually(candidates, context, updateFields);
+    return;
+  }
+
+  result.inserted += inserted;
+  result.updated += updated;
+  skipped.forEach(issue => addIssue(result, 'duplicates', issue));
+};
+
+const processRowsIndividually = async (candidates, context, updateFields) => {
+  const { result, updateExisting, batchId } = context;
+
+  for (const { row, record } of candidates) {
+    try {
+      const existingEmployee = await Employee.findOne({ where: { employeeId: record.employeeId } });
+
+      if (existingEmployee) {
+        if (!updateExisting) {
+          addIssue(result, 'duplicates', { row, employeeId: record.employeeId, message: 'Employee already exists' });
+          continue;
         }
-      } catch (error) {
-        result.errors.push({
-          row: index + 1,
-          message: error.message,
-          data: record
+
+        const changes = {};
+        updateFields.forEach(field => {
+          if (record[field] !== undefined) changes[field] = record[field];
         });
+        await existingEmployee.update({ ...changes, importBatch: batchId });
+        result.updated++;
+      } else {
+        await Employee.create({ ...record, status: 'active', importBatch: batchId });
+        result.inserted++;
       }
+    } catch (error) {
+      addIssue(result, 'errors', { row, employeeId: record.employeeId, message: error.message });
     }
-    
-    // Commit the transaction
-    await transaction.commit();
-    
-    return result;
-  } catch (error) {
-    // Rollback the transaction
-    await transaction.rollback();
-    throw error;
   }
-};
\ No newline at end of file
+};
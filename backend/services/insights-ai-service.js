@@ -1,7 +1,7 @@
 // backend/services/insights-ai-service.js
 
-const axios = require('axios');
 const fluxAiConfig = require('../config/flux-ai');
+const aiClient = require('./ai-client.service');
 // Assuming generateMockInsight is no longer needed or defined elsewhere if used by fallback
 // const { generateMockInsight } = require('../utils/mock-insight-generator');
 
@@ -30,8 +30,7 @@ class InsightsAiService {
       const prompt = this.prepareGrowthBlueprintPrompt(feedbackData, employee, campaign); // Corrected: Use class method
 
       // Make API call to Flux AI
-      const response = await axios.post(
-        fluxAiConfig.getEndpointUrl('chat'), // Use the correct endpoint key 'chat'
+      const data = await aiClient.chat(
         {
           model: fluxAiConfig.model, // Explicitly set the model from config
           messages: [
@@ -47,17 +46,12 @@ class InsightsAiService {
           stream: false,
           // You might consider adding temperature if needed, e.g., temperature: 0.7
         },
-        {
-          headers: {
-            'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-            'Content-Type': 'application/json'
-          }
-        }
+        { purpose: 'insight_generation' }
       );
 
       // Process the response
-      if (response.data && response.data.choices && response.data.choices.length > 0) {
-        const aiResponse = response.data.choices[0].message?.content || response.data.choices[0].message;
+      if (data && data.choices && data.choices.length > 0) {
+        const aiResponse = data.choices[0].message?.content || data.choices[0].message;
 
         // Parse and structure the AI response
         const structuredInsight = this.parseAiResponseToStructuredInsight(aiResponse, employee); // Corrected: Use class method
@@ -65,7 +59,7 @@ class InsightsAiService {
 
         return structuredInsight;
       } else {
-        console.error('[INSIGHTS] Invalid response from Flux AI:', response.data);
+        console.error('[INSIGHTS] Invalid response from Flux AI:', data);
         return this.generateFallbackInsight(employee); // Corrected: Use class method
       }
     } catch (error) {
@@ -80,9 +74,10 @@ class InsightsAiService {
    * Regenerate insight content using Flux AI
    * @param {Object} insight - Original insight data
    * @param {Object} feedbackData - Aggregated feedback data
+   * @param {Object} options - force: ask the AI again instead of reusing a cached answer
    * @returns {Object} - Regenerated insight content
    */
-  async regenerateInsight(insight, feedbackData) {
+  async regenerateInsight(insight, feedbackData, { force = false } = {}) {
     // --- Start: Replaced Code from enhanced-regenerate-insight.js ---
     try {
       console.log(`[INSIGHTS] Regenerating insight: ${insight.id}`);
@@ -128,8 +123,8 @@ class InsightsAiService {
             ? 'You are an expert in organizational psychology and leadership development specializing in 360-degree feedback analysis. Generate a comprehensive development report in structured JSON format.'
             : 'Generate a professional development report for an employee based on 360-degree feedback. Respond with a simple JSON structure containing key insights.';
 
-          const response = await axios.post(
-            url,
+          // Unchanged feedback gives the same prompt, so the cached answer is reused unless forced
+          const data = await aiClient.chat(
             {
               messages: [
                 {
@@ -143,17 +138,12 @@ class InsightsAiService {
               ],
               stream: false,
             },
-            {
-              headers: {
-                'Authorization': `Bearer ${fluxAiConfig.apiKey}`,
-                'Content-Type': 'application/json'
-              }
-            }
+            { purpose: 'insight_regeneration', cache: !force }
           );
 
           // Process the response
-          if (response.data && response.data.choices && response.data.choices.length > 0) {
-            const responseContent = response.data.choices[0].message?.content || response.data.choices[0].message;
+          if (data && data.choices && data.choices.length > 0) {
+            const responseContent = data.choices[0].message?.content || data.choices[0].message;
             console.log(`[INSIGHTS] Response length: ${responseContent?.length || 0}`);
 
             // Check if the response is a refusal or too short
@@ -220,7 +210,7 @@ class InsightsAiService {
       // Check ratings
       if (data.ratings && Object.keys(data.ratings).length > 0) {
         for (const ratingKey of Object.keys(data.ratings)) {
-          if (data.ratings[ratingKey].values && data.ratings[ratingKey].values.length > 0) {
+          if (data.ratings[ratingKey].count > 0) {
             hasRatings = true;
             break;
           }
@@ -349,9 +339,10 @@ Keep each section brief but insightful. Focus on generally applicable profession
       // Average Rating for the type
       const typeRatings = Object.values(data?.ratings || {});
       if (typeRatings.length > 0) {
-          const allValues = typeRatings.flatMap(r => r?.values || []);
-          if (allValues.length > 0) {
-            const avg = (allValues.reduce((a, b) => a + b, 0) / allValues.length).toFixed(1);
+          const ratingCount = typeRatings.reduce((total, r) => total + (r?.count || 0), 0);
+          if (ratingCount > 0) {
+            const ratingSum = typeRatings.reduce((total, r) => total + (r?.sum || 0), 0);
+            const avg = (ratingSum / ratingCount).toFixed(1);
             typeSection += `Average Rating: ${avg}/5\n`;
             hasRatings = true;
             sectionHasData = true;
@@ -470,25 +461,26 @@ ${feedbackSummary}
       // Extract rating data by relationship type
       Object.entries(feedbackData.byRelationshipType).forEach(([type, data]) => {
         if (data.ratings && Object.keys(data.ratings).length > 0) {
-          const allRatings = [];
+          let ratingSum = 0;
+          let ratingCount = 0;
           const ratingsByQuestion = {};
 
           Object.entries(data.ratings).forEach(([questionId, rating]) => {
-            if (rating.values && rating.values.length > 0) {
-              allRatings.push(...rating.values);
-              // Calculate average if not present, assuming values are numbers
+            if (rating.count > 0) {
+              ratingSum += rating.sum;
+              ratingCount += rating.count;
               ratingsByQuestion[questionId] = {
-                average: rating.average || rating.values.reduce((a, b) => a + b, 0) / rating.values.length,
-                count: rating.values.length
+                average: rating.average,
+                count: rating.count
               };
             }
           });
 
-          if (allRatings.length > 0) {
-            const average = allRatings.reduce((a, b) => a + b, 0) / allRatings.length;
+          if (ratingCount > 0) {
+            const average = ratingSum / ratingCount;
             ratingsByType[type] = {
               average: average.toFixed(1),
-              count: allRatings.length,
+              count: ratingCount,
               byQuestion: ratingsByQuestion
             };
           }
@@ -2,6 +2,8 @@
 
 // --- (Keep sanitizeQuestionText, parseQuestionsFromAiResponse, deduplicateQuestions, calculateSimilarity, and parsing helpers unchanged) ---
 
+const { deduplicateQuestionGroups, deduplicateQuestionList } = require('../utils/question-dedup');
+
 /**
  * Sanitizes question text by removing department/template references
  * @param {string} text - The question text to sanitize
@@ -252,11 +254,8 @@ function parseQuestionsFromAiResponse(aiResponse, perspectiveSettings = {}) {
 
     console.log(`Successfully parsed ${totalQuestionsFound} questions from AI response.`);
 
-    // Deduplicate questions within each perspective
-    const deduplicatedQuestionsMap = {};
-    Object.keys(questionsByPerspective).forEach(perspective => {
-        deduplicatedQuestionsMap[perspective] = deduplicateQuestions(questionsByPerspective[perspective]);
-    });
+    // Deduplicate questions within each perspective (all perspectives in one pass)
+    const deduplicatedQuestionsMap = deduplicateQuestionGroups(questionsByPerspective);
 
     // Re-assign order for each perspective separately
     Object.keys(deduplicatedQuestionsMap).forEach(perspective => {
@@ -477,50 +476,13 @@ function parseGlobalQuestions(aiResponse, questionsByPerspective) {
 
 /**
  * Deduplicates questions based on perspective and text similarity
+ * (a question is dropped when calculateSimilarity with a kept one exceeds 0.85).
+ * Uses an indexed lookup instead of comparing every pair; see utils/question-dedup.js
  * @param {Array} questions - Array of question objects
  * @returns {Array} - Deduplicated array of questions
  */
 function deduplicateQuestions(questions) {
-    // Function to deduplicate questions - remains the same as provided previously
-    const uniqueQuestions = [];
-    const textMap = new Set(); // Set of normalized question texts
-
-    for (const question of questions) {
-        // Normalize the question text for comparison (lowercase, no punctuation, trimmed)
-        const normalizedText = question.text
-            .toLowerCase()
-            .replace(/[.,?!;:]/g, '') // Remove common punctuation
-            .replace(/\s+/g, ' ') // Normalize whitespace
-            .trim();
-
-        let isDuplicate = false;
-
-        // Check for exact match first
-        if (textMap.has(normalizedText)) {
-            isDuplicate = true;
-        } else {
-             // If not exact match, check for high similarity with existing questions
-             for (const existingQuestion of uniqueQuestions) {
-                const existingText = existingQuestion.text
-                    .toLowerCase()
-                    .replace(/[.,?!;:]/g, '')
-                    .replace(/\s+/g, ' ')
-                    .trim();
-
-                // Use the calculateSimilarity function
-                if (calculateSimilarity(normalizedText, existingText) > 0.85) { // Using stricter threshold
-                    isDuplicate = true;
-                    break;
-                }
-            }
-        }
-
-        if (!isDuplicate) {
-            textMap.add(normalizedText); // Add normalized text to prevent future duplicates
-            uniqueQuestions.push(question); // Add the original question object
-        }
-    }
-    return uniqueQuestions;
+    return deduplicateQuestionList(questions);
 }
 
 /**
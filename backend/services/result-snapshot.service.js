@@ -0,0 +1,352 @@
+// backend/services/result-snapshot.service.js
+
+const { Transaction } = require('sequelize');
+const { sequelize, Campaign, CampaignResultSnapshot, Question, Template } = require('../models');
+const { fetchCampaignResponses, aggregateCampaignResponses } = require('./results-aggregation.service');
+const {
+  INDIVIDUAL_TYPES,
+  TEXT_QUESTION_TYPES,
+  RELATIONSHIP_TYPES,
+  createAggregate,
+  addIndividualResponse,
+  addSnapshotRow
+} = require('../utils/results-aggregator');
+
+const SNAPSHOT_FIELDS = ['responseCount', 'ratingSum', 'ratingCount', 'ratingDistribution', 'textResponses', 'updatedAt'];
+
+const snapshotKey = (relationshipType, questionId) => `${relationshipType}:${questionId}`;
+
+const createSnapshotRow = (campaignId, relationshipType, questionId) => ({
+  campaignId,
+  relationshipType,
+  questionId,
+  responseCount: 0,
+  ratingSum: 0,
+  ratingCount: 0,
+  ratingDistribution: {},
+  textResponses: []
+});
+
+/**
+ * Add (sign = 1) or subtract (sign = -1) one response to a snapshot row
+ * @param {Object} row - Snapshot row
+ * @param {Object} response - Response with questionId, ratingValue and textResponse
+ * @param {string} questionType - Type of the answered question
+ * @param {number} sign - 1 to add the response, -1 to remove it
+ */
+function foldResponse(row, response, questionType, sign) {
+  row.responseCount = Math.max(0, row.responseCount + sign);
+
+  if (questionType === 'rating') {
+    if (response.ratingValue === null || response.ratingValue === undefined) return;
+
+    const value = Number(response.ratingValue);
+    if (isNaN(value)) return;
+
+    const key = String(value);
+    const distribution = { ...(row.ratingDistribution || {}) };
+    const nextCount = (distribution[key] || 0) + sign;
+    if (nextCount > 0) {
+      distribution[key] = nextCount;
+    } else {
+      delete distribution[key];
+    }
+
+    row.ratingSum += sign * value;
+    row.ratingCount = Math.max(0, row.ratingCount + sign);
+    row.ratingDistribution = distribution;
+  } else if (TEXT_QUESTION_TYPES.includes(questionType)) {
+    const text = response.textResponse !== undefined ? response.textResponse : '';
+    const texts = [...(row.textResponses || [])];
+
+    if (sign > 0) {
+      texts.push(text);
+    } else {
+      const index = texts.indexOf(text);
+      if (index !== -1) {
+        texts.splice(index, 1);
+      }
+    }
+
+    row.textResponses = texts;
+  }
+}
+
+/**
+ * Run work inside the caller's transaction, or in a new IMMEDIATE one so that
+ * concurrent read-modify-write updates of the same snapshot rows are serialized
+ */
+async function withTransaction(transaction, work) {
+  if (transaction) {
+    return work(transaction);
+  }
+  return sequelize.transaction({ type: Transaction.TYPES.IMMEDIATE }, work);
+}
+
+/**
+ * Rebuild a campaign's results snapshot from its raw responses
+ * @param {string} campaignId - Campaign ID
+ * @param {Object} options - Optional transaction
+ * @returns {Promise<number>} Number of snapshot rows written
+ */
+async function rebuildCampaignSnapshot(campaignId, { transaction } = {}) {
+  return withTransaction(transaction, async (t) => {
+    const responses = await fetchCampaignResponses(campaignId, { transaction: t });
+
+    const rows = new Map();
+    responses.forEach(response => {
+      const key = snapshotKey(response.relationshipType, response.questionId);
+      if (!rows.has(key)) {
+        rows.set(key, createSnapshotRow(campaignId, response.relationshipType, response.questionId));
+      }
+      foldResponse(rows.get(key), response, response.Question ? response.Question.type : null, 1);
+    });
+
+    await CampaignResultSnapshot.destroy({ where: { campaignId }, transaction: t });
+
+    if (rows.size > 0) {
+      await CampaignResultSnapshot.bulkCreate([...rows.values()], { transaction: t });
+    }
+
+    await Campaign.update(
+      { resultsSnapshotAt: new Date() },
+      { where: { id: campaignId }, transaction: t }
+    );
+
+    return rows.size;
+  });
+}
+
+/**
+ * Mark a campaign's snapshot as stale so it is rebuilt on next use,
+ * e.g. after participants were removed or changed relationship type
+ * @param {string} campaignId - Campaign ID
+ * @param {Object} options - Optional transaction
+ */
+async function invalidateCampaignSnapshot(campaignId, { transaction } = {}) {
+  await Campaign.update(
+    { resultsSnapshotAt: null },
+    { where: { id: campaignId }, transaction }
+  );
+}
+
+/**
+ * Mark every campaign's snapshot as stale, e.g. after the responses table was rebuilt
+ * @param {Object} options - Optional transaction
+ */
+async function invalidateAllSnapshots({ transaction } = {}) {
+  await Campaign.update(
+    { resultsSnapshotAt: null },
+    { where: {}, transaction }
+  );
+}
+
+/**
+ * Incrementally update a campaign's snapshot when a participant's responses change
+ * @param {Object} change - campaignId, relationshipType and the previous/next responses
+ * @param {Object} options - Optional transaction
+ * @returns {Promise<boolean>} False if the snapshot has not been built yet
+ */
+async function applyParticipantResponses({ campaignId, relationshipType, previous = [], next = [] }, { transaction } = {}) {
+  if (previous.length === 0 && next.length === 0) {
+    return true;
+  }
+
+  return withTransaction(transaction, async (t) => {
+    const campaign = await Campaign.findByPk(campaignId, {
+      attributes: ['id', 'resultsSnapshotAt'],
+      transaction: t
+    });
+
+    // An unbuilt snapshot is rebuilt from raw responses on first read
+    if (!campaign || !campaign.resultsSnapshotAt) {
+      return false;
+    }
+
+    const questionIds = [...new Set([...previous, ...next].map(r => r.questionId))];
+
+    const questions = await Question.findAll({
+      where: { id: questionIds },
+      attributes: ['id', 'type'],
+      transaction: t
+    });
+    const questionTypes = new Map(questions.map(q => [q.id, q.type]));
+
+    const existingRows = await CampaignResultSnapshot.findAll({
+      where: { campaignId, relationshipType, questionId: questionIds },
+      transaction: t
+    });
+
+    const rows = new Map();
+    existingRows.forEach(row => {
+      rows.set(row.questionId, row.get({ plain: true }));
+    });
+
+    const fold = (response, sign) => {
+      if (!rows.has(response.questionId)) {
+        rows.set(response.questionId, createSnapshotRow(campaignId, relationshipType, response.questionId));
+      }
+      foldResponse(rows.get(response.questionId), response, questionTypes.get(response.questionId), sign);
+    };
+
+    previous.forEach(response => fold(response, -1));
+    next.forEach(response => fold(response, 1));
+
+    await CampaignResultSnapshot.bulkCreate([...rows.values()], {
+      updateOnDuplicate: SNAPSHOT_FIELDS,
+      conflictAttributes: ['campaignId', 'relationshipType', 'questionId'],
+      transaction: t
+    });
+
+    return true;
+  });
+}
+
+/**
+ * Get a campaign's snapshot rows, rebuilding the snapshot first if it is stale
+ * @param {string} campaignId - Campaign ID
+ * @returns {Promise<Array>} Snapshot rows (one per relationship type and question)
+ */
+async function getCampaignSnapshot(campaignId) {
+  const campaign = await Campaign.findByPk(campaignId, {
+    attributes: ['id', 'resultsSnapshotAt']
+  });
+
+  if (!campaign) {
+    return [];
+  }
+
+  if (!campaign.resultsSnapshotAt) {
+    console.log(`[SNAPSHOT] Rebuilding stale results snapshot for campaign ${campaignId}`);
+    await rebuildCampaignSnapshot(campaignId);
+  }
+
+  return CampaignResultSnapshot.findAll({ where: { campaignId } });
+}
+
+/**
+ * Build the results aggregate of a campaign from its snapshot. Only self and
+ * manager responses, which are shown individually, are read from raw rows.
+ * @param {string} campaignId - Campaign ID
+ * @param {Array} questions - Questions of the campaign template
+ * @returns {Promise<Object>} Filled aggregate (see utils/results-aggregator)
+ */
+async function loadCampaignAggregate(campaignId, questions) {
+  const snapshotRows = await getCampaignSnapshot(campaignId);
+
+  const aggregate = createAggregate(questions);
+  snapshotRows.forEach(row => addSnapshotRow(aggregate, row));
+
+  const individualResponses = await fetchCampaignResponses(campaignId, {
+    relationshipTypes: INDIVIDUAL_TYPES
+  });
+  individualResponses.forEach(response => addIndividualResponse(aggregate, response));
+
+  return aggregate;
+}
+
+/**
+ * Compare the question statistics of two aggregates
+ * @returns {Array} Human readable mismatch descriptions
+ */
+function compareAggregates(expected, actual) {
+  const mismatches = [];
+  const normalizeTexts = texts => JSON.stringify([...texts].map(String).sort());
+  const normalizeDistribution = distribution => JSON.stringify(
+    Object.keys(distribution)
+      .filter(key => distribution[key] > 0)
+      .sort()
+      .map(key => [key, distribution[key]])
+  );
+  const emptyStats = { sum: 0, count: 0, distribution: {}, texts: [] };
+
+  RELATIONSHIP_TYPES.forEach(type => {
+    const expectedBucket = expected.byType[type];
+    const actualBucket = actual.byType[type];
+
+    if (expectedBucket.responseCount !== actualBucket.responseCount) {
+      mismatches.push(`${type}: responseCount ${actualBucket.responseCount} != ${expectedBucket.responseCount}`);
+    }
+
+    const questionIds = new Set([...expectedBucket.questions.keys(), ...actualBucket.questions.keys()]);
+    questionIds.forEach(questionId => {
+      const e = expectedBucket.questions.get(questionId) || emptyStats;
+      const a = actualBucket.questions.get(questionId) || emptyStats;
+
+      if (e.count !== a.count || Math.abs(e.sum - a.sum) > 1e-9) {
+        mismatches.push(`${type}/${questionId}: rating sum/count ${a.sum}/${a.count} != ${e.sum}/${e.count}`);
+      }
+      if (normalizeDistribution(e.distribution) !== normalizeDistribution(a.distribution)) {
+        mismatches.push(`${type}/${questionId}: rating distribution differs`);
+      }
+      if (normalizeTexts(e.texts) !== normalizeTexts(a.texts)) {
+        mismatches.push(`${type}/${questionId}: text responses differ (${a.texts.length} vs ${e.texts.length})`);
+      }
+    });
+  });
+
+  return mismatches;
+}
+
+/**
+ * Check a campaign's snapshot against the live computation from raw responses
+ * @param {string} campaignId - Campaign ID
+ * @returns {Promise<Object>} { campaignId, built, consistent, mismatches }
+ */
+async function checkCampaignSnapshot(campaignId) {
+  const campaign = await Campaign.findByPk(campaignId, {
+    include: [{
+      model: Template,
+      as: 'template',
+      include: [{ model: Question, as: 'questions' }]
+    }]
+  });
+
+  if (!campaign) {
+    throw new Error(`Campaign ${campaignId} not found`);
+  }
+
+  if (!campaign.resultsSnapshotAt) {
+    return { campaignId, built: false, consistent: false, mismatches: ['snapshot has not been built'] };
+  }
+
+  const questions = campaign.template ? campaign.template.questions : [];
+  const live = await aggregateCampaignResponses(campaignId, questions);
+
+  const snapshot = createAggregate(questions);
+  const snapshotRows = await CampaignResultSnapshot.findAll({ where: { campaignId } });
+  snapshotRows.forEach(row => addSnapshotRow(snapshot, row));
+
+  const mismatches = compareAggregates(live, snapshot);
+
+  return { campaignId, built: true, consistent: mismatches.length === 0, mismatches };
+}
+
+/**
+ * Rebuild the snapshots of all campaigns (or only stale ones)
+ * @param {Object} options - onlyStale: skip campaigns whose snapshot is already built
+ * @returns {Promise<Array>} Campaign IDs that were rebuilt
+ */
+async function rebuildAllSnapshots({ onlyStale = false } = {}) {
+  const where = onlyStale ? { resultsSnapshotAt: null } : {};
+  const campaigns = await Campaign.findAll({ where, attributes: ['id'] });
+
+  const rebuilt = [];
+  for (const campaign of campaigns) {
+    await rebuildCampaignSnapshot(campaign.id);
+    rebuilt.push(campaign.id);
+  }
+
+  return rebuilt;
+}
+
+module.exports = {
+  rebuildCampaignSnapshot,
+  rebuildAllSnapshots,
+  invalidateCampaignSnapshot,
+  invalidateAllSnapshots,
+  applyParticipantResponses,
+  getCampaignSnapshot,
+  loadCampaignAggregate,
+  checkCampaignSnapshot
+};
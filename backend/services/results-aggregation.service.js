@@ -0,0 +1,85 @@
+// backend/services/results-aggregation.service.js
+
+const { sequelize } = require('../models');
+const { createAggregate, addResponse } = require('../utils/results-aggregator');
+
+// One pass over the campaign's responses. Joining through campaign_participants
+// keeps only responses from this campaign's participants (orphaned rows are
+// skipped) and carries each participant's relationship type along with the row.
+const CAMPAIGN_RESPONSES_SQL = `
+  SELECT r.id, r.participantId, r.questionId, r.ratingValue, r.textResponse,
+         r.campaignId, r.targetEmployeeId, r.createdAt, r.updatedAt,
+         p.relationshipType,
+         q.text AS questionText, q.type AS questionType, q.category AS questionCategory,
+         q.perspective AS questionPerspective, q."order" AS questionOrder
+  FROM campaign_participants p
+  JOIN responses r ON r.participantId = p.id
+  LEFT JOIN questions q ON q.id = r.questionId
+  WHERE p.campaignId = ?
+`;
+
+/**
+ * Fetch all responses given by a campaign's participants in a single query
+ * @param {string} campaignId - Campaign ID
+ * @param {Object} options - Optional relationshipTypes filter and transaction
+ * @returns {Promise<Array>} Responses with relationshipType and Question attached
+ */
+async function fetchCampaignResponses(campaignId, { relationshipTypes, transaction } = {}) {
+  let sql = CAMPAIGN_RESPONSES_SQL;
+  const replacements = [campaignId];
+
+  if (relationshipTypes && relationshipTypes.length > 0) {
+    sql += ' AND p.relationshipType IN (?)';
+    replacements.push(relationshipTypes);
+  }
+
+  const rows = await sequelize.query(sql, {
+    replacements,
+    type: sequelize.QueryTypes.SELECT,
+    transaction
+  });
+
+  return rows.map(row => {
+    const {
+      questionText,
+      questionType,
+      questionCategory,
+      questionPerspective,
+      questionOrder,
+      ...response
+    } = row;
+
+    if (questionType !== null && questionType !== undefined) {
+      response.Question = {
+        id: row.questionId,
+        text: questionText,
+        type: questionType,
+        category: questionCategory,
+        perspective: questionPerspective,
+        order: questionOrder
+      };
+    }
+
+    return response;
+  });
+}
+
+/**
+ * Aggregate a campaign's responses per relationship type and question
+ * @param {string} campaignId - Campaign ID
+ * @param {Array} questions - Questions of the campaign template
+ * @returns {Promise<Object>} Filled aggregate (see utils/results-aggregator)
+ */
+async function aggregateCampaignResponses(campaignId, questions) {
+  const responses = await fetchCampaignResponses(campaignId);
+  const aggregate = createAggregate(questions);
+
+  responses.forEach(response => addResponse(aggregate, response));
+
+  return aggregate;
+}
+
+module.exports = {
+  fetchCampaignResponses,
+  aggregateCampaignResponses
+};
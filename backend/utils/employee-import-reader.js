@@ -0,0 +1,200 @@
+// backend/utils/employee-import-reader.js
+//
+// Reads employee import files row by row and maps the cells to employee
+// fields. CSV files are streamed; Excel files are walked cell by cell
+// instead of being converted to one array of row objects.
+
+const fs = require('fs');
+const path = require('path');
+const csv = require('csv-parser');
+const XLSX = require('xlsx');
+
+const EMPLOYEE_FIELDS = [
+  'employeeId',
+  'firstName',
+  'lastName',
+  'email',
+  'jobTitle',
+  'mainFunction',
+  'subFunction',
+  'levelIdentification',
+  'managerId',
+  'secondLevelManagerId'
+];
+
+const REQUIRED_FIELDS = ['employeeId', 'firstName', 'lastName', 'email'];
+
+// Header names recognised when no explicit column mapping is given
+const HEADER_ALIASES = {
+  employeeId: ['id', 'employee id', 'employeeid', 'employee_id'],
+  firstName: ['firstname', 'first name', 'first_name', 'fname'],
+  lastName: ['lastname', 'last name', 'last_name', 'lname', 'second name'],
+  email: ['email', 'email address', 'emailaddress'],
+  jobTitle: ['job title', 'jobtitle', 'title', 'position'],
+  mainFunction: ['department', 'function', 'mainfunction', 'main function'],
+  subFunction: ['subfunction', 'sub function', 'sub-function'],
+  levelIdentification: ['level', 'level identification', 'levelidentification'],
+  managerId: ['manager id', 'managerid', 'manager_id'],
+  secondLevelManagerId: ['second level manager id', 'secondlevelmanagerid', 'second_level_manager_id']
+};
+
+const EMAIL_PATTERN = /^(([^<>()\[\]\\.,;:\s@"]+(\.[^<>()\[\]\\.,;:\s@"]+)*)|(".+"))@((\[[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}])|(([a-zA-Z\-0-9]+\.)+[a-zA-Z]{2,}))$/;
+
+const isBlankRow = (cells) => cells.every(value => value === null || value === undefined || String(value).trim() === '');
+
+/**
+ * Read a CSV or Excel file one row at a time
+ * @param {string} filePath - Path of the uploaded file
+ * @param {Object} options - onRead(fraction) is called with the share of the file read so far
+ * @returns {AsyncGenerator<Object>} - { rowNumber (1-based, header included), cells }
+ */
+async function* readRows(filePath, { onRead } = {}) {
+  const fileExt = path.extname(filePath).toLowerCase();
+
+  if (fileExt === '.csv') {
+    yield* readCsvRows(filePath, onRead);
+  } else if (['.xlsx', '.xls'].includes(fileExt)) {
+    yield* readExcelRows(filePath, onRead);
+  } else {
+    throw new Error('Unsupported file format. Please upload a CSV or Excel file.');
+  }
+}
+
+async function* readCsvRows(filePath, onRead) {
+  const { size } = await fs.promises.stat(filePath);
+  const input = fs.createReadStream(filePath);
+  // Without headers csv-parser keys the cells by column index
+  const parser = input.pipe(csv({ headers: false }));
+  input.on('error', error => parser.destroy(error));
+
+  let rowNumber = 0;
+  for await (const row of parser) {
+    rowNumber++;
+    const cells = Object.values(row);
+    if (onRead && size > 0) onRead(Math.min(1, input.bytesRead / size));
+    if (!isBlankRow(cells)) {
+      yield { rowNumber, cells };
+    }
+  }
+}
+
+async function* readExcelRows(filePath, onRead) {
+  let workbook;
+  try {
+    workbook = XLSX.readFile(filePath, { cellDates: true });
+  } catch (error) {
+    throw new Error(`Failed to parse Excel file: ${error.message}`);
+  }
+
+  const worksheet = workbook.Sheets[workbook.SheetNames[0]]; // Use first sheet
+  if (!worksheet || !worksheet['!ref']) return;
+
+  const range = XLSX.utils.decode_range(worksheet['!ref']);
+  const rowCount = range.e.r - range.s.r + 1;
+
+  for (let r = range.s.r; r <= range.e.r; r++) {
+    const cells = [];
+    for (let c = 0; c <= range.e.c; c++) {
+      const cell = worksheet[XLSX.utils.encode_cell({ r, c })];
+      cells.push(cell ? (cell.w !== undefined ? cell.w : cell.v) : null);
+    }
+
+    if (onRead) onRead((r - range.s.r + 1) / rowCount);
+    if (!isBlankRow(cells)) {
+      yield { rowNumber: r + 1, cells };
+    }
+  }
+}
+
+/**
+ * Turn a column reference into a zero-based index
+ * @param {string|number} column - Index (CSV mapping) or column letter (Excel mapping)
+ * @returns {number|null}
+ */
+function columnIndex(column) {
+  if (column === null || column === undefined || column === '') return null;
+  if (/^\d+$/.test(String(column))) return parseInt(column, 10);
+  return XLSX.utils.decode_col(String(column).toUpperCase());
+}
+
+/**
+ * Work out which column holds each employee field
+ * @param {Object|null} mapping - Explicit field to column mapping, if given
+ * @param {Array} headerCells - Cells of the header row, used when there is no mapping
+ * @returns {Object} - Field name to zero-based column index
+ */
+function resolveColumns(mapping, headerCells = []) {
+  const columns = {};
+
+  if (mapping && Object.keys(mapping).length > 0) {
+    for (const [field, column] of Object.entries(mapping)) {
+      const index = columnIndex(column);
+      if (EMPLOYEE_FIELDS.includes(field) && index !== null) {
+        columns[field] = index;
+      }
+    }
+  } else {
+    headerCells.forEach((header, index) => {
+      const name = String(header || '').replace(/^\uFEFF/, '').toLowerCase().trim();
+      const field = Object.keys(HEADER_ALIASES).find(key => HEADER_ALIASES[key].includes(name));
+      if (field && columns[field] === undefined) {
+        columns[field] = index;
+      } else if (name === 'role' && columns.jobTitle === undefined) {
+        // Use Role as jobTitle if no specific job title column exists
+        columns.jobTitle = index;
+      }
+    });
+  }
+
+  for (const field of REQUIRED_FIELDS) {
+    if (columns[field] === undefined) {
+      throw new Error(`Required field '${field}' is not mapped to a column.`);
+    }
+  }
+
+  return columns;
+}
+
+/**
+ * Map the cells of one row to an employee record
+ * @param {Array} cells - Row cells
+ * @param {Object} columns - Field name to column index
+ * @returns {Object} - Record with every mapped field (empty cells become null)
+ */
+function mapRow(cells, columns) {
+  const record = {};
+
+  for (const [field, index] of Object.entries(columns)) {
+    const value = cells[index];
+    const text = value === null || value === undefined ? '' : String(value).trim();
+    record[field] = text === '' ? null : text;
+  }
+
+  return record;
+}
+
+/**
+ * Check a mapped record before it is written
+ * @param {Object} record - Mapped employee record
+ * @returns {string|null} - Problem description, or null when the record is valid
+ */
+function validateRecord(record) {
+  if (!record.employeeId || !record.firstName || !record.lastName || !record.email) {
+    return 'Missing required fields (Employee ID, First Name, Last Name or Email)';
+  }
+
+  if (!EMAIL_PATTERN.test(String(record.email).toLowerCase())) {
+    return 'Invalid email format';
+  }
+
+  return null;
+}
+
+module.exports = {
+  EMPLOYEE_FIELDS,
+  REQUIRED_FIELDS,
+  readRows,
+  resolveColumns,
+  mapRow,
+  validateRecord
+};
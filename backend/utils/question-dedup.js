@@ -0,0 +1,251 @@
+// backend/utils/question-dedup.js
+//
+// Near-duplicate detection for question sets. Each text is normalised and
+// tokenised once. Candidate matches come from an inverted word index with
+// prefix filtering, and only candidates are compared with the word-overlap
+// similarity of calculateSimilarity (shared words / words of the shorter text).
+// The filtering never drops a true match, so the result is the same as
+// comparing every question with every kept one.
+
+const DEFAULT_THRESHOLD = 0.85;
+
+/**
+ * Normalise question text for comparison (lowercase, no punctuation, single spaces)
+ * @param {string} text - Question text
+ * @returns {string}
+ */
+function normalizeQuestionText(text) {
+  return text
+    .toLowerCase()
+    .replace(/[.,?!;:]/g, '') // Remove common punctuation
+    .replace(/\s+/g, ' ') // Normalize whitespace
+    .trim();
+}
+
+const uniqueWords = (normalized) => (normalized === '' ? [] : [...new Set(normalized.split(' '))]);
+
+/**
+ * Smallest number of shared words for which shared / size exceeds the threshold
+ * (computed with the same division as the similarity check)
+ * @param {number} size - Word count of the shorter text
+ * @param {number} threshold - Similarity threshold
+ * @returns {number} - May exceed size when no overlap is enough
+ */
+function requiredOverlap(size, threshold) {
+  let overlap = Math.max(1, Math.floor(threshold * size));
+  while (overlap <= size && !(overlap / size > threshold)) overlap++;
+  while (overlap > 1 && (overlap - 1) / size > threshold) overlap--;
+  return overlap;
+}
+
+// Number of leading (rarest) words that must contain a shared word
+const prefixLength = (size, threshold) => Math.max(0, size - requiredOverlap(size, threshold) + 1);
+
+/**
+ * Word ids ordered from rarest to most common, so the prefixes used for
+ * candidate lookups hold rare words with short index entries
+ */
+class TokenVocabulary {
+  /**
+   * @param {Array<string>} normalizedTexts - Texts used to count word frequencies
+   */
+  constructor(normalizedTexts = []) {
+    const frequency = new Map();
+    for (const text of normalizedTexts) {
+      for (const word of uniqueWords(text)) {
+        frequency.set(word, (frequency.get(word) || 0) + 1);
+      }
+    }
+
+    this.ids = new Map();
+    [...frequency.keys()]
+      .sort((a, b) => frequency.get(a) - frequency.get(b) || (a < b ? -1 : a > b ? 1 : 0))
+      .forEach((word, id) => this.ids.set(word, id));
+  }
+
+  /**
+   * Distinct word ids of a normalised text, rarest first. Words not seen
+   * when the vocabulary was built are added after the known ones.
+   * @param {string} normalized - Normalised text
+   * @returns {Array<number>}
+   */
+  tokenize(normalized) {
+    return uniqueWords(normalized)
+      .map(word => {
+        if (!this.ids.has(word)) this.ids.set(word, this.ids.size);
+        return this.ids.get(word);
+      })
+      .sort((a, b) => a - b);
+  }
+}
+
+/**
+ * Kept questions of one group, indexed for near-duplicate lookups
+ */
+class NearDuplicateIndex {
+  /**
+   * @param {Object} options - vocabulary (shared TokenVocabulary), threshold
+   */
+  constructor({ vocabulary = new TokenVocabulary(), threshold = DEFAULT_THRESHOLD } = {}) {
+    this.vocabulary = vocabulary;
+    this.threshold = threshold;
+    this.texts = new Set();
+    this.entries = [];
+    // Every word of every kept text
+    this.wordIndex = new Map();
+    // Only the prefix words of each kept text
+    this.prefixIndex = new Map();
+    this.seen = [];
+    this.stamp = 0;
+  }
+
+  /**
+   * Prepare a text for has()/add()
+   * @param {string} text - Question text
+   * @returns {Object} - { normalized, tokens }
+   */
+  prepare(text) {
+    const normalized = normalizeQuestionText(text);
+    return { normalized, tokens: this.vocabulary.tokenize(normalized) };
+  }
+
+  /**
+   * Whether a prepared text duplicates a kept one (same normalised text,
+   * or similarity above the threshold)
+   * @param {Object} entry - Result of prepare()
+   * @returns {boolean}
+   */
+  has(entry) {
+    if (this.texts.has(entry.normalized)) return true;
+
+    const { tokens } = entry;
+    const size = tokens.length;
+    if (size === 0) return false;
+
+    this.stamp++;
+
+    // Kept texts at least as long: a shared word must be among this text's prefix words
+    const prefix = prefixLength(size, this.threshold);
+    for (let i = 0; i < prefix; i++) {
+      const candidates = this.wordIndex.get(tokens[i]);
+      if (candidates && this.matchesAny(candidates, tokens, other => other.length >= size)) return true;
+    }
+
+    // Shorter kept texts: a shared word must be among the other text's prefix words
+    for (let i = 0; i < size; i++) {
+      const candidates = this.prefixIndex.get(tokens[i]);
+      if (candidates && this.matchesAny(candidates, tokens, other => other.length < size)) return true;
+    }
+
+    return false;
+  }
+
+  matchesAny(candidates, tokens, accept) {
+    for (const id of candidates) {
+      const other = this.entries[id];
+      if (this.seen[id] === this.stamp || !accept(other)) continue;
+      this.seen[id] = this.stamp;
+
+      if (this.similar(tokens, other)) return true;
+    }
+    return false;
+  }
+
+  // Shared words over the words of the shorter text, as in calculateSimilarity
+  similar(a, b) {
+    let shared = 0;
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+      if (a[i] === b[j]) {
+        shared++;
+        i++;
+        j++;
+      } else if (a[i] < b[j]) {
+        i++;
+      } else {
+        j++;
+      }
+    }
+    return shared / Math.min(a.length, b.length) > this.threshold;
+  }
+
+  /**
+   * Keep a prepared text
+   * @param {Object} entry - Result of prepare()
+   */
+  add(entry) {
+    this.texts.add(entry.normalized);
+
+    const { tokens } = entry;
+    if (tokens.length === 0) return;
+
+    const id = this.entries.length;
+    this.entries.push(tokens);
+
+    const prefix = prefixLength(tokens.length, this.threshold);
+    tokens.forEach((token, i) => {
+      addToIndex(this.wordIndex, token, id);
+      if (i < prefix) addToIndex(this.prefixIndex, token, id);
+    });
+  }
+}
+
+function addToIndex(index, token, id) {
+  const ids = index.get(token);
+  if (ids) {
+    ids.push(id);
+  } else {
+    index.set(token, [id]);
+  }
+}
+
+/**
+ * Remove near-duplicates from several independent groups of questions in
+ * one pass (e.g. the perspectives of a template, or the templates of a
+ * library). Within a group a question is dropped when it matches one kept
+ * before it, exactly like deduplicateQuestions.
+ * @param {Array<Array>|Object} groups - Arrays of questions, or an object of arrays
+ * @param {Object} options - threshold (default 0.85), getText (default q => q.text)
+ * @returns {Array<Array>|Object} - Same shape, holding the kept questions in order
+ */
+function deduplicateQuestionGroups(groups, { threshold = DEFAULT_THRESHOLD, getText = question => question.text } = {}) {
+  const keys = Object.keys(groups);
+
+  // Normalise every text once; the word frequencies of the whole batch order the index
+  const normalizedGroups = keys.map(key => groups[key].map(question => normalizeQuestionText(getText(question))));
+  const vocabulary = new TokenVocabulary(normalizedGroups.flat());
+
+  const result = Array.isArray(groups) ? [] : {};
+  keys.forEach((key, g) => {
+    const index = new NearDuplicateIndex({ vocabulary, threshold });
+    result[key] = groups[key].filter((question, i) => {
+      const normalized = normalizedGroups[g][i];
+      const entry = { normalized, tokens: vocabulary.tokenize(normalized) };
+      if (index.has(entry)) return false;
+      index.add(entry);
+      return true;
+    });
+  });
+
+  return result;
+}
+
+/**
+ * Remove near-duplicates from one list of questions
+ * @param {Array} questions - Question objects
+ * @param {Object} options - See deduplicateQuestionGroups
+ * @returns {Array} - Kept questions in order
+ */
+function deduplicateQuestionList(questions, options) {
+  return deduplicateQuestionGroups([questions], options)[0];
+}
+
+module.exports = {
+  DEFAULT_THRESHOLD,
+  normalizeQuestionText,
+  TokenVocabulary,
+  NearDuplicateIndex,
+  deduplicateQuestionGroups,
+  deduplicateQuestionList
+};
@@ -0,0 +1,269 @@
+// backend/utils/results-aggregator.js
+
+const RELATIONSHIP_TYPES = ['self', 'manager', 'peer', 'direct_report', 'external'];
+
+// Relationship types whose responses are shown individually on the results page
+const INDIVIDUAL_TYPES = ['self', 'manager'];
+
+const TEXT_QUESTION_TYPES = ['open_ended', 'text'];
+
+const isTextQuestion = (question) => !!question && TEXT_QUESTION_TYPES.includes(question.type);
+
+/**
+ * Create an empty aggregate for a campaign's responses
+ * @param {Array} questions - Questions of the campaign template
+ * @returns {object} Aggregate to be filled with addResponse()
+ */
+const createAggregate = (questions = []) => {
+  const questionList = Array.isArray(questions) ? questions : [];
+  const questionMap = new Map();
+  questionList.forEach(question => questionMap.set(question.id, question));
+
+  const byType = {};
+  RELATIONSHIP_TYPES.forEach(type => {
+    byType[type] = {
+      responseCount: 0,
+      questions: new Map()
+    };
+  });
+
+  const individualResponses = {};
+  INDIVIDUAL_TYPES.forEach(type => {
+    individualResponses[type] = [];
+  });
+
+  return {
+    questions: questionList,
+    questionMap,
+    byType,
+    individualResponses
+  };
+};
+
+/**
+ * Get (or lazily create) the running statistics of a question for one relationship type
+ * @param {object} bucket - Relationship type bucket of the aggregate
+ * @param {string} questionId - Question ID
+ * @returns {object} Running sums, counts, rating histogram and text answers
+ */
+const getQuestionStats = (bucket, questionId) => {
+  let stats = bucket.questions.get(questionId);
+  if (!stats) {
+    stats = { sum: 0, count: 0, distribution: {}, texts: [] };
+    bucket.questions.set(questionId, stats);
+  }
+  return stats;
+};
+
+/**
+ * Record a response for display without touching the aggregated statistics
+ * @param {object} aggregate - Aggregate created by createAggregate()
+ * @param {object} response - Response carrying its participant's relationshipType
+ */
+const addIndividualResponse = (aggregate, response) => {
+  const type = response.relationshipType;
+
+  // Attach the template question if the caller did not resolve one already
+  const question = aggregate.questionMap.get(response.questionId);
+  if (!response.Question && question) {
+    response.Question = question;
+  }
+
+  if (aggregate.individualResponses[type]) {
+    aggregate.individualResponses[type].push(response);
+  }
+};
+
+/**
+ * Fold a single response into the aggregate. Every response is visited once,
+ * so building the whole aggregate is linear in the number of responses.
+ * @param {object} aggregate - Aggregate created by createAggregate()
+ * @param {object} response - Response carrying its participant's relationshipType
+ */
+const addResponse = (aggregate, response) => {
+  const type = response.relationshipType;
+  const bucket = aggregate.byType[type];
+  if (!bucket) return;
+
+  bucket.responseCount++;
+  addIndividualResponse(aggregate, response);
+
+  // Only template questions contribute to the aggregated statistics
+  const question = aggregate.questionMap.get(response.questionId);
+  if (!question) return;
+
+  if (question.type === 'rating') {
+    if (response.ratingValue === null || response.ratingValue === undefined) return;
+
+    const value = Number(response.ratingValue);
+    if (isNaN(value)) return;
+
+    const stats = getQuestionStats(bucket, question.id);
+    stats.sum += value;
+    stats.count++;
+    stats.distribution[value] = (stats.distribution[value] || 0) + 1;
+  } else if (isTextQuestion(question)) {
+    const stats = getQuestionStats(bucket, question.id);
+    stats.texts.push(response.textResponse !== undefined ? response.textResponse : '');
+  }
+};
+
+/**
+ * Load a precomputed snapshot row (see CampaignResultSnapshot) into the aggregate
+ * @param {object} aggregate - Aggregate created by createAggregate()
+ * @param {object} row - Snapshot row for one relationship type and question
+ */
+const addSnapshotRow = (aggregate, row) => {
+  const bucket = aggregate.byType[row.relationshipType];
+  if (!bucket) return;
+
+  bucket.responseCount += row.responseCount || 0;
+
+  if (!aggregate.questionMap.has(row.questionId)) return;
+
+  bucket.questions.set(row.questionId, {
+    sum: row.ratingSum || 0,
+    count: row.ratingCount || 0,
+    distribution: { ...(row.ratingDistribution || {}) },
+    texts: [...(row.textResponses || [])]
+  });
+};
+
+/**
+ * Calculate average ratings by question and relationship type
+ * @param {object} aggregate - Filled aggregate
+ * @returns {object} Average ratings overall and by relationship type
+ */
+const buildRatingAverages = (aggregate) => {
+  const averages = {
+    overall: {},
+    byType: {}
+  };
+  RELATIONSHIP_TYPES.forEach(type => {
+    averages.byType[type] = {};
+  });
+
+  aggregate.questions
+    .filter(question => question.type === 'rating')
+    .forEach(question => {
+      let totalSum = 0;
+      let totalCount = 0;
+
+      RELATIONSHIP_TYPES.forEach(type => {
+        const stats = aggregate.byType[type].questions.get(question.id);
+        if (stats && stats.count > 0) {
+          averages.byType[type][question.id] = {
+            average: stats.sum / stats.count,
+            count: stats.count,
+            questionText: question.text,
+            questionCategory: question.category
+          };
+          totalSum += stats.sum;
+          totalCount += stats.count;
+        }
+      });
+
+      if (totalCount > 0) {
+        averages.overall[question.id] = {
+          average: totalSum / totalCount,
+          count: totalCount,
+          questionText: question.text,
+          questionCategory: question.category
+        };
+      }
+    });
+
+  return averages;
+};
+
+/**
+ * Aggregate the responses of one relationship type by question and category
+ * @param {object} aggregate - Filled aggregate
+ * @param {string} type - Relationship type
+ * @returns {object} Aggregated responses by question and by category
+ */
+const buildAggregatedResponses = (aggregate, type) => {
+  const result = {
+    byQuestion: {},
+    byCategory: {}
+  };
+
+  const bucket = aggregate.byType[type];
+  if (!bucket || bucket.responseCount === 0) {
+    return result;
+  }
+
+  aggregate.questions.forEach(question => {
+    const stats = bucket.questions.get(question.id);
+    if (!stats) return;
+
+    if (question.type === 'rating' && stats.count > 0) {
+      // Default to all 5 possible rating values (1-5)
+      const distribution = { ...stats.distribution };
+      for (let i = 1; i <= 5; i++) {
+        if (!distribution[i]) {
+          distribution[i] = 0;
+        }
+      }
+
+      result.byQuestion[question.id] = {
+        questionText: question.text,
+        questionType: question.type,
+        questionCategory: question.category,
+        average: stats.sum / stats.count,
+        count: stats.count,
+        distribution
+      };
+    } else if (isTextQuestion(question) && stats.texts.length > 0) {
+      result.byQuestion[question.id] = {
+        questionText: question.text,
+        questionType: question.type,
+        questionCategory: question.category,
+        count: stats.texts.length,
+        responses: stats.texts
+      };
+    }
+  });
+
+  // Rating averages by category
+  const categories = new Map();
+  aggregate.questions
+    .filter(question => question.type === 'rating')
+    .forEach(question => {
+      if (!categories.has(question.category)) {
+        categories.set(question.category, { sum: 0, count: 0, questionCount: 0 });
+      }
+      const category = categories.get(question.category);
+      category.questionCount++;
+
+      const stats = bucket.questions.get(question.id);
+      if (stats && stats.count > 0) {
+        category.sum += stats.sum;
+        category.count += stats.count;
+      }
+    });
+
+  categories.forEach((category, name) => {
+    if (category.count > 0) {
+      result.byCategory[name] = {
+        average: category.sum / category.count,
+        count: category.count,
+        questionCount: category.questionCount
+      };
+    }
+  });
+
+  return result;
+};
+
+module.exports = {
+  RELATIONSHIP_TYPES,
+  INDIVIDUAL_TYPES,
+  TEXT_QUESTION_TYPES,
+  createAggregate,
+  addResponse,
+  addIndividualResponse,
+  addSnapshotRow,
+  buildRatingAverages,
+  buildAggregatedResponses
+};
@@ -0,0 +1,77 @@
+// backend/utils/template-compiler.js
+//
+// Compiles email templates with {placeholder} markers into render functions.
+// The template text is scanned once; rendering only concatenates the literal
+// segments with the placeholder values.
+
+const PLACEHOLDER_PATTERN = /\{([A-Za-z0-9_]+)\}/g;
+
+/**
+ * Compile a template string into a render function
+ * @param {string} source - Template text with {placeholder} markers
+ * @param {Object} boundData - Values fixed at compile time (e.g. branding)
+ * @returns {Function} - render(data) returning the filled-in text
+ */
+function compileTemplate(source, boundData = {}) {
+  if (!source) {
+    return () => 'Error: Missing template content';
+  }
+
+  // Alternating literal segments and placeholder names: [text, key, text, key, ..., text].
+  // Bound values are folded into the literals so they cost nothing per render.
+  const segments = [''];
+  let lastIndex = 0;
+  let match;
+
+  PLACEHOLDER_PATTERN.lastIndex = 0;
+  while ((match = PLACEHOLDER_PATTERN.exec(source)) !== null) {
+    const key = match[1];
+    segments[segments.length - 1] += source.slice(lastIndex, match.index);
+
+    if (Object.prototype.hasOwnProperty.call(boundData, key)) {
+      segments[segments.length - 1] += boundData[key] || '';
+    } else {
+      segments.push(key, '');
+    }
+
+    lastIndex = match.index + match[0].length;
+  }
+  segments[segments.length - 1] += source.slice(lastIndex);
+
+  if (segments.length === 1) {
+    const text = segments[0];
+    return () => text;
+  }
+
+  return (data = {}) => {
+    let output = segments[0];
+    for (let i = 1; i < segments.length; i += 2) {
+      const key = segments[i];
+      // Placeholders without a value are left in place, as before
+      output += Object.prototype.hasOwnProperty.call(data, key) ? (data[key] || '') : `{${key}}`;
+      output += segments[i + 1];
+    }
+    return output;
+  };
+}
+
+/**
+ * Compile the subject and content of an email template together
+ * @param {Object} template - { subject, content }
+ * @param {Object} boundData - Values fixed at compile time (e.g. branding)
+ * @returns {Function} - render(data) returning { subject, html }
+ */
+function compileEmailTemplate(template, boundData = {}) {
+  const renderSubject = compileTemplate(template.subject, boundData);
+  const renderContent = compileTemplate(template.content, boundData);
+
+  return (data) => ({
+    subject: renderSubject(data),
+    html: renderContent(data)
+  });
+}
+
+module.exports = {
+  compileTemplate,
+  compileEmailTemplate
+};
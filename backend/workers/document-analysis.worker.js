@@ -0,0 +1,24 @@
+// backend/workers/document-analysis.worker.js
+//
+// Worker process of the document analysis pool (services/analysis-job.service.js).
+// Runs one claimed job at a time: uploads, AI analysis and template creation
+// happen here instead of in the web process.
+
+const analysisJobs = require('../services/analysis-job.service');
+
+process.on('message', async (message) => {
+  if (!message || message.type !== 'run') {
+    return;
+  }
+
+  try {
+    await analysisJobs.runJob(message.jobId);
+  } catch (error) {
+    console.error(`[ANALYSIS] Worker error on job ${message.jobId}:`, error);
+  } finally {
+    process.send({ type: 'finished', jobId: message.jobId });
+  }
+});
+
+// Stop together with the web process
+process.on('disconnect', () => process.exit(0));
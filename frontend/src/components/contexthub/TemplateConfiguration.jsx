@@ -3,6 +3,27 @@ import { useNavigate } from 'react-router-dom';
 import api from "../../services/api";
 import { Plus, Check, X, RefreshCw, FileText } from 'lucide-react';
 
+const JOB_POLL_INTERVAL = 2000;
+
+const STAGE_LABELS = {
+  upload: 'Uploading documents',
+  analysis: 'Analyzing documents',
+  supplement: 'Completing perspectives',
+  save: 'Saving template'
+};
+
+// Poll a document analysis job until it has finished
+const waitForAnalysisJob = async (jobId, onProgress) => {
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL));
+    const { data: job } = await api.get(`/documents/analysis-jobs/${jobId}`);
+
+    if (job.status === 'completed') return job;
+    if (job.status === 'failed') throw new Error(job.error || 'Template generation failed');
+    onProgress(job);
+  }
+};
+
 const TemplateConfiguration = ({ onTemplateCreated }) => {
   const navigate = useNavigate();
   const [showForm, setShowForm] = useState(false);
@@ -213,12 +234,13 @@ const TemplateConfiguration = ({ onTemplateCreated }) => {
       return;
     }
 
+    const generateStatus = document.createElement('div');
+
     try {
       setLoading(true);
       setError(null);
 
       // First, show a generating message
-      const generateStatus = document.createElement('div');
       generateStatus.innerHTML = '<div class="fixed top-0 left-0 right-0 bg-blue-600 text-white p-2 text-center z-50">Generating template... This may take a moment.</div>';
       document.body.appendChild(generateStatus);
 
@@ -247,6 +269,16 @@ const TemplateConfiguration = ({ onTemplateCreated }) => {
       });
       // --- END: INCLUDE questionMixPercentage IN SUBMITTED DATA ---
 
+      // The template is generated in the background; follow the job until it is done
+      let templateId = response.data?.template?.id;
+      if (!templateId && response.data?.job) {
+        const job = await waitForAnalysisJob(response.data.job.id, (progress) => {
+          const label = STAGE_LABELS[progress.stage] || 'Waiting to start';
+          generateStatus.firstChild.textContent = `Generating template... ${label} (${progress.progress}%)`;
+        });
+        templateId = job.templateId;
+      }
+
       // Remove the status message
       document.body.removeChild(generateStatus);
 
@@ -255,7 +287,7 @@ const TemplateConfiguration = ({ onTemplateCreated }) => {
       setSelectedDocumentIds([]);
 
       // Navigate to the template review page
-      if (response.data && response.data.template) {
+      if (templateId) {
         // Show success message
         const successStatus = document.createElement('div');
         successStatus.innerHTML = '<div class="fixed top-0 left-0 right-0 bg-green-600 text-white p-2 text-center z-50">Template created successfully!</div>';
@@ -266,7 +298,7 @@ const TemplateConfiguration = ({ onTemplateCreated }) => {
           document.body.removeChild(successStatus);
         }, 3000);
 
-        navigate(`/contexthub/templates/${response.data.template.id}`);
+        navigate(`/contexthub/templates/${templateId}`);
       }
 
       // Notify parent component
@@ -276,6 +308,9 @@ const TemplateConfiguration = ({ onTemplateCreated }) => {
 
     } catch (err) {
       console.error('Error generating template:', err);
+      if (generateStatus.parentNode) {
+        document.body.removeChild(generateStatus);
+      }
       let errorMsg = 'Failed to generate template';
 
       if (err.response?.data?.message) {